@@ -0,0 +1,3 @@
+# src/backtesting/__init__.py
+from .engine import ParametrosEstrategia, ResultadoBacktest, backtest, calcular_senales
+from .optimizer import generar_aleatorio, generar_grid, optimizar, ranking
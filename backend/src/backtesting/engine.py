@@ -0,0 +1,309 @@
+# src/backtesting/engine.py
+from config.settings import INITIAL_BALANCE, RISK_PERCENTAGE, SL_DOLLAR, TP_DOLLAR
+from core.market_data.daily_cache import MS_POR_DIA
+from dataclasses import dataclass, field
+from indicators.ema import ema_gpt
+import numpy as np
+import pandas as pd
+import math
+
+COLUMNAS_OHLCV = ("open_time", "open", "high", "low", "close", "volume", "close_time")
+
+
+@dataclass(frozen=True)
+class ParametrosEstrategia:
+    """
+    Parametros de ScalpingStrategyLP. Los valores por defecto son los del camino en vivo.
+    """
+    ema_rapida: int = 9
+    ema_lenta: int = 26
+    rsi_periodo: int = 5
+    vol_periodo: int = 20
+    vol_multiplicador: float = 2.0
+    sl_dollar: float = SL_DOLLAR
+    tp_dollar: float = TP_DOLLAR
+    risk_percentage: float = RISK_PERCENTAGE
+    initial_balance: float = INITIAL_BALANCE
+    ema_diaria_periodo: int = 20
+    ema_diaria_limite: int = 50
+    filtro_diario: bool = True
+    comision: float = 0.0
+
+
+@dataclass
+class ResultadoBacktest:
+    senales: np.ndarray          # 1 = LONG, -1 = SHORT, 0 = sin señal, por vela
+    trades: pd.DataFrame
+    equity: np.ndarray           # Balance por vela tras las salidas realizadas
+    metricas: dict = field(default_factory=dict)
+
+
+def _columnas(datos) -> dict:
+    """
+    Acepta un DataFrame, un dict de arrays o un CandleBuffer y devuelve arrays float64.
+    """
+    return {columna: np.asarray(datos[columna], dtype=np.float64) for columna in COLUMNAS_OHLCV}
+
+
+def _ema_como_stream(valores: np.ndarray, periodo: int) -> np.ndarray:
+    """
+    EMA con exactamente la misma aritmetica que StreamingEMA (la recursion no es vectorizable).
+    """
+    multiplier = 2 / (periodo + 1)
+    resultado = np.empty(len(valores))
+    valor = None
+    for i, x in enumerate(valores.tolist()):
+        valor = x if valor is None else (x * multiplier) + (valor * (1 - multiplier))
+        resultado[i] = valor
+    return resultado
+
+
+def _sumas_como_stream(valores: np.ndarray, periodo: int) -> np.ndarray:
+    """
+    Reproduce bit a bit la suma movil de StreamingRSI / StreamingVolumeSMA: suma acumulada
+    con altas y bajas, re-sumada con fsum cada `periodo` actualizaciones. Entre dos
+    re-sumas solo hay `periodo - 1` pasos, asi que se vectoriza sobre todos los bloques
+    a la vez recorriendo solo la posicion dentro del bloque.
+    """
+    n = len(valores)
+    sumas = np.empty(n)
+    if n == 0:
+        return sumas
+
+    # Posiciones de re-suma: actualizacion u = k * periodo (indice u - 1)
+    resync = np.arange(periodo - 1, n, periodo)
+    sumas[resync] = [math.fsum(valores[i - periodo + 1:i + 1]) for i in resync.tolist()]
+
+    for j in range(1, periodo):
+        # Actualizaciones u con u % periodo == j (indice i = u - 1)
+        indices = np.arange(j - 1, n, periodo)
+        previas = np.where(indices > 0, sumas[np.maximum(indices - 1, 0)], 0.0)
+        actuales = previas + valores[indices]
+        con_baja = indices >= periodo
+        actuales[con_baja] = actuales[con_baja] - valores[indices[con_baja] - periodo]
+        sumas[indices] = actuales
+    return sumas
+
+
+def _rsi_como_stream(close: np.ndarray, periodo: int) -> np.ndarray:
+    delta = np.empty(len(close))
+    if len(close):
+        delta[0] = 0.0
+        delta[1:] = close[1:] - close[:-1]
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    gain_avg = _sumas_como_stream(gains, periodo) / periodo
+    loss_avg = _sumas_como_stream(losses, periodo) / periodo
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + gain_avg / loss_avg))
+    rsi = np.where(loss_avg == 0, np.where(gain_avg > 0, 100.0, np.nan), rsi)
+    rsi[:periodo - 1] = np.nan
+    return rsi
+
+
+def _sma_como_stream(valores: np.ndarray, periodo: int) -> np.ndarray:
+    sma = _sumas_como_stream(valores, periodo) / periodo
+    sma[:periodo - 1] = np.nan
+    return sma
+
+
+def cierres_diarios(datos) -> pd.Series:
+    """
+    Cierre de cada dia UTC (indexado por el open_time del dia) a partir de velas intradia.
+    """
+    columnas = _columnas(datos)
+    dias = (columnas["open_time"] // MS_POR_DIA * MS_POR_DIA).astype(np.int64)
+    return pd.Series(columnas["close"], index=dias).groupby(level=0).last()
+
+
+def _filtro_diario(close, close_time, diarios: pd.Series, params: ParametrosEstrategia):
+    """
+    Reproduce DailyEmaCache + EmaDiaria para cada vela: EMA de los ultimos dias cerrados
+    (anteriores al dia de la consulta) completada con el cierre de la vela.
+    """
+    # El camino en vivo consulta justo despues del cierre de la vela
+    dia_consulta = ((close_time.astype(np.int64) + 1) // MS_POR_DIA) * MS_POR_DIA
+    dias_unicos, inversa = np.unique(dia_consulta, return_inverse=True)
+
+    dias_diarios = diarios.index.to_numpy(dtype=np.int64)
+    cierres = diarios.to_numpy(dtype=np.float64)
+    n_cerrados = params.ema_diaria_limite - 1
+
+    ema_previa = np.full(len(dias_unicos), np.nan)   # emas[-2]
+    ema_ultima = np.full(len(dias_unicos), np.nan)   # emas[-1]
+    for k, dia in enumerate(dias_unicos.tolist()):
+        fin = np.searchsorted(dias_diarios, dia, side="left")
+        ventana = cierres[max(0, fin - n_cerrados):fin].tolist()
+        if not ventana:
+            continue
+        emas = ema_gpt(pd.Series(ventana, dtype=float), params.ema_diaria_periodo).iloc[-2:].tolist()
+        ema_ultima[k] = emas[-1]
+        if len(emas) == 2:
+            ema_previa[k] = emas[0]
+
+    e_prev = ema_previa[inversa]
+    e_ult = ema_ultima[inversa]
+    multiplier = 2 / (params.ema_diaria_periodo + 1)
+    sin_dias = np.isnan(e_ult)
+    valor = np.where(sin_dias, close, (close * multiplier) + (e_ult * (1 - multiplier)))
+
+    con_previa = ~np.isnan(e_prev)
+    creciente = np.where(sin_dias, True, (e_ult <= valor) & (~con_previa | (e_prev <= e_ult)))
+    decreciente = np.where(sin_dias, True, (e_ult >= valor) & (~con_previa | (e_prev >= e_ult)))
+
+    permitido_long = (close > valor) | creciente
+    permitido_short = (close < valor) | decreciente
+    return permitido_long, permitido_short
+
+
+def calcular_senales(datos, params: ParametrosEstrategia = None, diarios: pd.Series = None, cache: dict = None) -> np.ndarray:
+    """
+    Evalua las reglas de entrada de ScalpingStrategyLP.check_entry sobre toda la serie.
+
+    :param datos: velas cerradas (DataFrame, dict de arrays o CandleBuffer), la mas antigua primero
+    :param params: parametros de la estrategia
+    :param diarios: cierres diarios (indice = open_time del dia en ms); por defecto se derivan de `datos`
+    :param cache: dict opcional donde se reutilizan columnas de indicadores entre llamadas con los mismos datos
+    :return: array con 1 (LONG), -1 (SHORT) o 0 por vela
+    """
+    params = params or ParametrosEstrategia()
+    cache = {} if cache is None else cache
+    columnas = _columnas(datos)
+    open_, high, low = columnas["open"], columnas["high"], columnas["low"]
+    close, volume = columnas["close"], columnas["volume"]
+    n = len(close)
+    if n < 3:
+        return np.zeros(n, dtype=np.int8)
+
+    def indicador(clave, funcion):
+        if clave not in cache:
+            cache[clave] = funcion()
+        return cache[clave]
+
+    ema_rapida = indicador(("ema", params.ema_rapida), lambda: _ema_como_stream(close, params.ema_rapida))
+    ema_lenta = indicador(("ema", params.ema_lenta), lambda: _ema_como_stream(close, params.ema_lenta))
+    rsi = indicador(("rsi", params.rsi_periodo), lambda: _rsi_como_stream(close, params.rsi_periodo))
+    vol_prom = indicador(("vol_sma", params.vol_periodo), lambda: _sma_como_stream(volume, params.vol_periodo))
+
+    cruce_alcista = np.zeros(n, dtype=bool)
+    cruce_bajista = np.zeros(n, dtype=bool)
+    cruce_alcista[1:] = (ema_rapida[:-1] < ema_lenta[:-1]) & (ema_rapida[1:] > ema_lenta[1:])
+    cruce_bajista[1:] = (ema_rapida[:-1] > ema_lenta[:-1]) & (ema_rapida[1:] < ema_lenta[1:])
+
+    breakout_alcista = np.zeros(n, dtype=bool)
+    breakout_bajista = np.zeros(n, dtype=bool)
+    breakout_alcista[2:] = high[2:] > np.maximum(high[1:-1], high[:-2])
+    breakout_bajista[2:] = low[2:] < np.minimum(low[1:-1], low[:-2])
+
+    volumen_ok = volume > vol_prom * params.vol_multiplicador
+    vela_alcista = close > open_
+    vela_bajista = close < open_
+
+    if params.filtro_diario:
+        if diarios is None:
+            diarios = indicador(("diarios",), lambda: cierres_diarios(columnas))
+        permitido_long, permitido_short = indicador(
+            ("filtro_diario", params.ema_diaria_periodo, params.ema_diaria_limite),
+            lambda: _filtro_diario(close, columnas["close_time"], diarios, params),
+        )
+    else:
+        permitido_long = permitido_short = np.ones(n, dtype=bool)
+
+    condicion_long = cruce_alcista & breakout_alcista & volumen_ok & (rsi > 50) & vela_alcista & permitido_long
+    condicion_short = cruce_bajista & breakout_bajista & volumen_ok & (rsi < 50) & vela_bajista & permitido_short
+
+    senales = np.zeros(n, dtype=np.int8)
+    senales[condicion_long] = 1
+    # Igual que check_entry: LONG tiene prioridad si ambas condiciones se cumplen
+    senales[condicion_short & ~condicion_long] = -1
+    return senales
+
+
+def _primer_indice(condicion, inicio: int, n: int) -> int:
+    """
+    Primer indice >= inicio donde `condicion(a, b)` (evaluada sobre el slice [a, b)) es True,
+    buscando en ventanas que crecen para no recorrer toda la serie por trade.
+    """
+    paso = 64
+    while inicio < n:
+        fin = min(n, inicio + paso)
+        encontrados = np.flatnonzero(condicion(inicio, fin))
+        if len(encontrados):
+            return inicio + int(encontrados[0])
+        inicio = fin
+        paso *= 4
+    return -1
+
+
+def _simular_salidas(columnas: dict, senales: np.ndarray, params: ParametrosEstrategia) -> pd.DataFrame:
+    high, low, close = columnas["high"], columnas["low"], columnas["close"]
+    n = len(close)
+    filas = []
+    for i in np.flatnonzero(senales).tolist():
+        direccion = int(senales[i])
+        entry = close[i]
+        if direccion == 1:
+            sl, tp = entry - params.sl_dollar, entry + params.tp_dollar
+            toca_sl = lambda a, b: low[a:b] <= sl
+            toca_tp = lambda a, b: high[a:b] >= tp
+        else:
+            sl, tp = entry + params.sl_dollar, entry - params.tp_dollar
+            toca_sl = lambda a, b: high[a:b] >= sl
+            toca_tp = lambda a, b: low[a:b] <= tp
+
+        diff_sl = abs(entry - sl)
+        qty = (params.initial_balance * params.risk_percentage) / diff_sl if diff_sl else 0
+
+        # Si SL y TP se tocan en la misma vela se asume el SL (supuesto conservador)
+        salida_idx = _primer_indice(lambda a, b: toca_sl(a, b) | toca_tp(a, b), i + 1, n)
+        if salida_idx == -1:
+            salida_idx, salida, motivo = n - 1, close[-1], "fin"
+        elif toca_sl(salida_idx, salida_idx + 1)[0]:
+            salida, motivo = sl, "SL"
+        else:
+            salida, motivo = tp, "TP"
+
+        pnl = (salida - entry) * qty * direccion - params.comision * (entry + salida) * qty
+        filas.append((i, salida_idx, "LONG" if direccion == 1 else "SHORT", entry, sl, tp, salida, qty, pnl, motivo))
+
+    return pd.DataFrame(filas, columns=[
+        "entrada_idx", "salida_idx", "modo", "entry", "sl", "tp", "salida", "quantity", "pnl", "motivo"
+    ])
+
+
+def _metricas(trades: pd.DataFrame, equity: np.ndarray, params: ParametrosEstrategia) -> dict:
+    pnl = trades["pnl"].to_numpy() if len(trades) else np.zeros(0)
+    ganancias = pnl[pnl > 0].sum()
+    perdidas = -pnl[pnl < 0].sum()
+    maximos = np.maximum.accumulate(equity) if len(equity) else equity
+    drawdown = float(((maximos - equity) / maximos).max()) if len(equity) else 0.0
+    return {
+        "trades": int(len(pnl)),
+        "total_pnl": float(pnl.sum()),
+        "retorno": float(pnl.sum() / params.initial_balance),
+        "win_rate": float((pnl > 0).mean()) if len(pnl) else 0.0,
+        "profit_factor": float(ganancias / perdidas) if perdidas else (math.inf if ganancias else 0.0),
+        "max_drawdown": drawdown,
+        "sharpe": float(pnl.mean() / pnl.std() * math.sqrt(len(pnl))) if len(pnl) > 1 and pnl.std() > 1e-12 else 0.0,
+    }
+
+
+def backtest(datos, params: ParametrosEstrategia = None, diarios: pd.Series = None, cache: dict = None) -> ResultadoBacktest:
+    """
+    Backtest vectorizado de ScalpingStrategyLP: señales sobre toda la serie y salidas
+    por SL/TP con el tamaño de posicion de `calculate_position_size`.
+
+    Igual que en vivo, cada señal abre su propia operacion aunque haya otras abiertas.
+    """
+    params = params or ParametrosEstrategia()
+    columnas = _columnas(datos)
+    senales = calcular_senales(columnas, params, diarios=diarios, cache=cache)
+    trades = _simular_salidas(columnas, senales, params)
+
+    pnl_por_vela = np.zeros(len(senales))
+    if len(trades):
+        np.add.at(pnl_por_vela, trades["salida_idx"].to_numpy(), trades["pnl"].to_numpy())
+    equity = params.initial_balance + np.cumsum(pnl_por_vela)
+
+    return ResultadoBacktest(senales=senales, trades=trades, equity=equity, metricas=_metricas(trades, equity, params))
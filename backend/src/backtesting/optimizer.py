@@ -0,0 +1,147 @@
+# src/backtesting/optimizer.py
+from .engine import COLUMNAS_OHLCV, ParametrosEstrategia, _columnas, backtest
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields, replace
+from multiprocessing import shared_memory
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+import itertools
+import logging
+import os
+import random
+
+logger = logging.getLogger("TRADING_BOT")
+
+# Estado de cada proceso del pool: datos compartidos y cache de indicadores por simbolo
+_DATOS_WORKER: dict[str, dict] = {}
+_CACHES_WORKER: dict[str, dict] = {}
+_SHM_WORKER: list = []
+
+
+def generar_grid(espacio: dict, base: ParametrosEstrategia = None) -> list[ParametrosEstrategia]:
+    """
+    Producto cartesiano de un espacio {parametro: [valores]} sobre `base`.
+    """
+    base = base or ParametrosEstrategia()
+    _validar_espacio(espacio)
+    nombres = list(espacio)
+    return [replace(base, **dict(zip(nombres, valores))) for valores in itertools.product(*espacio.values())]
+
+
+def generar_aleatorio(espacio: dict, n: int, seed: int = None, base: ParametrosEstrategia = None) -> list[ParametrosEstrategia]:
+    """
+    `n` combinaciones distintas elegidas al azar del espacio {parametro: [valores]}.
+    """
+    base = base or ParametrosEstrategia()
+    _validar_espacio(espacio)
+    rng = random.Random(seed)
+    nombres = list(espacio)
+    total = int(np.prod([len(v) for v in espacio.values()]))
+    vistos, combinaciones = set(), []
+    while len(combinaciones) < min(n, total):
+        valores = tuple(rng.choice(espacio[nombre]) for nombre in nombres)
+        if valores not in vistos:
+            vistos.add(valores)
+            combinaciones.append(replace(base, **dict(zip(nombres, valores))))
+    return combinaciones
+
+
+def _validar_espacio(espacio: dict):
+    validos = {f.name for f in fields(ParametrosEstrategia)}
+    desconocidos = set(espacio) - validos
+    if desconocidos:
+        raise ValueError(f"Parametros desconocidos en el espacio de busqueda: {sorted(desconocidos)}")
+
+
+def _clave_indicadores(params: ParametrosEstrategia) -> tuple:
+    # Agrupar por periodos hace que los trabajos consecutivos reutilicen mas columnas de la cache
+    return (params.ema_rapida, params.ema_lenta, params.rsi_periodo, params.vol_periodo)
+
+
+def _iniciar_worker(bloques: dict):
+    """
+    Inicializador del pool: adjunta la memoria compartida con las velas de cada simbolo
+    (sin copiarla ni serializarla por tarea).
+    """
+    for symbol, (nombre, forma) in bloques.items():
+        # Los workers (spawn) comparten el resource tracker del proceso principal, que es
+        # quien libera los bloques al terminar
+        shm = shared_memory.SharedMemory(name=nombre)
+        _SHM_WORKER.append(shm)
+        matriz = np.ndarray(forma, dtype=np.float64, buffer=shm.buf)
+        _DATOS_WORKER[symbol] = {columna: matriz[i] for i, columna in enumerate(COLUMNAS_OHLCV)}
+        _CACHES_WORKER[symbol] = {}
+
+
+def _evaluar_lote(symbol: str, lote: list[ParametrosEstrategia]) -> list[dict]:
+    columnas = _DATOS_WORKER[symbol]
+    cache = _CACHES_WORKER[symbol]
+    resultados = []
+    for params in lote:
+        resultado = backtest(columnas, params, cache=cache)
+        resultados.append({"symbol": symbol, **asdict(params), **resultado.metricas})
+    return resultados
+
+
+def optimizar(datos: dict, combinaciones: list[ParametrosEstrategia], workers: int = None, lote: int = 32) -> pd.DataFrame:
+    """
+    Evalua cada combinacion de parametros sobre cada simbolo en un pool de procesos.
+
+    Las velas se copian una sola vez a memoria compartida y cada worker mantiene una
+    cache de columnas de indicadores por simbolo, de modo que las combinaciones que
+    comparten periodo (p.ej. la misma EMA rapida) no las recalculan.
+
+    :param datos: {symbol: velas (DataFrame, dict de arrays o CandleBuffer)}
+    :param combinaciones: lista de ParametrosEstrategia (ver generar_grid / generar_aleatorio)
+    :param workers: procesos del pool (por defecto, numero de CPUs)
+    :param lote: combinaciones por tarea
+    :return: DataFrame con una fila por (simbolo, combinacion) y sus metricas
+    """
+    workers = workers or os.cpu_count()
+    combinaciones = sorted(combinaciones, key=_clave_indicadores)
+
+    bloques, memorias = {}, []
+    try:
+        for symbol, velas in datos.items():
+            columnas = _columnas(velas)
+            forma = (len(COLUMNAS_OHLCV), len(columnas["close"]))
+            shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(forma)) * 8))
+            memorias.append(shm)
+            matriz = np.ndarray(forma, dtype=np.float64, buffer=shm.buf)
+            for i, columna in enumerate(COLUMNAS_OHLCV):
+                matriz[i] = columnas[columna]
+            bloques[symbol] = (shm.name, forma)
+
+        filas = []
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_iniciar_worker, initargs=(bloques,)) as pool:
+            futuros = [
+                pool.submit(_evaluar_lote, symbol, combinaciones[i:i + lote])
+                for symbol in bloques
+                for i in range(0, len(combinaciones), lote)
+            ]
+            for completados, futuro in enumerate(as_completed(futuros), start=1):
+                filas.extend(futuro.result())
+                if completados % 100 == 0:
+                    logger.info(f"🔬 Optimizacion: {completados}/{len(futuros)} lotes evaluados")
+        return pd.DataFrame(filas)
+    finally:
+        for shm in memorias:
+            shm.close()
+            shm.unlink()
+
+
+def ranking(resultados: pd.DataFrame, metricas=("total_pnl",), agregacion: str = "mean") -> pd.DataFrame:
+    """
+    Agrega los resultados por combinacion (sobre todos los simbolos) y los ordena.
+
+    :param metricas: metricas por las que ordenar, en orden de prioridad; un prefijo '-'
+                     indica que menor es mejor (p.ej. '-max_drawdown')
+    :param agregacion: funcion de agregacion entre simbolos ('mean', 'median', 'sum', 'min', ...)
+    """
+    parametros = [f.name for f in fields(ParametrosEstrategia)]
+    nombres = [m.lstrip("-") for m in metricas]
+    columnas = list(dict.fromkeys(nombres + ["total_pnl", "trades", "win_rate", "max_drawdown", "sharpe"]))
+    agregado = resultados.groupby(parametros, dropna=False)[columnas].agg(agregacion).reset_index()
+    return agregado.sort_values(nombres, ascending=[m.startswith("-") for m in metricas]).reset_index(drop=True)
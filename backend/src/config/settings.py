@@ -9,11 +9,78 @@ API_SECRET = os.getenv("BINANCE_API_SECRET")
 SYMBOL = os.getenv("SYMBOL", "BTCUSDT").upper()
 INTERVAL = "1m"
 
+# Numero de velas que se mantienen en memoria por estrategia en ejecucion
+CANDLE_BUFFER_SIZE = 100
+# Velas de historial usadas para sembrar los indicadores al arrancar una estrategia
+HISTORY_WARMUP_BARS = int(os.getenv("HISTORY_WARMUP_BARS", 1000))
+# Directorio del almacen local de velas
+KLINE_STORE_DIR = os.getenv("KLINE_STORE_DIR", "data/klines")
+# Hueco maximo (en velas) que se rellena desde la ultima vela guardada; si es mayor se empieza un tramo nuevo
+KLINE_STORE_MAX_GAP = int(os.getenv("KLINE_STORE_MAX_GAP", 20000))
+
 INITIAL_BALANCE = 100
 RISK_PERCENTAGE = 0.025
 SL_DOLLAR = 0.10
 TP_DOLLAR = 0.
 
+# Modo de ejecucion de las estrategias: "shared" (tareas sobre un pool fijo de event loops)
+# o "threads" (un hilo con su propio event loop por estrategia)
+STRATEGY_RUNTIME_MODE = os.getenv("STRATEGY_RUNTIME_MODE", "shared").lower()
+STRATEGY_EVENT_LOOPS = int(os.getenv("STRATEGY_EVENT_LOOPS", 1))
+# Hilos para el trabajo bloqueante de las estrategias (REST, pandas)
+STRATEGY_EXECUTOR_WORKERS = int(os.getenv("STRATEGY_EXECUTOR_WORKERS", 8))
+
+# Numero de procesos entre los que se reparten las estrategias por hash del simbolo (0 = desactivado)
+STRATEGY_SHARDS = int(os.getenv("STRATEGY_SHARDS", 0))
+
+# Streams por conexion combinada del hub de websockets de Binance
+WS_MAX_STREAMS_PER_CONNECTION = 200
+
+# Intervalos que se construyen en memoria a partir del stream de 1m (sin suscripcion propia a Binance); vacio = desactivado
+CANDLE_AGGREGATION_TIMEFRAMES = [tf for tf in os.getenv("CANDLE_AGGREGATION_TIMEFRAMES", "3m,5m,15m,30m,1h,4h,1d").split(",") if tf]
+
+# Scanner de mercado: ultimas velas de todos los simbolos en TRADING evaluadas en bloque al cierre de cada vela
+SCANNER_INTERVAL = os.getenv("SCANNER_INTERVAL", "1m")
+SCANNER_BARS = int(os.getenv("SCANNER_BARS", 100))  # velas por simbolo en la matriz
+SCANNER_GRACE = float(os.getenv("SCANNER_GRACE", 2))  # seconds de espera tras el primer cierre para recibir el resto
+SCANNER_TOP = int(os.getenv("SCANNER_TOP", 20))
+SCANNER_WARMUP_WORKERS = int(os.getenv("SCANNER_WARMUP_WORKERS", 8))
+
+# Conexiones keep-alive del pool HTTP usado para enviar ordenes
+ORDER_HTTP_POOL_SIZE = int(os.getenv("ORDER_HTTP_POOL_SIZE", 20))
+
+# Cola de envio por cliente WebSocket y politica cuando se llena: drop_oldest, conflate o disconnect
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", 256))
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+
+# Frecuencia (Hz) con la que se envian las actualizaciones de la vela en formacion por candle-stream
+CANDLE_STREAM_HZ = float(os.getenv("CANDLE_STREAM_HZ", 4))
+CANDLE_STREAM_MAX_HZ = 20
+# Mensajes maximos por frame cuando un cliente pide ?batch=N
+WS_MAX_BATCH = 100
+
+# Comisiones del exchange simulado (modo test): taker para MARKET/STOP_MARKET, maker para LIMIT
+PAPER_TAKER_FEE = float(os.getenv("PAPER_TAKER_FEE", 0.0004))
+PAPER_MAKER_FEE = float(os.getenv("PAPER_MAKER_FEE", 0.0002))
+
+# Operaciones que se conservan en memoria para el status-stream (snapshot y reanudacion)
+TRADE_JOURNAL_SIZE = int(os.getenv("TRADE_JOURNAL_SIZE", 5000))
+
+# Segundos que se considera vigente el catalogo de simbolos (exchange info) antes de refrescarlo
+SYMBOL_CATALOG_TTL = int(os.getenv("SYMBOL_CATALOG_TTL", 3600))
+
+# API REST de Binance Futures y antiguedad maxima (s) de un ticker en cache antes de pedirlo por REST
+BINANCE_FUTURES_REST_URL = os.getenv("BINANCE_FUTURES_REST_URL", "https://fapi.binance.com")
+TICKER_MAX_AGE = float(os.getenv("TICKER_MAX_AGE", 60))
+
+# Checkpoints del estado de las estrategias para reanudarlas al reiniciar. Desactivado por defecto:
+# al arrancar se relanzan todas las estrategias que seguian en ejecucion, tambien las reales (test=False)
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "")
+CHECKPOINT_INTERVAL = float(os.getenv("CHECKPOINT_INTERVAL", 30))  # seconds
+
+# Si se define, cada estrategia graba los mensajes kline recibidos en <dir>/<SYMBOL>_<interval>.jsonl (para replay)
+KLINE_RECORD_DIR = os.getenv("KLINE_RECORD_DIR")
+
 MAX_RETRIES = 5
 RETRY_DELAY = 5  # seconds
 
@@ -22,4 +89,13 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
\ No newline at end of file
+DB_PORT = os.getenv("DB_PORT")
+# URL completa opcional (p.ej. sqlite:///data/trading.db para pruebas locales); si falta se arma la de Postgres
+DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+
+# Persistencia diferida de ordenes: se escribe en lotes por tamaño o por tiempo
+PERSISTENCE_BATCH_SIZE = int(os.getenv("PERSISTENCE_BATCH_SIZE", 200))
+PERSISTENCE_FLUSH_INTERVAL = float(os.getenv("PERSISTENCE_FLUSH_INTERVAL", 1.0))  # seconds
+PERSISTENCE_QUEUE_SIZE = int(os.getenv("PERSISTENCE_QUEUE_SIZE", 10000))
\ No newline at end of file
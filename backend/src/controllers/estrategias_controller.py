@@ -2,7 +2,7 @@
 # Controlador para manejar las rutas relacionadas con las estrategias de trading
 from fastapi import APIRouter
 from src.models.strategy import StrategyEntity
-from src.services.strategy_service import execute_strategy, get_available_strategies, stop_strategy
+from src.services.strategy_service import execute_strategy, get_available_strategies, get_strategies_status, stop_strategy
 
 router = APIRouter()
 
@@ -12,6 +12,11 @@ async def ejecutar_estrategia(req: StrategyEntity):
     resultado = await execute_strategy(req.symbol, req.strategy, req.timeframe, req.test)
     return resultado
 
+@router.get("/estado")
+async def estado_estrategias():
+    resultado = await get_strategies_status()
+    return resultado
+
 @router.get("/listar-estrategias")
 async def listar_estrategias():
     resultado = await get_available_strategies()
@@ -5,20 +5,75 @@ from src.services.strategy_service import (
     execute_strategy, 
     get_available_strategies,
     get_symbols,
+    get_symbol_info,
     get_market_data,
     stop_strategy,
     )
+from core.market_data.daily_cache import daily_ema_cache
+from src.services.ws_manager import ws_manager
+from src.services.candle_conflator import candle_conflator
+from core.trade_manager.trade_journal import trade_journal
+from core.trade_manager.paper_exchange import paper_exchange
+from src.services.persistence import persistence_worker
+from src.services.market_data_service import ticker_cache
+from src.services.market_scanner import market_scanner
 
 router = APIRouter()
 
 
 @router.get("/symbols")
-async def obtener_simbolos(q: str = Query(None, min_length=1)):
-    resultado = await get_symbols(q)
+async def obtener_simbolos(q: str = Query(None, min_length=1), limit: int = Query(None, ge=1)):
+    resultado = await get_symbols(q, limit)
+    return resultado
+
+
+@router.get("/symbols/{symbol}")
+async def obtener_info_simbolo(symbol: str):
+    resultado = await get_symbol_info(symbol)
     return resultado
 
 
 @router.get("/market-data/{symbol}")
 async def obtener_data_mercado(symbol: str):
     resultado = await get_market_data(symbol)
-    return resultado
\ No newline at end of file
+    return resultado
+
+
+@router.get("/scanner")
+async def obtener_scanner():
+    return {"success": True, "data": market_scanner.ultimo, "estado": market_scanner.estadisticas()}
+
+
+@router.get("/cache/tickers")
+async def obtener_estadisticas_tickers():
+    return {"success": True, "data": ticker_cache.estadisticas()}
+
+
+@router.get("/operations")
+async def obtener_operaciones(symbol: str = None, strategy: str = None, since: int = Query(0, ge=0), limit: int = Query(None, ge=1)):
+    data = trade_journal.consultar(symbol=symbol, strategy=strategy, desde=since, limite=limit)
+    return {"success": True, "seq": trade_journal.ultimo_seq, "data": data}
+
+
+@router.get("/paper/cuenta")
+async def obtener_cuenta_paper(symbol: str = None):
+    data = paper_exchange.resumen()
+    data["ordenes"] = paper_exchange.futures_get_open_orders(symbol=symbol)
+    return {"success": True, "data": data}
+
+
+@router.get("/cache/ema-diaria")
+async def obtener_estadisticas_ema_diaria():
+    return {"success": True, "data": daily_ema_cache.estadisticas()}
+
+
+@router.get("/ws/estadisticas")
+async def obtener_estadisticas_ws():
+    data = ws_manager.estadisticas()
+    data["conflacion"] = candle_conflator.estadisticas()
+    return {"success": True, "data": data}
+
+
+@router.get("/persistence/estadisticas")
+async def obtener_estadisticas_persistencia():
+    return {"success": True, "data": persistence_worker.estadisticas()}
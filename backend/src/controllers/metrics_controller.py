@@ -0,0 +1,44 @@
+# src/controllers/metrics_controller.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from metrics import registro, gauge, contador
+from src.services.strategy_service import strategy_runner
+from src.services.ws_manager import ws_manager
+from src.services.persistence import persistence_worker
+from src.wsclients.stream_hub import stream_hub
+from core.trade_manager.trade_journal import trade_journal
+from indicators.graph import indicator_graphs
+
+router = APIRouter()
+
+# Gauges calculados en cada scrape a partir del estado de los servicios
+gauge("trading_strategies_running", "Estrategias en ejecucion", funcion=lambda: strategy_runner.en_ejecucion())
+gauge("trading_ws_clients", "Clientes WebSocket conectados por grupo", ("group",),
+      funcion=lambda: {(group,): len(clientes) for group, clientes in list(ws_manager.active_connections.items())})
+gauge("trading_ws_send_queue_depth", "Mensajes pendientes en las colas de envio por grupo", ("group",),
+      funcion=lambda: {(group,): sum(len(c.cola) for c in list(clientes)) for group, clientes in list(ws_manager.active_connections.items())})
+contador("trading_ws_messages_dropped", "Mensajes descartados por clientes lentos por grupo desde el arranque", ("group",),
+         funcion=lambda: {(group,): total for group, total in ws_manager.descartados_por_grupo().items()})
+gauge("trading_persistence_queue_depth", "Operaciones pendientes de escribir en base de datos",
+      funcion=lambda: persistence_worker.estadisticas()["en_cola"])
+gauge("trading_trade_journal_entries", "Operaciones en el journal en memoria", funcion=lambda: len(trade_journal))
+gauge("trading_binance_streams", "Streams suscritos en Binance", funcion=lambda: stream_hub.estadisticas()["streams"])
+gauge("trading_indicator_nodes", "Indicadores unicos calculados por simbolo y temporalidad", ("graph",),
+      funcion=lambda: {(grafo,): len(nodos) for grafo, nodos in indicator_graphs.stats().items()})
+
+LATENCIAS = ("trading_signal_to_order_seconds", "trading_order_leg_seconds", "trading_stage_seconds",
+             "trading_kline_receive_lag_seconds", "trading_kline_queue_dwell_seconds", "trading_broadcast_seconds")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metricas_prometheus():
+    return PlainTextResponse(registro.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/api/metrics/latencias")
+async def resumen_latencias():
+    """
+    p50/p99 estimados de los histogramas de latencia (en ms), para consulta rapida sin Prometheus.
+    """
+    data = {nombre: registro.obtener(nombre).resumen() for nombre in LATENCIAS if registro.obtener(nombre) is not None}
+    return {"success": True, "data": data}
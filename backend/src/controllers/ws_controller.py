@@ -1,13 +1,41 @@
 # src/controllers/ws_controller.py
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
+from config.settings import CANDLE_STREAM_HZ, CANDLE_STREAM_MAX_HZ, WS_MAX_BATCH
 from src.services.ws_manager import ws_manager
+from src.services.ws_formats import codificar, formato_disponible, saludo
+from src.services.market_candles import market_candles
+from src.services.market_scanner import market_scanner, GRUPO as GRUPO_SCANNER
+from core.trade_manager.trade_journal import trade_journal
 
 router = APIRouter()
 
+# format: json (por defecto), array (posicional, esquema en el saludo) o msgpack
+# batch: mensajes maximos por frame; con batch > 1 cada frame es una lista
+
 # Para status stream (ordenes nuevas)
+# since: ultimo `seq` recibido; al reconectar solo llegan las operaciones posteriores
 @router.websocket("/status-stream")
-async def websocket_endpoint(websocket: WebSocket):
-    await ws_manager.connect(websocket, group="status")
+async def websocket_endpoint(websocket: WebSocket, format: str = Query("json"), batch: int = Query(1, ge=1),
+                             since: int = Query(None, ge=0)):
+    formato = formato_disponible(format)
+    batch = min(batch, WS_MAX_BATCH)
+    cliente = await ws_manager.connect(websocket, group="status", formato=formato, batch=batch)
+    if format != "json" or batch > 1:
+        cliente.encolar(codificar(saludo("status", formato, batch, format), formato))
+
+    # Snapshot en un solo mensaje, en el mismo paso del loop en que se registro el cliente:
+    # las operaciones posteriores le llegan como deltas sin huecos ni duplicados
+    desde = since or 0
+    if desde > trade_journal.ultimo_seq:
+        # Secuencia de un proceso anterior: se envia todo lo que hay
+        desde = 0
+    cliente.encolar(codificar({
+        "tipo": "snapshot",
+        "seq": trade_journal.ultimo_seq,
+        "desde": desde,
+        "primer_seq": trade_journal.primer_seq,
+        "operaciones": trade_journal.desde(desde),
+    }, formato))
     try:
         while True:
             await websocket.receive_text()
@@ -15,12 +43,45 @@ async def websocket_endpoint(websocket: WebSocket):
         await ws_manager.disconnect(websocket, group="status")
 
 # Para candle-stream (velas en tiempo real)
+# group: el de una estrategia (symbol + estrategia + timeframe) o velas de mercado "SYMBOL@interval"
 @router.websocket("/candle-stream/{group}")
-async def websocket_endpoint(websocket: WebSocket, group: str): 
-    await ws_manager.connect(websocket, group=group)
-    await websocket.send_json({"message": f"Connected to {group} group"})
+async def websocket_endpoint(websocket: WebSocket, group: str, rate: float = Query(None, ge=0),
+                             format: str = Query("json"), batch: int = Query(1, ge=1)):
+    # rate: actualizaciones por segundo de la vela en formacion (0 = todas)
+    hz = CANDLE_STREAM_HZ if rate is None else min(rate, CANDLE_STREAM_MAX_HZ)
+    formato = formato_disponible(format)
+    batch = min(batch, WS_MAX_BATCH)
+    cliente = await ws_manager.connect(websocket, group=group, hz=hz, formato=formato, batch=batch)
+    # Por la cola del cliente, para no enviar en paralelo con su tarea de envio
+    cliente.encolar(codificar(saludo(group, formato, batch, format), formato))
+    mercado = market_candles.grupo(group) is not None
+    if mercado:
+        await market_candles.agregar_cliente(group)
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        await ws_manager.disconnect(websocket, group=group)
+    finally:
+        if mercado:
+            await market_candles.quitar_cliente(group)
+
+# Para scanner-stream (coincidencias del scanner de mercado al cierre de cada vela)
+# El scanner se inicia con el primer cliente y se detiene con el ultimo
+@router.websocket("/scanner-stream")
+async def websocket_endpoint(websocket: WebSocket, format: str = Query("json"), batch: int = Query(1, ge=1)):
+    formato = formato_disponible(format)
+    batch = min(batch, WS_MAX_BATCH)
+    cliente = await ws_manager.connect(websocket, group=GRUPO_SCANNER, formato=formato, batch=batch)
+    cliente.encolar(codificar(saludo(GRUPO_SCANNER, formato, batch, format), formato))
+    if market_scanner.ultimo is not None:
+        # Ultima pasada, para no esperar al siguiente cierre
+        cliente.encolar(codificar(market_scanner.ultimo, formato))
+    await market_scanner.agregar_cliente()
     try:
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
-        await ws_manager.disconnect(websocket, group=group)
\ No newline at end of file
+        await ws_manager.disconnect(websocket, group=GRUPO_SCANNER)
+    finally:
+        await market_scanner.quitar_cliente()
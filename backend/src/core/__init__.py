@@ -1,4 +1,5 @@
 # src/core/__init__.py
 from .strategy_pattern.base import BaseStrategy
+from .market_data.candle_buffer import CandleBuffer
 from .strategy_pattern.context import ContextStrategy
 from .trade_manager.trade_executor import TradeExecutor
\ No newline at end of file
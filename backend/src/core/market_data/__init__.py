@@ -0,0 +1 @@
+# src/core/market_data/__init__.py
\ No newline at end of file
@@ -0,0 +1,194 @@
+# src/core/market_data/candle_aggregator.py
+from binance.helpers import interval_to_milliseconds
+from config.settings import CANDLE_AGGREGATION_TIMEFRAMES
+import threading
+
+MS_POR_MINUTO = 60 * 1000
+
+
+class BarraAgregada:
+    """
+    Vela de un intervalo mayor construida con velas de 1m.
+
+    Los minutos cerrados se acumulan en `o/h/l/v`; el minuto en formacion se guarda
+    aparte (`parcial`) porque cada actualizacion de Binance trae sus valores acumulados
+    y sustituye a la anterior.
+    """
+
+    __slots__ = ("open_time", "close_time", "o", "h", "l", "c", "v", "primer_minuto", "ultimo_minuto", "parcial", "cerrada")
+
+    def __init__(self, open_time: int, close_time: int):
+        self.open_time = open_time
+        self.close_time = close_time
+        self.o = None
+        self.h = float("-inf")
+        self.l = float("inf")
+        self.c = None
+        self.v = 0.0
+        self.primer_minuto = None
+        self.ultimo_minuto = None
+        self.parcial = None
+        self.cerrada = False
+
+    def agregar_minuto(self, t: int, o: float, h: float, l: float, c: float, v: float):
+        if self.ultimo_minuto is not None and t <= self.ultimo_minuto:
+            return
+        if self.o is None or (self.primer_minuto is not None and t < self.primer_minuto):
+            self.o = o
+        self.primer_minuto = t if self.primer_minuto is None else min(self.primer_minuto, t)
+        self.ultimo_minuto = t
+        self.h = max(self.h, h)
+        self.l = min(self.l, l)
+        self.c = c
+        self.v += v
+
+    def sembrar(self, minutos: list):
+        """
+        Agrega minutos cerrados anteriores al primero recibido por el stream
+        (la suscripcion empezo con la vela ya en curso).
+        """
+        anteriores = [m for m in minutos if self.primer_minuto is None or m[0] < self.primer_minuto]
+        if not anteriores:
+            return
+        if self.primer_minuto is None:
+            for m in anteriores:
+                self.agregar_minuto(*m)
+            return
+        self.o = anteriores[0][1]
+        self.primer_minuto = anteriores[0][0]
+        self.h = max([self.h] + [m[2] for m in anteriores])
+        self.l = min([self.l] + [m[3] for m in anteriores])
+        self.v += sum(m[5] for m in anteriores)
+
+    def kline(self, symbol: str, interval: str, evento: int = None) -> dict:
+        """
+        Mensaje con la misma forma que un evento kline de Binance.
+        """
+        o, h, l, c, v = self.o, self.h, self.l, self.c, self.v
+        if self.parcial is not None:
+            _, po, ph, pl, pc, pv = self.parcial
+            o = po if o is None else o
+            h, l, c, v = max(h, ph), min(l, pl), pc, v + pv
+        return {
+            "e": "kline",
+            "E": evento if evento is not None else self.close_time,
+            "s": symbol,
+            "k": {
+                "t": self.open_time,
+                "T": self.close_time,
+                "s": symbol,
+                "i": interval,
+                "o": str(o),
+                "h": str(h),
+                "l": str(l),
+                "c": str(c),
+                "v": str(v),
+                "x": self.cerrada,
+            },
+        }
+
+
+class CandleAggregator:
+    """
+    Construye velas de 3m, 5m, ... 1d en memoria a partir del stream de 1m de cada simbolo.
+
+    Para cada vela de 1m recibida (en formacion o cerrada) devuelve la vela en curso de
+    cada intervalo pedido y, cuando cierra el ultimo minuto del intervalo, la vela cerrada
+    con `x=True`. Si se pierde ese ultimo minuto, la vela se cierra al llegar el primer
+    minuto del intervalo siguiente. Es segura entre hilos.
+    """
+
+    def __init__(self, timeframes: list = CANDLE_AGGREGATION_TIMEFRAMES):
+        self.timeframes = tuple(timeframes)
+        self._ms = {tf: interval_to_milliseconds(tf) for tf in self.timeframes}
+        self._barras: dict[tuple, BarraAgregada] = {}
+        self._lock = threading.Lock()
+
+    def soporta(self, interval: str) -> bool:
+        return interval in self._ms
+
+    def inicio(self, interval: str, timestamp_ms: int) -> int:
+        """
+        open_time de la vela de `interval` que contiene `timestamp_ms` (alineada a UTC, como Binance).
+        """
+        return timestamp_ms - timestamp_ms % self._ms[interval]
+
+    def procesar(self, k: dict, intervalos, evento: int = None) -> list[tuple[str, dict]]:
+        """
+        Incorpora una vela de 1m (el campo `k` de un evento kline) y devuelve
+        (interval, mensaje) para cada intervalo de `intervalos`, en orden.
+        """
+        symbol = k["s"]
+        t = int(k["t"])
+        minuto = (t, float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]))
+        cerrado = k["x"]
+        salida = []
+        with self._lock:
+            for interval in intervalos:
+                ms = self._ms.get(interval)
+                if ms is None:
+                    continue
+                inicio = t - t % ms
+                clave = (symbol, interval)
+                barra = self._barras.get(clave)
+                if barra is not None and barra.open_time < inicio:
+                    if not barra.cerrada:
+                        # No llego el cierre del ultimo minuto: se da por cerrada con lo que hay
+                        barra.parcial = None
+                        barra.cerrada = True
+                        salida.append((interval, barra.kline(symbol, interval, evento)))
+                    barra = None
+                if barra is None:
+                    barra = self._barras[clave] = BarraAgregada(inicio, inicio + ms - 1)
+                if barra.cerrada or inicio < barra.open_time:
+                    continue
+
+                if cerrado:
+                    barra.parcial = None
+                    barra.agregar_minuto(*minuto)
+                    barra.cerrada = t + MS_POR_MINUTO >= inicio + ms
+                else:
+                    barra.parcial = minuto
+                salida.append((interval, barra.kline(symbol, interval, evento)))
+        return salida
+
+    def sembrar(self, symbol: str, interval: str, klines: list):
+        """
+        Completa la vela en curso con minutos cerrados de 1m (formato REST de Binance),
+        para que una suscripcion iniciada a mitad de vela no la emita incompleta.
+        """
+        if interval not in self._ms or not klines:
+            return
+        with self._lock:
+            ultima = int(klines[-1][0])
+            inicio = ultima - ultima % self._ms[interval]
+            clave = (symbol, interval)
+            barra = self._barras.get(clave)
+            if barra is None:
+                barra = self._barras[clave] = BarraAgregada(inicio, inicio + self._ms[interval] - 1)
+            if barra.open_time != inicio or barra.cerrada:
+                return
+            minutos = [
+                (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+                for k in klines if inicio <= int(k[0]) < inicio + self._ms[interval]
+            ]
+            barra.sembrar(minutos)
+            if barra.ultimo_minuto is not None and barra.ultimo_minuto + MS_POR_MINUTO > barra.close_time:
+                # Los minutos sembrados ya completan la vela: no se vuelve a emitir como cerrada
+                barra.cerrada = True
+
+    def en_curso(self, symbol: str, interval: str) -> dict:
+        with self._lock:
+            barra = self._barras.get((symbol, interval))
+            if barra is None or (barra.o is None and barra.parcial is None):
+                return None
+            return barra.kline(symbol, interval)
+
+    def olvidar(self, symbol: str, interval: str = None):
+        with self._lock:
+            for clave in [c for c in self._barras if c[0] == symbol and (interval is None or c[1] == interval)]:
+                del self._barras[clave]
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {"timeframes": list(self.timeframes), "velas_en_curso": len(self._barras)}
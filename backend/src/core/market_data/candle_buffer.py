@@ -0,0 +1,133 @@
+# src/core/market_data/candle_buffer.py
+from config.settings import CANDLE_BUFFER_SIZE
+import numpy as np
+import pandas as pd
+
+
+class CandleBuffer:
+    """
+    Buffer circular de velas OHLCV con capacidad fija, respaldado por NumPy.
+
+    Cada vela se escribe dos veces (en `i` y en `i + capacity`), de modo que la
+    ventana cronologica siempre es un slice contiguo del array: las columnas se
+    exponen como vistas sin copia y `append` nunca reserva memoria nueva.
+    """
+
+    COLUMNAS = ("open_time", "open", "high", "low", "close", "volume", "close_time")
+
+    def __init__(self, symbol: str, interval: str, capacity: int = CANDLE_BUFFER_SIZE):
+        if capacity < 1:
+            raise ValueError("La capacidad del buffer debe ser mayor que cero")
+        self.symbol = symbol
+        self.interval = interval
+        self.capacity = capacity
+        self._indices = {columna: i for i, columna in enumerate(self.COLUMNAS)}
+        self._data = np.zeros((len(self.COLUMNAS), 2 * capacity), dtype=np.float64)
+        self._head = 0  # Proxima posicion de escritura en [0, capacity)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, columna: str) -> np.ndarray:
+        return self.columna(columna)
+
+    @property
+    def last_open_time(self):
+        return int(self._data[0, self._head - 1 + self.capacity]) if self._size else None
+
+    def columna(self, columna: str) -> np.ndarray:
+        """
+        Devuelve una vista de solo lectura (sin copia) de la columna en orden cronologico.
+        """
+        fila = self._data[self._indices[columna]]
+        if self._size < self.capacity:
+            vista = fila[:self._size]
+        else:
+            vista = fila[self._head:self._head + self.capacity]
+        vista = vista.view()
+        vista.flags.writeable = False
+        return vista
+
+    def append(self, vela: dict):
+        """
+        Agrega una vela cerrada. Si llega otra vez la misma `open_time` (p.ej. la vela
+        en formacion del historial) se sobrescribe la ultima en lugar de duplicarla;
+        las velas mas antiguas que la ultima se ignoran.
+        """
+        ultima = self.last_open_time
+        if ultima is not None and vela["open_time"] <= ultima:
+            if vela["open_time"] < ultima:
+                return
+            pos = (self._head - 1) % self.capacity
+        else:
+            pos = self._head
+            self._head = (self._head + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+        data = self._data
+        espejo = pos + self.capacity
+        for i, columna in enumerate(self.COLUMNAS):
+            valor = vela[columna]
+            data[i, pos] = valor
+            data[i, espejo] = valor
+
+    def cargar(self, df: pd.DataFrame):
+        """
+        Carga las ultimas `capacity` filas de un DataFrame de historial
+        (como el que devuelve `obtener_historial_inicial`).
+        """
+        df = df.iloc[-self.capacity:]
+        open_time = df["open_time"] if "open_time" in df else df["timestamp"]
+        columnas = {
+            "open_time": open_time,
+            "open": df["open"],
+            "high": df["high"],
+            "low": df["low"],
+            "close": df["close"],
+            "volume": df["volume"],
+            "close_time": df["close_time"],
+        }
+        valores = {columna: serie.to_numpy(dtype=np.float64) for columna, serie in columnas.items()}
+        for i in range(len(df)):
+            self.append({columna: valores[columna][i] for columna in self.COLUMNAS})
+
+    def exportar(self) -> np.ndarray:
+        """
+        Copia de la ventana (columnas x velas) en orden cronologico, p.ej. para un checkpoint.
+        """
+        return np.stack([self.columna(columna) for columna in self.COLUMNAS])
+
+    def importar(self, datos: np.ndarray):
+        """
+        Reemplaza el contenido con un array (columnas x velas) como el de `exportar`.
+        """
+        datos = np.asarray(datos, dtype=np.float64)[:, -self.capacity:]
+        n = datos.shape[1]
+        self._data[:, :n] = datos
+        self._data[:, self.capacity:self.capacity + n] = datos
+        self._head = n % self.capacity
+        self._size = n
+
+    def ultima(self) -> dict:
+        """
+        Devuelve la vela mas reciente como diccionario.
+        """
+        if not self._size:
+            return None
+        pos = self._head - 1 + self.capacity
+        vela = {columna: float(self._data[i, pos]) for i, columna in enumerate(self.COLUMNAS)}
+        vela["open_time"] = int(vela["open_time"])
+        vela["close_time"] = int(vela["close_time"])
+        vela["symbol"] = self.symbol
+        return vela
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Adaptador a pandas para el codigo que todavia espera un DataFrame.
+        """
+        df = pd.DataFrame({columna: self.columna(columna) for columna in self.COLUMNAS})
+        df["open_time"] = df["open_time"].astype(np.int64)
+        df["close_time"] = df["close_time"].astype(np.int64)
+        df["symbol"] = self.symbol
+        return df
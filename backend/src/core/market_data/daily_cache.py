@@ -0,0 +1,127 @@
+# src/core/market_data/daily_cache.py
+from binance.client import Client
+from indicators.ema import ema_gpt
+import pandas as pd
+import threading
+import time
+
+MS_POR_DIA = 24 * 60 * 60 * 1000
+
+
+def inicio_dia_utc(timestamp_ms: int = None) -> int:
+    """
+    Devuelve el open_time (ms) de la vela diaria UTC que contiene `timestamp_ms` (por defecto, ahora).
+    """
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
+    return timestamp_ms - timestamp_ms % MS_POR_DIA
+
+
+class EmaDiaria:
+    """
+    EMA de los cierres diarios ya completados de un simbolo.
+
+    La vela diaria en formacion no se guarda: su cierre es el precio actual, asi
+    que el ultimo paso de la EMA se calcula al leer con `valor(close_actual)`.
+    """
+
+    def __init__(self, symbol: str, dia: int, period: int, emas: list):
+        self.symbol = symbol
+        self.dia = dia
+        self.multiplier = 2 / (period + 1)
+        self.emas = emas  # Ultimos valores de la EMA sobre dias cerrados (el mas reciente al final)
+
+    def valor(self, close_actual: float) -> float:
+        """
+        EMA diaria incluyendo el dia en curso con `close_actual` como cierre.
+        """
+        if not self.emas:
+            return close_actual
+        return (close_actual * self.multiplier) + (self.emas[-1] * (1 - self.multiplier))
+
+    def serie(self, close_actual: float, n: int = 3) -> list:
+        """
+        Ultimos `n` valores de la EMA diaria, el ultimo de ellos el del dia en curso.
+        """
+        return (self.emas + [self.valor(close_actual)])[-n:]
+
+
+class DailyEmaCache:
+    """
+    Cache en memoria, por simbolo, de la EMA diaria usada como filtro de tendencia.
+
+    Solo se consulta a Binance cuando la vela diaria cambia (o en el primer acceso);
+    el resto de lecturas salen de memoria. Es segura entre hilos y se comparte entre
+    todas las estrategias del proceso.
+    """
+
+    def __init__(self, period: int = 20, limit: int = 50):
+        self.period = period
+        self.limit = limit
+        self.hits = 0
+        self.misses = 0
+        self._entradas: dict[str, EmaDiaria] = {}
+        self._lock = threading.Lock()
+        self._locks_simbolo: dict[str, threading.Lock] = {}
+
+    def _lock_de(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._locks_simbolo.setdefault(symbol, threading.Lock())
+
+    def obtener(self, symbol: str, client: Client, timestamp_ms: int = None) -> EmaDiaria:
+        """
+        Devuelve la EMA diaria de `symbol`, refrescandola si la vela diaria ya rodo.
+        `timestamp_ms` fija el momento de la consulta (por defecto, ahora).
+        """
+        dia = inicio_dia_utc(timestamp_ms)
+        entrada = self._entradas.get(symbol)
+        if entrada is not None and entrada.dia == dia:
+            self.hits += 1
+            return entrada
+
+        # Un solo hilo por simbolo va a Binance; el resto espera y reutiliza el resultado
+        with self._lock_de(symbol):
+            entrada = self._entradas.get(symbol)
+            if entrada is not None and entrada.dia == dia:
+                self.hits += 1
+                return entrada
+
+            self.misses += 1
+            historial = client.get_historical_klines(symbol, Client.KLINE_INTERVAL_1DAY, limit=self.limit)
+            closes = [float(kline[4]) for kline in historial if int(kline[0]) < dia]
+            emas = ema_gpt(pd.Series(closes, dtype=float), self.period).iloc[-2:].tolist() if closes else []
+
+            entrada = EmaDiaria(symbol, dia, self.period, emas)
+            self._entradas[symbol] = entrada
+            return entrada
+
+    def cerrar_dia(self, symbol: str, open_time: int, close: float):
+        """
+        Avanza la EMA con el cierre de la vela diaria `open_time` construida localmente
+        (ver CandleAggregator): al rodar el dia la siguiente lectura no va a Binance.
+        """
+        with self._lock_de(symbol):
+            entrada = self._entradas.get(symbol)
+            if entrada is None or entrada.dia != open_time:
+                return
+            emas = (entrada.emas + [entrada.valor(close)])[-2:]
+            self._entradas[symbol] = EmaDiaria(symbol, open_time + MS_POR_DIA, self.period, emas)
+
+    def invalidar(self, symbol: str = None):
+        with self._lock:
+            if symbol is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(symbol, None)
+
+    def estadisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "symbols": len(self._entradas),
+        }
+
+
+daily_ema_cache = DailyEmaCache()
@@ -0,0 +1,218 @@
+# src/core/market_data/kline_store.py
+from binance.client import Client
+from binance.helpers import interval_to_milliseconds
+from config.settings import KLINE_STORE_DIR, KLINE_STORE_MAX_GAP
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("TRADING_BOT")
+
+COLUMNAS = ("open_time", "open", "high", "low", "close", "volume", "close_time")
+
+
+def _tramo_final(datos: np.ndarray, interval: str) -> np.ndarray:
+    """
+    Ultimo tramo sin huecos de `datos` (columnas x velas): las velas anteriores a un
+    hueco no se mezclan con las posteriores (p.ej. un historial sembrado despues de dias parado).
+    """
+    intervalo_ms = interval_to_milliseconds(interval)
+    if intervalo_ms is None or datos.shape[1] < 2:
+        return datos
+    huecos = np.flatnonzero(np.diff(datos[0]) > intervalo_ms)
+    return datos[:, huecos[-1] + 1:] if len(huecos) else datos
+
+
+class KlineStore:
+    """
+    Almacen local de velas cerradas por simbolo/intervalo.
+
+    Cada particion es un fichero `.npy` columnar (una fila del array por columna OHLCV)
+    en `<directorio>/<SYMBOL>/<interval>/<periodo>.npy`, mensual para intervalos
+    intradia y anual para el resto. La lectura usa memory-map, y al sincronizar solo
+    se descargan las velas posteriores a la ultima guardada.
+    """
+
+    def __init__(self, directorio: str = KLINE_STORE_DIR):
+        self.directorio = directorio
+        self._lock = threading.Lock()
+        self._locks: dict[tuple, threading.Lock] = {}
+
+    def _lock_de(self, symbol: str, interval: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    def _ruta(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.directorio, symbol.upper(), interval)
+
+    @staticmethod
+    def _particion(open_time_ms: int, interval: str) -> str:
+        fecha = datetime.fromtimestamp(open_time_ms / 1000, tz=timezone.utc)
+        if interval_to_milliseconds(interval) < 60 * 60 * 1000:
+            return f"{fecha.year:04d}-{fecha.month:02d}"
+        return f"{fecha.year:04d}"
+
+    def _particiones(self, symbol: str, interval: str) -> list[str]:
+        ruta = self._ruta(symbol, interval)
+        if not os.path.isdir(ruta):
+            return []
+        return sorted(os.path.join(ruta, f) for f in os.listdir(ruta) if f.endswith(".npy"))
+
+    def ultima_open_time(self, symbol: str, interval: str):
+        particiones = self._particiones(symbol, interval)
+        if not particiones:
+            return None
+        datos = np.load(particiones[-1], mmap_mode="r")
+        return int(datos[0, -1]) if datos.shape[1] else None
+
+    def primera_open_time(self, symbol: str, interval: str):
+        particiones = self._particiones(symbol, interval)
+        if not particiones:
+            return None
+        datos = np.load(particiones[0], mmap_mode="r")
+        return int(datos[0, 0]) if datos.shape[1] else None
+
+    def inicio_tramo_final(self, symbol: str, interval: str):
+        """
+        open_time de la primera vela del ultimo tramo sin huecos (None si no hay velas).
+        """
+        intervalo_ms = interval_to_milliseconds(interval)
+        inicio, siguiente = None, None
+        for particion in reversed(self._particiones(symbol, interval)):
+            tiempos = np.load(particion, mmap_mode="r")[0]
+            if not len(tiempos):
+                continue
+            if siguiente is not None and siguiente - tiempos[-1] > intervalo_ms:
+                break
+            tramo = _tramo_final(tiempos[None, :], interval)[0]
+            inicio, siguiente = int(tramo[0]), int(tramo[0])
+            if len(tramo) < len(tiempos):
+                break
+        return inicio
+
+    def ultimas(self, symbol: str, interval: str, n: int) -> np.ndarray:
+        """
+        Las `n` velas mas recientes como array (columnas x velas), sin cruzar huecos del
+        almacen. Solo se leen del disco las particiones necesarias y solo se copian las filas pedidas.
+        """
+        trozos, total = [], 0
+        for particion in reversed(self._particiones(symbol, interval)):
+            datos = np.load(particion, mmap_mode="r")
+            falta = n - total
+            trozos.append(datos[:, -falta:] if datos.shape[1] > falta else datos)
+            total += trozos[-1].shape[1]
+            if total >= n:
+                break
+        if not trozos:
+            return np.empty((len(COLUMNAS), 0))
+        return _tramo_final(np.concatenate(trozos[::-1], axis=1), interval)
+
+    def rango(self, symbol: str, interval: str, desde_ms: int, hasta_ms: int = None) -> np.ndarray:
+        """
+        Velas con open_time en [desde_ms, hasta_ms] como array (columnas x velas); si el
+        almacen tiene un hueco en ese rango solo se devuelve el tramo posterior.
+        """
+        hasta_ms = hasta_ms if hasta_ms is not None else np.inf
+        desde_particion = self._particion(desde_ms, interval)
+        trozos = []
+        for particion in self._particiones(symbol, interval):
+            if os.path.basename(particion)[:-4] < desde_particion:
+                continue
+            datos = np.load(particion, mmap_mode="r")
+            inicio = np.searchsorted(datos[0], desde_ms, side="left")
+            fin = np.searchsorted(datos[0], hasta_ms, side="right")
+            if fin > inicio:
+                trozos.append(datos[:, inicio:fin])
+        if not trozos:
+            return np.empty((len(COLUMNAS), 0))
+        return _tramo_final(np.concatenate(trozos, axis=1), interval)
+
+    def guardar(self, symbol: str, interval: str, klines: list):
+        """
+        Agrega klines (formato REST de Binance) a sus particiones. Las repetidas se
+        reemplazan y cada particion se reescribe de forma atomica.
+        """
+        if not klines:
+            return
+        nuevas = np.array([[float(k[i]) for i in (0, 1, 2, 3, 4, 5, 6)] for k in klines]).T
+        ruta = self._ruta(symbol, interval)
+        os.makedirs(ruta, exist_ok=True)
+
+        claves = np.array([self._particion(int(t), interval) for t in nuevas[0]])
+        for clave in np.unique(claves):
+            archivo = os.path.join(ruta, f"{clave}.npy")
+            bloque = nuevas[:, claves == clave]
+            if os.path.exists(archivo):
+                bloque = np.concatenate([np.load(archivo), bloque], axis=1)
+            # Ordenar por open_time y quedarse con la ultima version de cada vela
+            orden = np.argsort(bloque[0], kind="stable")
+            bloque = bloque[:, orden]
+            _, ultimos = np.unique(bloque[0][::-1], return_index=True)
+            bloque = bloque[:, np.sort(len(bloque[0]) - 1 - ultimos)]
+
+            temporal = f"{archivo}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporal, "wb") as f:
+                np.save(f, bloque)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, archivo)
+
+    def sincronizar(self, client: Client, symbol: str, interval: str, desde_ms: int) -> int:
+        """
+        Descarga solo las velas cerradas que faltan: las posteriores a la ultima guardada y,
+        si se piden datos anteriores al ultimo tramo sin huecos, los que faltan antes de el.
+        Devuelve cuantas velas se agregaron.
+        """
+        intervalo_ms = interval_to_milliseconds(interval)
+        with self._lock_de(symbol, interval):
+            ahora = int(time.time() * 1000)
+            primera = self.inicio_tramo_final(symbol, interval)
+            ultima = self.ultima_open_time(symbol, interval)
+            klines = []
+
+            # Lo que falta antes del tramo final (datos anteriores a la primera vela o un hueco intermedio)
+            if primera is not None and desde_ms < primera:
+                klines += client.get_historical_klines(symbol, interval, desde_ms, primera - 1)
+
+            # Se continua desde la ultima vela guardada (aunque sea anterior a desde_ms) para no dejar
+            # huecos; solo si el hueco es enorme se empieza un tramo nuevo en desde_ms
+            if ultima is not None and (desde_ms - ultima) // intervalo_ms <= KLINE_STORE_MAX_GAP:
+                inicio = ultima + intervalo_ms
+            else:
+                inicio = desde_ms
+            if inicio + intervalo_ms <= ahora:
+                klines += client.get_historical_klines(symbol, interval, inicio)
+
+            # La vela en formacion no se guarda: todavia puede cambiar
+            cerradas = [k for k in klines if int(k[6]) < ahora]
+            if cerradas:
+                self.guardar(symbol, interval, cerradas)
+                logger.info(f"💾 {symbol} {interval}: {len(cerradas)} velas nuevas en el almacen local")
+            return len(cerradas)
+
+    def obtener(self, client: Client, symbol: str, interval: str, desde_ms: int = None, limite: int = None) -> pd.DataFrame:
+        """
+        Sincroniza el almacen y devuelve las velas pedidas: las `limite` mas recientes,
+        o todas desde `desde_ms`.
+        """
+        intervalo_ms = interval_to_milliseconds(interval)
+        ahora = int(time.time() * 1000)
+        if limite is not None:
+            desde_ms = max(desde_ms or 0, ahora - (limite + 1) * intervalo_ms)
+        if desde_ms is None:
+            raise ValueError("Hay que indicar desde_ms o limite")
+
+        self.sincronizar(client, symbol, interval, desde_ms)
+        datos = self.ultimas(symbol, interval, limite) if limite is not None else self.rango(symbol, interval, desde_ms)
+        df = pd.DataFrame({columna: datos[i] for i, columna in enumerate(COLUMNAS)})
+        df["open_time"] = df["open_time"].astype(np.int64)
+        df["close_time"] = df["close_time"].astype(np.int64)
+        df["symbol"] = symbol
+        return df
+
+
+kline_store = KlineStore()
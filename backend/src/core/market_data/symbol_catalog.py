@@ -0,0 +1,149 @@
+# src/core/market_data/symbol_catalog.py
+from binance.client import Client
+from config.settings import API_KEY, API_SECRET, SYMBOL_CATALOG_TTL
+import bisect
+import logging
+import threading
+import time
+
+logger = logging.getLogger("TRADING_BOT")
+
+
+def _filtro(simbolo: dict, tipo: str) -> dict:
+    for f in simbolo.get("filters", ()):
+        if f.get("filterType") == tipo:
+            return f
+    return {}
+
+
+def _float(valor):
+    return float(valor) if valor not in (None, "") else None
+
+
+class SymbolCatalog:
+    """
+    Catalogo de simbolos de futuros a partir de `futures_exchange_info`.
+
+    Se descarga una vez y se refresca en segundo plano cuando pasa el TTL (mientras
+    tanto se sigue sirviendo la version anterior). La busqueda usa dos indices
+    ordenados con bisect: los simbolos (para prefijos) y todos sus sufijos (un texto
+    esta contenido en un simbolo si y solo si es prefijo de alguno de sus sufijos).
+    """
+
+    def __init__(self, ttl: float = SYMBOL_CATALOG_TTL, client: Client = None):
+        self.ttl = ttl
+        self._client = client
+        self._info: dict[str, dict] = {}
+        self._simbolos: list[str] = []  # Solo TRADING, ordenados
+        self._sufijos: list[tuple[str, str]] = []  # (sufijo, simbolo), ordenados
+        self._cargado_en = None
+        self._lock = threading.Lock()
+        self._refrescando = False
+
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            self._client = Client(api_key=API_KEY, api_secret=API_SECRET)
+        return self._client
+
+    @property
+    def cargado(self) -> bool:
+        return self._cargado_en is not None
+
+    def refrescar(self):
+        """
+        Descarga el exchange info y reconstruye los indices (bloqueante).
+        """
+        exchange_info = self.client.futures_exchange_info()
+
+        info = {}
+        for s in exchange_info["symbols"]:
+            precio = _filtro(s, "PRICE_FILTER")
+            lote = _filtro(s, "LOT_SIZE")
+            info[s["symbol"]] = {
+                "symbol": s["symbol"],
+                "status": s.get("status"),
+                "base_asset": s.get("baseAsset"),
+                "quote_asset": s.get("quoteAsset"),
+                "tick_size": _float(precio.get("tickSize")),
+                "step_size": _float(lote.get("stepSize")),
+                "min_qty": _float(lote.get("minQty")),
+                "min_notional": _float(_filtro(s, "MIN_NOTIONAL").get("notional")),
+                "price_precision": s.get("pricePrecision"),
+                "quantity_precision": s.get("quantityPrecision"),
+            }
+
+        simbolos = sorted(symbol for symbol, datos in info.items() if datos["status"] == "TRADING")
+        sufijos = sorted((symbol[i:], symbol) for symbol in simbolos for i in range(1, len(symbol)))
+
+        # Se reemplazan las referencias de una vez; los lectores nunca ven indices a medias
+        with self._lock:
+            self._info, self._simbolos, self._sufijos = info, simbolos, sufijos
+            self._cargado_en = time.monotonic()
+        logger.info(f"📚 Catalogo de simbolos actualizado: {len(simbolos)} en TRADING")
+
+    def _asegurar(self):
+        if not self.cargado:
+            self.refrescar()
+        elif time.monotonic() - self._cargado_en > self.ttl:
+            self._refrescar_en_segundo_plano()
+
+    def _refrescar_en_segundo_plano(self):
+        with self._lock:
+            if self._refrescando:
+                return
+            self._refrescando = True
+
+        def tarea():
+            try:
+                self.refrescar()
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo refrescar el catalogo de simbolos: {e}")
+            finally:
+                self._refrescando = False
+
+        threading.Thread(target=tarea, name="symbol-catalog", daemon=True).start()
+
+    def simbolos(self) -> list[str]:
+        self._asegurar()
+        return list(self._simbolos)
+
+    def buscar(self, q: str = None, limite: int = None) -> list[str]:
+        """
+        Simbolos en TRADING que contienen `q` (sin distinguir mayusculas): primero los
+        que empiezan por `q` y despues el resto, cada grupo en orden alfabetico.
+        """
+        self._asegurar()
+        simbolos, sufijos = self._simbolos, self._sufijos
+        if not q:
+            return simbolos[:limite] if limite else list(simbolos)
+
+        q = q.upper()
+        i = bisect.bisect_left(simbolos, q)
+        resultado = []
+        while i < len(simbolos) and simbolos[i].startswith(q):
+            resultado.append(simbolos[i])
+            if limite and len(resultado) >= limite:
+                return resultado
+            i += 1
+
+        vistos = set(resultado)
+        otros = set()
+        j = bisect.bisect_left(sufijos, (q,))
+        while j < len(sufijos) and sufijos[j][0].startswith(q):
+            symbol = sufijos[j][1]
+            if symbol not in vistos:
+                otros.add(symbol)
+            j += 1
+        resultado.extend(sorted(otros))
+        return resultado[:limite] if limite else resultado
+
+    def info(self, symbol: str) -> dict:
+        """
+        Tick size, step size, estado, etc. de un simbolo (None si no existe).
+        """
+        self._asegurar()
+        return self._info.get(symbol.upper())
+
+
+symbol_catalog = SymbolCatalog()
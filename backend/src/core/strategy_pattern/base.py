@@ -1,12 +1,76 @@
 # src/core/strategy_pattern/base.py
 from abc import ABC, abstractmethod
+from indicators.graph import IndicatorGraph, indicator_graphs
 
 class BaseStrategy(ABC):
+    # Indicadores que necesita la estrategia, {atributo: Indicator("ema", "close", 9)}. Cada
+    # uno queda disponible como atributo (p.ej. self.ema9) con `value` y, si aplica, `previous`
+    INDICADORES: dict = {}
+
+    def __init__(self):
+        # Sin runtime (benchmarks, llamadas directas) la estrategia calcula sus indicadores en un grafo propio
+        self._compartido = None
+        grafo = IndicatorGraph()
+        self._enlazar(grafo, grafo.require(self.INDICADORES.values()))
+
+    def _enlazar(self, grafo: IndicatorGraph, indicadores: dict):
+        self.grafo = grafo
+        for nombre, spec in self.INDICADORES.items():
+            setattr(self, nombre, indicadores[spec])
+
+    def compartir_indicadores(self, symbol: str, timeframe: str):
+        """
+        Pasa a leer los indicadores del grafo compartido de `symbol`/`timeframe`: cada
+        indicador unico se calcula una sola vez por vela para todas las estrategias.
+        """
+        if self._compartido is not None or not self.INDICADORES:
+            return
+        grafo, indicadores = indicator_graphs.acquire(symbol, timeframe, self.INDICADORES.values())
+        self._compartido = (symbol, timeframe)
+        self._enlazar(grafo, indicadores)
+
+    def liberar_indicadores(self):
+        """
+        Deja de consumir el grafo compartido (los nodos que nadie usa se eliminan).
+        """
+        if self._compartido is None:
+            return
+        indicator_graphs.release(*self._compartido, self.INDICADORES.values())
+        self._compartido = None
 
     @abstractmethod
-    def obtener_historial_inicial(self, symbol, interval='15m', period=50):
+    def obtener_historial_inicial(self, symbol, interval='15m', period=50, limite=None):
         pass
 
+    def preparar_indicadores(self, df):
+        """
+        Inicializa el estado incremental de los indicadores a partir del historial.
+        En un grafo compartido solo se siembran los indicadores que aun no estaban en marcha.
+        """
+        self.grafo.seed(df)
+
+    def actualizar_indicadores(self, vela: dict):
+        """
+        Actualiza los indicadores incrementales con una vela cerrada (una vez por vela
+        aunque varias estrategias del grafo la reciban).
+        """
+        self.grafo.update(vela)
+
+    def estado_indicadores(self):
+        """
+        Estado serializable (JSON) de los indicadores para los checkpoints. None si la
+        estrategia no lo soporta: al restaurar se vuelven a preparar con las velas guardadas.
+        """
+        if not self.INDICADORES:
+            return None
+        return self.grafo.state(self.INDICADORES.values())
+
+    def restaurar_indicadores(self, estado: dict):
+        """
+        Restaura el estado devuelto por `estado_indicadores`.
+        """
+        self.grafo.load_state(self.INDICADORES.values(), estado)
+
     @abstractmethod
     def check_entry(self, data: dict):
         pass
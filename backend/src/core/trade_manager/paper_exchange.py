@@ -0,0 +1,389 @@
+# src/core/trade_manager/paper_exchange.py
+from config.settings import PAPER_TAKER_FEE, PAPER_MAKER_FEE
+from bisect import bisect_left, bisect_right
+import itertools
+import threading
+import time
+
+
+class OrdenPaper:
+    __slots__ = ("order_id", "symbol", "side", "tipo", "cantidad", "nivel", "reduce_only",
+                 "estrategia", "creada", "estado", "precio_ejecucion", "ejecutada", "actualizada", "pnl")
+
+    def __init__(self, order_id, symbol, side, tipo, cantidad, nivel, reduce_only, estrategia, creada):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.side = side
+        self.tipo = tipo
+        self.cantidad = cantidad
+        self.nivel = nivel
+        self.reduce_only = reduce_only
+        self.estrategia = estrategia
+        self.creada = creada
+        self.estado = "NEW"
+        self.precio_ejecucion = 0.0
+        self.ejecutada = 0.0
+        self.actualizada = creada
+        self.pnl = 0.0
+
+    def a_binance(self) -> dict:
+        """
+        Misma forma que la respuesta de futures_create_order. En MARKET, 'price' lleva el
+        precio de ejecucion (Binance devuelve "0") para que el status-stream muestre algo util.
+        """
+        precio = self.precio_ejecucion if self.tipo == "MARKET" else (self.nivel if self.tipo == "LIMIT" else 0.0)
+        return {
+            "orderId": self.order_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "type": self.tipo,
+            "status": self.estado,
+            "price": str(precio),
+            "avgPrice": str(self.precio_ejecucion),
+            "stopPrice": str(self.nivel if self.tipo == "STOP_MARKET" else 0.0),
+            "origQty": str(self.cantidad),
+            "executedQty": str(self.ejecutada),
+            "reduceOnly": self.reduce_only,
+            "timeInForce": "GTC",
+            "updateTime": self.actualizada,
+            "realizedPnl": str(self.pnl),
+            "estrategia": self.estrategia,
+        }
+
+
+class LadoLibro:
+    """
+    Ordenes en espera ordenadas por precio de disparo.
+
+    `sube=True`: se disparan cuando el precio sube hasta su nivel (BUY STOP, SELL LIMIT),
+    es decir, todas las de nivel <= maximo: un prefijo de la lista.
+    `sube=False`: se disparan cuando el precio baja hasta su nivel (SELL STOP, BUY LIMIT),
+    todas las de nivel >= minimo: un sufijo. Cada tick cuesta un bisect mas las disparadas.
+    """
+
+    def __init__(self, sube: bool):
+        self.sube = sube
+        self.precios: list[float] = []
+        self.ordenes: list[OrdenPaper] = []
+
+    def __len__(self):
+        return len(self.ordenes)
+
+    def agregar(self, orden: OrdenPaper):
+        i = bisect_right(self.precios, orden.nivel)
+        self.precios.insert(i, orden.nivel)
+        self.ordenes.insert(i, orden)
+
+    def quitar(self, orden: OrdenPaper) -> bool:
+        i = bisect_left(self.precios, orden.nivel)
+        while i < len(self.precios) and self.precios[i] == orden.nivel:
+            if self.ordenes[i] is orden:
+                del self.precios[i]
+                del self.ordenes[i]
+                return True
+            i += 1
+        return False
+
+    def disparadas(self, maximo: float, minimo: float) -> list[OrdenPaper]:
+        """
+        Extrae las ordenes que el rango [minimo, maximo] alcanza.
+        """
+        if self.sube:
+            i = bisect_right(self.precios, maximo)
+            ordenes = self.ordenes[:i]
+            del self.precios[:i]
+            del self.ordenes[:i]
+        else:
+            i = bisect_left(self.precios, minimo)
+            ordenes = self.ordenes[i:]
+            del self.precios[i:]
+            del self.ordenes[i:]
+        return ordenes
+
+
+class Posicion:
+    """
+    Posicion neta por simbolo (modo one-way): cantidad con signo y precio medio de entrada.
+    """
+
+    def __init__(self):
+        self.cantidad = 0.0
+        self.precio_entrada = 0.0
+        self.pnl_realizado = 0.0
+        self.comisiones = 0.0
+
+    def aplicar(self, side: str, cantidad: float, precio: float) -> float:
+        """
+        Aplica una ejecucion y devuelve el PnL realizado por la parte que reduce la posicion.
+        """
+        delta = cantidad if side == "BUY" else -cantidad
+        pnl = 0.0
+        if self.cantidad == 0 or (self.cantidad > 0) == (delta > 0):
+            total = abs(self.cantidad) + cantidad
+            self.precio_entrada = (abs(self.cantidad) * self.precio_entrada + cantidad * precio) / total
+            self.cantidad += delta
+        else:
+            cerrada = min(cantidad, abs(self.cantidad))
+            signo = 1 if self.cantidad > 0 else -1
+            pnl = cerrada * (precio - self.precio_entrada) * signo
+            self.cantidad += delta
+            if abs(self.cantidad) < 1e-12:
+                self.cantidad = 0.0
+                self.precio_entrada = 0.0
+            elif (self.cantidad > 0) != (signo > 0):
+                # La orden dio la vuelta a la posicion: el resto abre al precio de ejecucion
+                self.precio_entrada = precio
+        self.pnl_realizado += pnl
+        return pnl
+
+    def no_realizado(self, precio: float) -> float:
+        return self.cantidad * (precio - self.precio_entrada) if self.cantidad else 0.0
+
+
+class LibroSimbolo:
+    def __init__(self):
+        self.sube = LadoLibro(sube=True)
+        self.baja = LadoLibro(sube=False)
+        self.posicion = Posicion()
+        self.ultimo_precio: float = None
+        # Marca de tiempo (ms) del ultimo dato de mercado procesado; fecha de creacion de las ordenes
+        self.reloj = 0
+
+    def lado(self, orden: OrdenPaper) -> LadoLibro:
+        # STOP de compra y LIMIT de venta esperan una subida; los contrarios, una bajada
+        if (orden.tipo == "STOP_MARKET") == (orden.side == "BUY"):
+            return self.sube
+        return self.baja
+
+
+class PaperExchange:
+    """
+    Exchange simulado en memoria para el modo test: mismas llamadas que el Client de
+    python-binance para futuros (futures_create_order, futures_cancel_order, ...), pero
+    las ordenes se ejecutan contra las velas del stream (en vivo o de replay).
+
+    - MARKET se ejecuta al ultimo precio conocido del simbolo.
+    - STOP_MARKET y LIMIT esperan en libros ordenados por precio; cada vela dispara las
+      que su rango alcanza. Si una vela alcanza el SL y el TP se asume primero el SL.
+    - Una orden solo se compara con el rango de velas que empezaron despues de crearla;
+      con velas ya en curso solo cuenta el cierre (evita ejecuciones con maximos pasados).
+    - reduceOnly nunca aumenta la posicion; cuando la posicion queda a cero las ordenes
+      reduce-only pendientes del simbolo pasan a EXPIRED.
+    """
+
+    def __init__(self, taker_fee: float = PAPER_TAKER_FEE, maker_fee: float = PAPER_MAKER_FEE):
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self._libros: dict[str, LibroSimbolo] = {}
+        self._ordenes: dict[int, OrdenPaper] = {}
+        self._ids = itertools.count(1)
+        self._ultimo_id = 0
+        self._lock = threading.Lock()
+
+    def _libro(self, symbol: str) -> LibroSimbolo:
+        libro = self._libros.get(symbol)
+        if libro is None:
+            libro = self._libros[symbol] = LibroSimbolo()
+        return libro
+
+    # --- API compatible con binance.client.Client ---
+
+    def futures_create_order(self, symbol: str, side: str, type: str, quantity, price=None, stopPrice=None,
+                             reduceOnly=False, estrategia: str = None, **kwargs) -> dict:
+        tipo = type.upper()
+        if tipo not in ("MARKET", "STOP_MARKET", "LIMIT"):
+            raise ValueError(f"Tipo de orden no soportado en paper trading: {type}")
+        reduce_only = reduceOnly in (True, "true", "TRUE")
+        with self._lock:
+            libro = self._libro(symbol)
+            nivel = float(stopPrice if tipo == "STOP_MARKET" else price or 0.0)
+            self._ultimo_id = next(self._ids)
+            orden = OrdenPaper(self._ultimo_id, symbol, side.upper(), tipo, float(quantity), nivel,
+                               reduce_only, estrategia, libro.reloj or int(time.time() * 1000))
+
+            if tipo == "MARKET":
+                if libro.ultimo_precio is None:
+                    raise ValueError(f"Sin precio de mercado para {symbol}: no se puede ejecutar la orden MARKET")
+                self._ejecutar(libro, orden, libro.ultimo_precio, self.taker_fee, orden.creada)
+            elif reduce_only and not self._reduce(libro.posicion, orden.side):
+                # Igual que Binance: una reduce-only sin posicion que reducir se rechaza
+                orden.estado = "EXPIRED"
+            else:
+                libro.lado(orden).agregar(orden)
+                self._ordenes[orden.order_id] = orden
+            return orden.a_binance()
+
+    def futures_cancel_order(self, symbol: str, orderId: int, **kwargs) -> dict:
+        with self._lock:
+            # Solo se indexan las ordenes en espera: igual que Binance, las ya cerradas no se cancelan
+            orden = self._ordenes.get(int(orderId))
+            if orden is None or orden.symbol != symbol:
+                raise ValueError(f"Orden {orderId} no encontrada o ya cerrada en {symbol}")
+            self._libro(symbol).lado(orden).quitar(orden)
+            del self._ordenes[orden.order_id]
+            orden.estado = "CANCELED"
+            return orden.a_binance()
+
+    def futures_get_open_orders(self, symbol: str = None, **kwargs) -> list[dict]:
+        with self._lock:
+            libros = [self._libros[symbol]] if symbol in self._libros else ([] if symbol else self._libros.values())
+            return [o.a_binance() for libro in libros for lado in (libro.sube, libro.baja) for o in lado.ordenes]
+
+    def futures_position_information(self, symbol: str = None, **kwargs) -> list[dict]:
+        with self._lock:
+            simbolos = [symbol] if symbol else list(self._libros)
+            return [self._posicion(s, self._libros[s]) for s in simbolos if s in self._libros]
+
+    # --- Datos de mercado ---
+
+    def procesar_vela(self, symbol: str, open_time: int, open_: float, high: float, low: float, close: float,
+                      close_time: int = None, cerrada: bool = False) -> list[dict]:
+        """
+        Actualiza el precio del simbolo y ejecuta las ordenes que la vela alcanza.
+        Devuelve las ordenes que cambiaron de estado (FILLED o EXPIRED).
+        """
+        with self._lock:
+            libro = self._libros.get(symbol)
+            if libro is None:
+                libro = self._libro(symbol)
+            libro.ultimo_precio = close
+            libro.reloj = max(libro.reloj, close_time if cerrada and close_time else open_time)
+            if not libro.sube and not libro.baja:
+                return []
+
+            candidatas = libro.sube.disparadas(high, low) + libro.baja.disparadas(high, low)
+            if not candidatas:
+                return []
+            # Stops antes que limits (el peor caso dentro de la vela) y por orden de llegada
+            candidatas.sort(key=lambda o: (o.tipo != "STOP_MARKET", o.order_id))
+
+            eventos = []
+            for orden in candidatas:
+                lado = libro.lado(orden)
+                rango_completo = orden.creada < open_time
+                if not rango_completo and not (close >= orden.nivel if lado.sube else close <= orden.nivel):
+                    lado.agregar(orden)
+                    continue
+                precio = orden.nivel
+                if rango_completo:
+                    # Si la vela abrio mas alla del nivel (gap), se ejecuta a la apertura
+                    precio = max(precio, open_) if lado.sube else min(precio, open_)
+                comision = self.taker_fee if orden.tipo == "STOP_MARKET" else self.maker_fee
+                del self._ordenes[orden.order_id]
+                self._ejecutar(libro, orden, precio, comision, close_time or open_time)
+                eventos.append(orden.a_binance())
+                if libro.posicion.cantidad == 0:
+                    eventos.extend(self._expirar_reduce_only(libro, close_time or open_time))
+            return eventos
+
+    # --- Estado ---
+
+    def resumen(self) -> dict:
+        with self._lock:
+            posiciones = [self._posicion(s, libro) for s, libro in self._libros.items()
+                          if libro.posicion.cantidad or libro.posicion.pnl_realizado]
+            return {
+                "posiciones": posiciones,
+                "ordenes_abiertas": sum(len(l.sube) + len(l.baja) for l in self._libros.values()),
+                "pnl_realizado": sum(l.posicion.pnl_realizado for l in self._libros.values()),
+                "pnl_no_realizado": sum(
+                    l.posicion.no_realizado(l.ultimo_precio) for l in self._libros.values() if l.ultimo_precio is not None
+                ),
+                "comisiones": sum(l.posicion.comisiones for l in self._libros.values()),
+            }
+
+    def estado(self) -> dict:
+        """
+        Posiciones y ordenes en espera como datos planos (JSON), para los checkpoints.
+        """
+        with self._lock:
+            return {
+                "ultimo_id": self._ultimo_id,
+                "libros": {
+                    symbol: {
+                        "posicion": vars(libro.posicion).copy(),
+                        "ultimo_precio": libro.ultimo_precio,
+                        "reloj": libro.reloj,
+                        "ordenes": [
+                            {campo: getattr(orden, campo) for campo in OrdenPaper.__slots__}
+                            for lado in (libro.sube, libro.baja) for orden in lado.ordenes
+                        ],
+                    }
+                    for symbol, libro in self._libros.items()
+                },
+            }
+
+    def restaurar(self, estado: dict):
+        """
+        Reemplaza el estado con uno devuelto por `estado`.
+        """
+        with self._lock:
+            self._libros.clear()
+            self._ordenes.clear()
+            for symbol, datos in estado["libros"].items():
+                libro = self._libro(symbol)
+                vars(libro.posicion).update(datos["posicion"])
+                libro.ultimo_precio = datos["ultimo_precio"]
+                libro.reloj = datos["reloj"]
+                for campos in datos["ordenes"]:
+                    orden = OrdenPaper.__new__(OrdenPaper)
+                    for campo in OrdenPaper.__slots__:
+                        setattr(orden, campo, campos[campo])
+                    libro.lado(orden).agregar(orden)
+                    self._ordenes[orden.order_id] = orden
+            self._ultimo_id = estado["ultimo_id"]
+            self._ids = itertools.count(self._ultimo_id + 1)
+
+    def reiniciar(self):
+        with self._lock:
+            self._libros.clear()
+            self._ordenes.clear()
+
+    # --- Internos (con el lock tomado) ---
+
+    @staticmethod
+    def _reduce(posicion: Posicion, side: str) -> bool:
+        return (posicion.cantidad > 0 and side == "SELL") or (posicion.cantidad < 0 and side == "BUY")
+
+    def _ejecutar(self, libro: LibroSimbolo, orden: OrdenPaper, precio: float, comision: float, ts: int):
+        posicion = libro.posicion
+        cantidad = orden.cantidad
+        if orden.reduce_only:
+            if not self._reduce(posicion, orden.side):
+                orden.estado = "EXPIRED"
+                orden.actualizada = ts
+                return
+            cantidad = min(cantidad, abs(posicion.cantidad))
+        orden.pnl = posicion.aplicar(orden.side, cantidad, precio)
+        posicion.comisiones += cantidad * precio * comision
+        orden.precio_ejecucion = precio
+        orden.ejecutada = cantidad
+        orden.estado = "FILLED"
+        orden.actualizada = ts
+
+    def _expirar_reduce_only(self, libro: LibroSimbolo, ts: int) -> list[dict]:
+        eventos = []
+        for lado in (libro.sube, libro.baja):
+            for orden in [o for o in lado.ordenes if o.reduce_only]:
+                lado.quitar(orden)
+                del self._ordenes[orden.order_id]
+                orden.estado = "EXPIRED"
+                orden.actualizada = ts
+                eventos.append(orden.a_binance())
+        return eventos
+
+    def _posicion(self, symbol: str, libro: LibroSimbolo) -> dict:
+        posicion = libro.posicion
+        return {
+            "symbol": symbol,
+            "positionAmt": str(posicion.cantidad),
+            "entryPrice": str(posicion.precio_entrada),
+            "markPrice": str(libro.ultimo_precio or 0.0),
+            "unRealizedProfit": str(posicion.no_realizado(libro.ultimo_precio) if libro.ultimo_precio is not None else 0.0),
+            "realizedPnl": str(posicion.pnl_realizado),
+            "commission": str(posicion.comisiones),
+        }
+
+
+# Un unico exchange simulado por proceso, compartido por todas las estrategias en modo test
+paper_exchange = PaperExchange()
@@ -1,15 +1,124 @@
 # src/core/trade_manager/trade_executor.py
+from binance.async_client import AsyncClient
 from binance.client import Client
 from binance.enums import SIDE_BUY, SIDE_SELL, ORDER_TYPE_MARKET, TIME_IN_FORCE_GTC
-from config.settings import SYMBOL
+from collections import deque
+from config.settings import SYMBOL, API_KEY, API_SECRET, ORDER_HTTP_POOL_SIZE
+from core.trade_manager.paper_exchange import PaperExchange, paper_exchange
+from metrics import histograma
+import aiohttp
+import asyncio
 import logging
+import time
+
+# Un AsyncClient (sesion HTTP keep-alive) por event loop y entorno, compartido por todos los executors del loop
+_clientes_async: dict[tuple, AsyncClient] = {}
+
+
+async def obtener_cliente_async(testnet: bool = False) -> AsyncClient:
+    loop = asyncio.get_running_loop()
+    clave = (loop, testnet)
+    cliente = _clientes_async.get(clave)
+    if cliente is None:
+        cliente = AsyncClient(
+            api_key=API_KEY,
+            api_secret=API_SECRET,
+            testnet=testnet,
+            loop=loop,
+            session_params={"connector": aiohttp.TCPConnector(limit=ORDER_HTTP_POOL_SIZE, keepalive_timeout=60)},
+        )
+        _clientes_async[clave] = cliente
+    return cliente
+
+
+async def cerrar_clientes_async(loop: asyncio.AbstractEventLoop = None):
+    """
+    Cierra las sesiones HTTP asociadas a `loop` (por defecto, el loop actual).
+    """
+    loop = loop or asyncio.get_running_loop()
+    for clave in [c for c in _clientes_async if c[0] is loop]:
+        await _clientes_async.pop(clave).close_connection()
+
+
+def normalizar_orden(orden: dict) -> dict:
+    """
+    Las ordenes condicionales (STOP_MARKET) se crean en el endpoint de algo orders, que responde
+    con `algoId`, `triggerPrice`, `algoStatus` y `orderType`. Se completan los campos de una orden
+    normal (`orderId`, `stopPrice`, `status`, `type`) para que el resto del bot las trate igual.
+    """
+    if not orden or "algoId" not in orden:
+        return orden
+    return {
+        **orden,
+        "orderId": orden.get("orderId", orden["algoId"]),
+        "stopPrice": orden.get("stopPrice", orden.get("triggerPrice")),
+        "status": orden.get("status", orden.get("algoStatus")),
+        "type": orden.get("type", orden.get("orderType")),
+        "price": orden.get("price", "0"),
+        "executedQty": orden.get("executedQty", "0"),
+    }
+
+
+# Latencia de cada pata de una orden (entry, sl, tp) y total hasta tener la posicion protegida
+LATENCIA_PATA = histograma("trading_order_leg_seconds", "Latencia de cada pata de la orden hasta el ack del exchange", ("leg", "symbol"))
+
 
 class TradeExecutor:
-    def __init__(self, client: Client, symbol: str = SYMBOL, logger: logging.Logger = None, isMock: bool = False):
+    def __init__(self, client: Client, symbol: str = SYMBOL, logger: logging.Logger = None, isMock: bool = False, estrategia: str = None,
+                 exchange: PaperExchange = None):
         self.client = client
         self.symbol = symbol
         self.logger = logger
         self.isMock = isMock
+        self.estrategia = estrategia
+        # En modo mock las ordenes van al exchange simulado en memoria (ver PaperExchange); el replay usa uno propio
+        self.exchange = exchange if exchange is not None else paper_exchange
+        # Latencias (ms) de las ultimas ordenes colocadas con place_order_async
+        self.latencias = deque(maxlen=1000)
+
+    def _parametros_ordenes(self, mode: str, sl_price: float, tp_price: float, quantity: float):
+        """
+        Parametros de las tres patas: entrada a mercado, stop loss y take profit (reduce-only).
+        """
+        side = SIDE_BUY if mode.upper() == 'LONG' else SIDE_SELL
+        # SL y TP cierran la posicion: van en el lado contrario a la entrada
+        close_side = SIDE_SELL if mode.upper() == 'LONG' else SIDE_BUY
+
+        entry = dict(
+            symbol=self.symbol,
+            side=side,
+            type=ORDER_TYPE_MARKET,
+            quantity=quantity,
+            timeInForce=TIME_IN_FORCE_GTC
+        )
+        sl = dict(
+            symbol=self.symbol,
+            side=close_side,
+            type='STOP_MARKET',
+            stopPrice=sl_price,
+            quantity=round(quantity, 3),
+            timeInForce=TIME_IN_FORCE_GTC,
+            reduceOnly=True
+        )
+        tp = dict(
+            symbol=self.symbol,
+            side=close_side,
+            type='LIMIT',
+            price=round(tp_price, 2),
+            quantity=round(quantity, 3),
+            timeInForce=TIME_IN_FORCE_GTC,
+            reduceOnly=True
+        )
+        return entry, sl, tp
+
+    def _crear_orden(self, pata: str, params: dict) -> dict:
+        inicio = time.perf_counter()
+        try:
+            if self.isMock:
+                return self.exchange.futures_create_order(**params, estrategia=self.estrategia)
+            return normalizar_orden(self.client.futures_create_order(**params))
+        finally:
+            LATENCIA_PATA.observar(time.perf_counter() - inicio, pata, self.symbol)
 
     def place_order(self, mode: str, entry_price: float, sl_price: float, tp_price: float, quantity: float):
         """
@@ -21,82 +130,92 @@ class TradeExecutor:
         :param tp_price: Take profit price
         :param quantity: Quantity of the asset to buy/sell
         """
+        inicio = time.perf_counter()
+        try:
+            entry_params, sl_params, tp_params = self._parametros_ordenes(mode, sl_price, tp_price, quantity)
+
+            order = self._crear_orden("entry", entry_params)
+            self.logger.info(f"Order placed: {order}")
+
+            # SL
+            sl_order = self._crear_orden("sl", sl_params)
+            self.logger.info(f"Stop Loss order placed: {sl_order}")
+
+            # TP
+            tp_order = self._crear_orden("tp", tp_params)
+            self.logger.info(f"Take Profit order placed: {tp_order}")
+
+            LATENCIA_PATA.observar(time.perf_counter() - inicio, "protegido", self.symbol)
+
+            return  {
+                'order': order,
+                'sl_order': sl_order,
+                'tp_order': tp_order
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error placing order: {e}")
+            return None
+
+    async def place_order_async(self, mode: str, entry_price: float, sl_price: float, tp_price: float, quantity: float):
+        """
+        Version asincrona de `place_order`: usa una sesion HTTP keep-alive compartida y,
+        una vez ejecutada la entrada, envia el SL y el TP de forma concurrente.
+
+        Devuelve el mismo diccionario que `place_order` mas 'latencias' (ms por pata y
+        'protegido', el tiempo total hasta tener SL y TP colocados).
+        """
+        inicio = time.perf_counter()
+        latencias = {}
         try:
             if self.isMock:
-                    order = {
-                        "orderId": 100001,
-                        "symbol": "BTCUSDT",
-                        "side": "BUY",  # o "SELL" si es short
-                        "type": "MARKET",
-                        "status": "FILLED",
-                        "price": "60000.00",
-                        "executedQty": "0.01",
-                        "timestamp": 1713195800000
-                    }
-                    sl_order = {
-                        "orderId": 100002,
-                        "symbol": "BTCUSDT",
-                        "side": "SELL",
-                        "type": "STOP_MARKET",
-                        "stopPrice": "59800.00",
-                        "status": "NEW",
-                        "timestamp": 1713195810000
-                    }
-
-                    tp_order = {
-                        "orderId": 100003,
-                        "symbol": "BTCUSDT",
-                        "side": "SELL",
-                        "type": "LIMIT",
-                        "price": "60500.00",
-                        "status": "NEW",
-                        "timestamp": 1713195815000
-                    }
+                # El exchange simulado responde en memoria: no hay red que solapar
+                entry_params, sl_params, tp_params = self._parametros_ordenes(mode, sl_price, tp_price, quantity)
+                order = self._crear_orden("entry", entry_params)
+                sl_order = self._crear_orden("sl", sl_params)
+                tp_order = self._crear_orden("tp", tp_params)
             else:
+                entry_params, sl_params, tp_params = self._parametros_ordenes(mode, sl_price, tp_price, quantity)
+                cliente = await obtener_cliente_async(testnet=self.client.testnet if self.client else False)
 
-                side = SIDE_BUY if mode.upper() == 'LONG' else SIDE_SELL
+                async def pata(nombre, params):
+                    t0 = time.perf_counter()
+                    try:
+                        return normalizar_orden(await cliente.futures_create_order(**params))
+                    finally:
+                        latencias[nombre] = (time.perf_counter() - t0) * 1000
+                        LATENCIA_PATA.observar(latencias[nombre] / 1000, nombre, self.symbol)
 
-                order = self.client.futures_create_order(
-                    symbol=self.symbol,
-                    side=side,
-                    type=ORDER_TYPE_MARKET,
-                    quantity=quantity,
-                    timeInForce=TIME_IN_FORCE_GTC
-                )
+                order = await pata("entry", entry_params)
                 self.logger.info(f"Order placed: {order}")
 
-                # Crear ordenes de stop loss y take profit (usando OCO o por separado según Binance Futures API)
-                sl_side = SIDE_SELL if mode.upper() == 'LONG' else SIDE_BUY
-                tp_side = SIDE_SELL if mode.upper() == 'SHORT' else SIDE_BUY
-
-                # SL
-                sl_order = self.client.futures_create_order(
-                    symbol=self.symbol,
-                    side=sl_side,
-                    type='STOP_MARKET',
-                    stopPrice=sl_price,
-                    timeInForce=TIME_IN_FORCE_GTC
-                )
-                self.logger.info(f"Stop Loss order placed: {sl_order}")
-
-                # TP
-                tp_order = self.client.futures_create_order(
-                    symbol=self.symbol,
-                    side=tp_side,
-                    type='LIMIT',
-                    price=round(tp_price, 2),
-                    quantity=round(quantity, 3),
-                    timeInForce=TIME_IN_FORCE_GTC,
-                    reduceOnly=True
+                # Las patas de proteccion no dependen entre si: se envian a la vez
+                sl_order, tp_order = await asyncio.gather(
+                    pata("sl", sl_params), pata("tp", tp_params), return_exceptions=True
                 )
-                self.logger.info(f"Take Profit order placed: {tp_order}")
+                if isinstance(sl_order, Exception):
+                    self.logger.error(f"❌ Error colocando el Stop Loss, posicion sin SL: {sl_order}")
+                    sl_order = None
+                else:
+                    self.logger.info(f"Stop Loss order placed: {sl_order}")
+                if isinstance(tp_order, Exception):
+                    self.logger.error(f"❌ Error colocando el Take Profit: {tp_order}")
+                    tp_order = None
+                else:
+                    self.logger.info(f"Take Profit order placed: {tp_order}")
 
-            return  {
+            latencias["protegido"] = (time.perf_counter() - inicio) * 1000
+            LATENCIA_PATA.observar(latencias["protegido"] / 1000, "protegido", self.symbol)
+            self.latencias.append(latencias)
+            self.logger.info(f"⏱️ Latencias de orden {self.symbol} (ms): {latencias}")
+
+            return {
                 'order': order,
                 'sl_order': sl_order,
-                'tp_order': tp_order
+                'tp_order': tp_order,
+                'latencias': latencias
             }
 
         except Exception as e:
             self.logger.error(f"Error placing order: {e}")
-            return None
\ No newline at end of file
+            return None
@@ -0,0 +1,127 @@
+# src/core/trade_manager/trade_journal.py
+from config.settings import TRADE_JOURNAL_SIZE
+from collections import OrderedDict
+import itertools
+import threading
+
+
+class TradeJournal:
+    """
+    Registro en memoria de las operaciones (ordenes ENTRY / STOP_LOSS / TAKE_PROFIT).
+
+    Acotado a `capacity` entradas (se descartan las mas antiguas), seguro entre hilos
+    e indexado por simbolo, estrategia y orden_id. Cada entrada recibe un numero de
+    secuencia creciente (`seq`) que los clientes usan para pedir solo lo nuevo.
+    """
+
+    def __init__(self, capacity: int = TRADE_JOURNAL_SIZE):
+        self.capacity = capacity
+        self._entradas: OrderedDict[int, dict] = OrderedDict()
+        self._por_simbolo: dict[str, OrderedDict] = {}
+        self._por_estrategia: dict[str, OrderedDict] = {}
+        self._por_orden: dict = {}
+        self._seq = itertools.count(1)
+        self._ultimo_seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ultimo_seq(self) -> int:
+        return self._ultimo_seq
+
+    @property
+    def primer_seq(self) -> int:
+        """
+        Secuencia mas antigua que se conserva (0 si esta vacio).
+        """
+        with self._lock:
+            return next(iter(self._entradas), 0)
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def registrar(self, entradas: list[dict]) -> list[dict]:
+        """
+        Agrega las entradas y devuelve copias con su `seq` asignado.
+        """
+        registradas = []
+        with self._lock:
+            for entrada in entradas:
+                entrada = {**entrada, "seq": next(self._seq)}
+                self._indexar(entrada)
+                registradas.append(entrada)
+
+            while len(self._entradas) > self.capacity:
+                self._descartar_mas_antigua()
+        return registradas
+
+    def restaurar(self, entradas: list[dict]):
+        """
+        Carga entradas que ya traen su `seq` (p.ej. de un checkpoint); la numeracion
+        sigue a partir de la mayor, asi los clientes pueden reanudar con `since`.
+        """
+        with self._lock:
+            for entrada in sorted(entradas, key=lambda e: e["seq"]):
+                if entrada["seq"] > self._ultimo_seq:
+                    self._indexar(dict(entrada))
+            self._seq = itertools.count(self._ultimo_seq + 1)
+            while len(self._entradas) > self.capacity:
+                self._descartar_mas_antigua()
+
+    def _indexar(self, entrada: dict):
+        seq = entrada["seq"]
+        self._entradas[seq] = entrada
+        self._por_simbolo.setdefault(entrada.get("simbolo"), OrderedDict())[seq] = None
+        self._por_estrategia.setdefault(entrada.get("estrategia"), OrderedDict())[seq] = None
+        if entrada.get("orden_id") is not None:
+            self._por_orden[entrada["orden_id"]] = seq
+        self._ultimo_seq = seq
+
+    def _descartar_mas_antigua(self):
+        seq, entrada = self._entradas.popitem(last=False)
+        for indice, clave in ((self._por_simbolo, entrada.get("simbolo")), (self._por_estrategia, entrada.get("estrategia"))):
+            seqs = indice.get(clave)
+            if seqs is not None:
+                seqs.pop(seq, None)
+                if not seqs:
+                    del indice[clave]
+        if self._por_orden.get(entrada.get("orden_id")) == seq:
+            del self._por_orden[entrada["orden_id"]]
+
+    def desde(self, seq: int = 0) -> list[dict]:
+        """
+        Entradas con secuencia mayor que `seq`, en orden.
+        """
+        with self._lock:
+            if seq < next(iter(self._entradas), 0):
+                return list(self._entradas.values())
+            return [self._entradas[s] for s in range(seq + 1, self._ultimo_seq + 1) if s in self._entradas]
+
+    def consultar(self, symbol: str = None, strategy: str = None, desde: int = 0, limite: int = None) -> list[dict]:
+        """
+        Entradas filtradas por simbolo y/o estrategia (usando los indices), las mas recientes al final.
+        """
+        with self._lock:
+            if symbol is not None and strategy is not None:
+                seqs = [s for s in self._por_simbolo.get(symbol, ()) if s in self._por_estrategia.get(strategy, ())]
+            elif symbol is not None:
+                seqs = list(self._por_simbolo.get(symbol, ()))
+            elif strategy is not None:
+                seqs = list(self._por_estrategia.get(strategy, ()))
+            else:
+                seqs = list(self._entradas)
+            seqs = [s for s in seqs if s > desde]
+            if limite is not None:
+                seqs = seqs[-limite:] if limite > 0 else []
+            return [self._entradas[s] for s in seqs]
+
+    def por_orden(self, orden_id) -> dict:
+        with self._lock:
+            seq = self._por_orden.get(orden_id)
+            return self._entradas.get(seq) if seq is not None else None
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return list(self._entradas.values())
+
+
+trade_journal = TradeJournal()
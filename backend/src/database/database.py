@@ -2,19 +2,24 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
-from config.settings import DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+from config.settings import DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_POOL_SIZE, DB_MAX_OVERFLOW
+from config.settings import DATABASE_URL as URL_CONFIGURADA
 import logging
 
 logger = logging.getLogger("TRADING_BOT")
 
 
 
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = URL_CONFIGURADA or f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 logger.info(f"DATABASE_URL: {DATABASE_URL}")
 
 
 # Create the SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+if DATABASE_URL.startswith("sqlite"):
+    # SQLite (pruebas locales): la conexion se usa desde el hilo de persistencia
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+else:
+    engine = create_engine(DATABASE_URL, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_pre_ping=True)
 
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
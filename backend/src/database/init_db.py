@@ -1,8 +1,11 @@
 # src/database/init_db.py
 from .database import Base, engine
 from .models import EstrategiaActiva, Orden, Transaccion
+from .migrations import migrar
 
 def init_db():
-    """Create the database tables if they do not exist yet."""
+    """Create the database tables if they do not exist yet and add missing columns to existing ones."""
     # Create all tables in the database which are defined by Base's subclasses
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    # create_all does not alter existing tables (see migrations.py)
+    migrar(engine)
\ No newline at end of file
@@ -0,0 +1,57 @@
+# src/database/migrations.py
+"""
+Migracion de esquema para bases de datos creadas con una version anterior de los modelos.
+
+`create_all` solo crea las tablas que no existen; no agrega columnas ni indices nuevos a
+tablas existentes (p.ej. symbol, nombre_estrategia, orden_id, side, cantidad y fecha_evento
+de `ordenes`/`transacciones`). `migrar` compara los modelos con la base y ejecuta los
+ALTER TABLE ... ADD COLUMN y CREATE INDEX que falten. Es idempotente y solo agrega: las
+columnas nuevas deben ser nullable.
+
+    PYTHONPATH=src python -m src.database.migrations
+"""
+from sqlalchemy import inspect, text
+from .database import Base, engine
+from . import models  # noqa: F401  (registra los modelos en Base.metadata)
+import logging
+
+logger = logging.getLogger("TRADING_BOT")
+
+
+def migrar(bind=engine) -> list[str]:
+    """
+    Agrega a las tablas existentes las columnas e indices de los modelos que les faltan.
+
+    Returns:
+        list[str]: Las sentencias ejecutadas.
+    """
+    inspector = inspect(bind)
+    ejecutadas = []
+    with bind.begin() as conn:
+        for tabla in Base.metadata.sorted_tables:
+            if not inspector.has_table(tabla.name):
+                continue
+            existentes = {columna["name"] for columna in inspector.get_columns(tabla.name)}
+            for columna in tabla.columns:
+                if columna.name in existentes:
+                    continue
+                tipo = columna.type.compile(dialect=bind.dialect)
+                sentencia = f"ALTER TABLE {tabla.name} ADD COLUMN {columna.name} {tipo}"
+                conn.execute(text(sentencia))
+                ejecutadas.append(sentencia)
+
+            indices = {indice["name"] for indice in inspector.get_indexes(tabla.name)}
+            for indice in tabla.indexes:
+                if indice.name not in indices:
+                    indice.create(bind=conn)
+                    ejecutadas.append(f"CREATE INDEX {indice.name} ON {tabla.name}")
+
+    for sentencia in ejecutadas:
+        logger.info(f"🛠️ Migracion: {sentencia}")
+    return ejecutadas
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ejecutadas = migrar()
+    print(f"{len(ejecutadas)} cambios aplicados" if ejecutadas else "Esquema al dia")
@@ -29,6 +29,13 @@ class Orden(Base):
     resultado = Column(Numeric)
     estado = Column(String(20), default="abierta")
     fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
+    # Datos de la orden en el exchange (los completa el runtime de estrategias)
+    symbol = Column(String(20), index=True)
+    nombre_estrategia = Column(String(100))
+    orden_id = Column(String(40), index=True)
+    side = Column(String(10))
+    cantidad = Column(Numeric)
+    fecha_evento = Column(DateTime(timezone=True))
 
     estrategia = relationship("EstrategiaActiva", back_populates="ordenes")
 
@@ -41,5 +48,10 @@ class Transaccion(Base):
     tipo = Column(String(20))  # Compra/Venta/StopOut
     monto = Column(Numeric)
     fecha_transaccion = Column(DateTime(timezone=True), server_default=func.now())
+    symbol = Column(String(20), index=True)
+    nombre_estrategia = Column(String(100))
+    orden_id = Column(String(40), index=True)
+    precio = Column(Numeric)
+    cantidad = Column(Numeric)
 
     estrategia = relationship("EstrategiaActiva", back_populates="transacciones")
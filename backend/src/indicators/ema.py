@@ -30,4 +30,77 @@ def ema(series: pd.Series, period: int):
     return pd.Series(ema, index=series.index)
 
 def ema_gpt(series: pd.Series, period: int):
-    return series.ewm(span=period, adjust=False).mean()
\ No newline at end of file
+    return series.ewm(span=period, adjust=False).mean()
+
+class StreamingEMA:
+    """
+    Incremental version of `ema` that is updated one value at a time in O(1).
+
+    Feeding the same values in the same order produces the same EMA values as
+    the batch `ema` function, so the stream can be seeded from the initial
+    history and then kept up to date with each closed candle.
+
+    Args:
+        period (int): The period over which the EMA should be calculated.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.value = None
+        self.previous = None
+
+    def seed(self, series) -> "StreamingEMA":
+        """
+        Feeds a whole series (e.g. the initial history) into the EMA.
+
+        Args:
+            series (pd.Series | list): The values to feed, oldest first.
+
+        Returns:
+            StreamingEMA: The same instance, to allow chaining.
+        """
+        values = series.tolist() if hasattr(series, "tolist") else list(series)
+        for value in values:
+            self.update(value)
+        return self
+
+    def update(self, value: float) -> float:
+        """
+        Adds a new value and returns the updated EMA.
+
+        Args:
+            value (float): The newest value of the input series.
+
+        Returns:
+            float: The EMA after including `value`.
+        """
+        self.previous = self.value
+        if self.value is None:
+            self.value = value
+        else:
+            self.value = (value * self.multiplier) + (self.value * (1 - self.multiplier))
+        return self.value
+
+    def state(self) -> dict:
+        """
+        Returns the internal state as plain data (e.g. for a checkpoint).
+
+        Returns:
+            dict: A snapshot that `load_state` can restore.
+        """
+        return {"value": self.value, "previous": self.previous}
+
+    def load_state(self, state: dict) -> "StreamingEMA":
+        """
+        Restores a snapshot taken with `state`; later updates continue exactly where it left off.
+
+        Args:
+            state (dict): The snapshot returned by `state`.
+
+        Returns:
+            StreamingEMA: The same instance, to allow chaining.
+        """
+        self.value = state["value"]
+        self.previous = state["previous"]
+        return self
@@ -0,0 +1,300 @@
+# src/indicators/graph.py
+from typing import NamedTuple, Union
+import threading
+import numpy as np
+from indicators.ema import StreamingEMA
+from indicators.rsi import StreamingRSI
+from indicators.volume import StreamingVolumeSMA
+
+# Streaming implementation of each indicator kind; every class takes the period
+# and exposes seed/update/state/load_state and a `value` attribute.
+INDICATOR_TYPES = {
+    "ema": StreamingEMA,
+    "rsi": StreamingRSI,
+    "sma": StreamingVolumeSMA,
+}
+
+
+def register_indicator(kind: str, cls):
+    """
+    Makes a new streaming indicator class available to `Indicator` declarations.
+
+    Args:
+        kind (str): The name used in the declarations, e.g. "atr".
+        cls (type): A streaming indicator class built with the period as its only argument.
+    """
+    INDICATOR_TYPES[kind] = cls
+
+
+def _ready(value) -> bool:
+    # Indicators built on another indicator skip its warm-up (None/NaN) values
+    return value is not None and value == value
+
+
+class Indicator(NamedTuple):
+    """
+    Declaration of an indicator series, e.g. `Indicator("ema", "close", 9)`.
+
+    Declarations are hashable and compare by value, so two strategies asking for
+    the same series get the same node of the graph. `source` is a candle column
+    or another `Indicator` (e.g. an EMA of the RSI).
+    """
+
+    kind: str
+    source: Union[str, "Indicator"]
+    period: int
+
+    def __str__(self):
+        return f"{self.kind}({self.source}, {self.period})"
+
+
+class _Node:
+    __slots__ = ("spec", "indicator", "last_open_time", "consumers")
+
+    def __init__(self, spec: Indicator):
+        self.spec = spec
+        self.indicator = INDICATOR_TYPES[spec.kind](spec.period)
+        self.last_open_time = None
+        self.consumers = 0
+
+
+class IndicatorGraph:
+    """
+    De-duplicated dependency graph of the indicators required for one symbol and timeframe.
+
+    Each node is evaluated once per closed candle (memoized by `open_time`) no
+    matter how many consumers call `update`, so the cost grows with the number
+    of unique indicators, not with the number of strategies. Consumers read the
+    shared streaming objects returned by `require` and must not update them.
+    """
+
+    def __init__(self):
+        self._nodes: dict[Indicator, _Node] = {}
+        self._order: list[_Node] = []
+        # open_time of the last candle every node has processed (fast path for the other consumers)
+        self._updated = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def require(self, specs) -> dict:
+        """
+        Adds the given indicators (and their dependencies) to the graph.
+
+        Args:
+            specs (Iterable[Indicator]): The indicators a consumer needs.
+
+        Returns:
+            dict: The shared streaming object of each requested indicator.
+        """
+        specs = tuple(specs)
+        with self._lock:
+            for spec in specs:
+                self._add(spec)
+            self._order = self._sorted()
+            self._updated = None
+            return {spec: self._nodes[spec].indicator for spec in specs}
+
+    def _add(self, spec: Indicator):
+        if spec.kind not in INDICATOR_TYPES:
+            raise ValueError(f"Unknown indicator kind: {spec.kind}")
+        if isinstance(spec.source, Indicator):
+            self._add(spec.source)
+        node = self._nodes.get(spec)
+        if node is None:
+            node = self._nodes[spec] = _Node(spec)
+        node.consumers += 1
+
+    def release(self, specs):
+        """
+        Drops one reference to each indicator; nodes nobody uses are removed.
+
+        Args:
+            specs (Iterable[Indicator]): The indicators previously passed to `require`.
+        """
+        with self._lock:
+            for spec in specs:
+                self._remove(spec)
+            self._order = self._sorted()
+
+    def _remove(self, spec: Indicator):
+        node = self._nodes.get(spec)
+        if node is None:
+            return
+        node.consumers -= 1
+        if node.consumers <= 0:
+            del self._nodes[spec]
+        if isinstance(spec.source, Indicator):
+            self._remove(spec.source)
+
+    def _sorted(self) -> list:
+        # Dependencies always have a lower depth than the indicators built on them
+        def depth(spec):
+            return 1 + depth(spec.source) if isinstance(spec.source, Indicator) else 0
+        return sorted(self._nodes.values(), key=lambda node: depth(node.spec))
+
+    @property
+    def last_open_time(self):
+        """
+        open_time of the last candle processed by every node (None if no candle was
+        seen yet or the nodes are not in step).
+        """
+        with self._lock:
+            times = {node.last_open_time for node in self._order}
+        return times.pop() if len(times) == 1 else None
+
+    def reset(self):
+        """
+        Returns every node to its initial state so the graph can be seeded again.
+
+        The streaming objects handed out by `require` are reset in place, so the
+        references held by consumers stay valid.
+        """
+        with self._lock:
+            for node in self._order:
+                node.indicator.load_state(INDICATOR_TYPES[node.spec.kind](node.spec.period).state())
+                node.last_open_time = None
+            self._updated = None
+
+    def seed(self, candles):
+        """
+        Seeds the nodes that have not seen any candle yet with the history.
+
+        Nodes that are already live (seeded by an earlier consumer) are left
+        untouched; dependencies of new nodes are recomputed on a scratch copy.
+
+        Args:
+            candles (pd.DataFrame | CandleBuffer): The closed candles, oldest first.
+        """
+        with self._lock:
+            pending = [node for node in self._order if node.last_open_time is None]
+            if not pending or len(candles) == 0:
+                return
+            pending_specs = {node.spec for node in pending}
+            scratch = {}
+            for node in self._order:
+                if node.spec in pending_specs:
+                    scratch[node.spec] = node.indicator
+                elif any(self._depends_on(spec, node.spec) for spec in pending_specs):
+                    scratch[node.spec] = INDICATOR_TYPES[node.spec.kind](node.spec.period)
+
+            columns = {}
+            for spec in scratch:
+                if not isinstance(spec.source, Indicator) and spec.source not in columns:
+                    columns[spec.source] = np.asarray(candles[spec.source], dtype=np.float64).tolist()
+            for i in range(len(candles)):
+                for spec, indicator in scratch.items():
+                    source = spec.source
+                    value = scratch[source].value if isinstance(source, Indicator) else columns[source][i]
+                    if _ready(value):
+                        indicator.update(value)
+
+            try:
+                last_open_time = int(np.asarray(candles["open_time"])[-1])
+            except KeyError:
+                last_open_time = None
+            for node in pending:
+                node.last_open_time = last_open_time
+
+    @staticmethod
+    def _depends_on(spec: Indicator, dependency: Indicator) -> bool:
+        source = spec.source
+        while isinstance(source, Indicator):
+            if source == dependency:
+                return True
+            source = source.source
+        return False
+
+    def update(self, candle: dict):
+        """
+        Feeds a closed candle to every node that has not processed it yet.
+
+        Args:
+            candle (dict): The closed candle, with `open_time` and the source columns.
+        """
+        open_time = candle.get("open_time")
+        with self._lock:
+            if open_time is not None and open_time == self._updated:
+                return
+            values = {}
+            for node in self._order:
+                source = node.spec.source
+                if open_time is None or node.last_open_time is None or open_time > node.last_open_time:
+                    value = values[source] if isinstance(source, Indicator) else candle[source]
+                    if _ready(value):
+                        node.indicator.update(value)
+                    node.last_open_time = open_time
+                values[node.spec] = node.indicator.value
+            self._updated = open_time
+
+    @staticmethod
+    def _with_dependencies(specs) -> list:
+        result = []
+        for spec in specs:
+            while isinstance(spec, Indicator):
+                if spec not in result:
+                    result.append(spec)
+                spec = spec.source
+        return result
+
+    def state(self, specs) -> dict:
+        """
+        Returns the state of the given indicators and their dependencies keyed by
+        their declaration (e.g. for a checkpoint).
+        """
+        with self._lock:
+            return {
+                str(spec): {**self._nodes[spec].indicator.state(), "last_open_time": self._nodes[spec].last_open_time}
+                for spec in self._with_dependencies(specs)
+            }
+
+    def load_state(self, specs, state: dict):
+        """
+        Restores a snapshot taken with `state` into the nodes that are not live yet.
+        """
+        with self._lock:
+            for spec in self._with_dependencies(specs):
+                node = self._nodes[spec]
+                saved = state.get(str(spec))
+                if node.last_open_time is None and saved is not None:
+                    node.indicator.load_state(saved)
+                    node.last_open_time = saved.get("last_open_time")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {str(node.spec): node.consumers for node in self._order}
+
+
+class IndicatorGraphs:
+    """
+    One shared `IndicatorGraph` per (symbol, timeframe); a graph disappears with its last consumer.
+    """
+
+    def __init__(self):
+        self._graphs: dict[tuple, IndicatorGraph] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, symbol: str, timeframe: str, specs) -> tuple:
+        """
+        Returns the graph of `symbol`/`timeframe` and the shared objects of `specs`.
+        """
+        with self._lock:
+            graph = self._graphs.setdefault((symbol, timeframe), IndicatorGraph())
+            return graph, graph.require(specs)
+
+    def release(self, symbol: str, timeframe: str, specs):
+        with self._lock:
+            graph = self._graphs.get((symbol, timeframe))
+            if graph is None:
+                return
+            graph.release(specs)
+            if not len(graph):
+                del self._graphs[(symbol, timeframe)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {f"{symbol}@{timeframe}": graph.stats() for (symbol, timeframe), graph in self._graphs.items()}
+
+
+indicator_graphs = IndicatorGraphs()
@@ -1,4 +1,6 @@
 # src/indicators/rsi.py
+from collections import deque
+import math
 import pandas as pd
 
 def rsi(series: pd.Series, period: int = 14) -> pd.Series:
@@ -19,4 +21,102 @@ def rsi(series: pd.Series, period: int = 14) -> pd.Series:
     rs = gain / loss
     rsi = 100 - (100 / (1 + rs))
 
-    return rsi
\ No newline at end of file
+    return rsi
+
+class StreamingRSI:
+    """
+    Incremental version of `rsi` that is updated one close at a time in O(1).
+
+    It keeps the last `period` gains and losses with their running sums, which
+    is exactly what the rolling means of the batch `rsi` function look at.
+
+    Parameters:
+    period (int): The number of periods to use for the RSI calculation.
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.value = float("nan")
+        self.previous = float("nan")
+        self._last_close = None
+        self._gains = deque()
+        self._losses = deque()
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._updates = 0
+
+    def seed(self, series) -> "StreamingRSI":
+        """
+        Feeds a whole series of closes (e.g. the initial history) into the RSI.
+        """
+        values = series.tolist() if hasattr(series, "tolist") else list(series)
+        for value in values:
+            self.update(value)
+        return self
+
+    def update(self, close: float) -> float:
+        """
+        Adds a new close and returns the updated RSI (NaN until `period` closes).
+        """
+        # La primera diferencia es NaN y el batch la convierte en 0 via `where`
+        delta = 0.0 if self._last_close is None else close - self._last_close
+        self._last_close = close
+
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self._gains.append(gain)
+        self._losses.append(loss)
+        self._gain_sum += gain
+        self._loss_sum += loss
+        if len(self._gains) > self.period:
+            self._gain_sum -= self._gains.popleft()
+            self._loss_sum -= self._losses.popleft()
+
+        # Re-sumar la ventana cada `period` actualizaciones evita que el error
+        # de redondeo de las sumas acumuladas crezca con el tiempo
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self._gain_sum = math.fsum(self._gains)
+            self._loss_sum = math.fsum(self._losses)
+
+        self.previous = self.value
+        if len(self._gains) < self.period:
+            self.value = float("nan")
+            return self.value
+
+        gain_avg = self._gain_sum / self.period
+        loss_avg = self._loss_sum / self.period
+        if loss_avg == 0:
+            self.value = 100.0 if gain_avg > 0 else float("nan")
+        else:
+            self.value = 100 - (100 / (1 + gain_avg / loss_avg))
+        return self.value
+
+    def state(self) -> dict:
+        """
+        Returns the internal state (window of gains/losses and sums) as plain data.
+        """
+        return {
+            "value": self.value,
+            "previous": self.previous,
+            "last_close": self._last_close,
+            "gains": list(self._gains),
+            "losses": list(self._losses),
+            "gain_sum": self._gain_sum,
+            "loss_sum": self._loss_sum,
+            "updates": self._updates,
+        }
+
+    def load_state(self, state: dict) -> "StreamingRSI":
+        """
+        Restores a snapshot taken with `state`; later updates continue exactly where it left off.
+        """
+        self.value = state["value"]
+        self.previous = state["previous"]
+        self._last_close = state["last_close"]
+        self._gains = deque(state["gains"])
+        self._losses = deque(state["losses"])
+        self._gain_sum = state["gain_sum"]
+        self._loss_sum = state["loss_sum"]
+        self._updates = state["updates"]
+        return self
@@ -1,4 +1,6 @@
 # src/database/init_db.py
+from collections import deque
+import math
 import pandas as pd
 
 def volume_sma(volume: pd.Series, period: int) -> pd.Series:
@@ -9,4 +11,63 @@ def volume_sma(volume: pd.Series, period: int) -> pd.Series:
     :param period: The number of periods over which to calculate the SMA.
     :return: A pandas Series containing the SMA of the volume.
     """
-    return volume.rolling(window=period).mean()
\ No newline at end of file
+    return volume.rolling(window=period).mean()
+
+class StreamingVolumeSMA:
+    """
+    Incremental version of `volume_sma` that is updated one value at a time in O(1).
+
+    :param period: The number of periods over which to calculate the SMA.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.value = float("nan")
+        self._window = deque()
+        self._sum = 0.0
+        self._updates = 0
+
+    def seed(self, volume) -> "StreamingVolumeSMA":
+        """
+        Feeds a whole volume series (e.g. the initial history) into the SMA.
+        """
+        values = volume.tolist() if hasattr(volume, "tolist") else list(volume)
+        for value in values:
+            self.update(value)
+        return self
+
+    def update(self, volume: float) -> float:
+        """
+        Adds a new volume value and returns the updated SMA (NaN until `period` values).
+        """
+        self._window.append(volume)
+        self._sum += volume
+        if len(self._window) > self.period:
+            self._sum -= self._window.popleft()
+
+        # Re-sumar periodicamente para que el error de redondeo no se acumule
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self._sum = math.fsum(self._window)
+
+        if len(self._window) < self.period:
+            self.value = float("nan")
+        else:
+            self.value = self._sum / self.period
+        return self.value
+
+    def state(self) -> dict:
+        """
+        Returns the internal state (window and running sum) as plain data.
+        """
+        return {"value": self.value, "window": list(self._window), "sum": self._sum, "updates": self._updates}
+
+    def load_state(self, state: dict) -> "StreamingVolumeSMA":
+        """
+        Restores a snapshot taken with `state`; later updates continue exactly where it left off.
+        """
+        self.value = state["value"]
+        self._window = deque(state["window"])
+        self._sum = state["sum"]
+        self._updates = state["updates"]
+        return self
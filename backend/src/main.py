@@ -5,7 +5,9 @@ from controllers.http_controller import router as http_router
 from controllers.ws_controller import router as ws_router
 from controllers.simbolos_controller import router as simbolos_router
 from controllers.estrategias_controller import router as estrategias_router
+from controllers.metrics_controller import router as metrics_router
 from src.database.init_db import init_db
+import asyncio
 import signal
 import logging
 import sys
@@ -38,9 +40,15 @@ logger = setup_logger()
 def signal_handler(signum, frame):
     logger.info(f"🚩 Señal recibida ({signum}). Cerrando estrategias activas...")
     try:
-        from src.services.strategy_runtime import strategy_runner
+        from src.services.strategy_service import strategy_runner
         strategy_runner.detener_todas()
         logger.info("✅ Todas las estrategias fueron detenidas correctamente.")
+        # Escribir las ordenes que aun estan en la cola de persistencia
+        from src.services.persistence import persistence_worker
+        persistence_worker.detener()
+        # Checkpoints pendientes y estado del journal para reanudar en el siguiente arranque
+        from src.services.checkpoint import checkpoints
+        checkpoints.detener()
     except Exception as e:
         logger.error(f"❌ Error al detener las estrategias: {e}")
     finally:
@@ -68,9 +76,36 @@ app.include_router(simbolos_router, prefix="/api/symbol")
 app.include_router(estrategias_router, prefix="/api/strategy")
 # Rutas de WebSocket
 app.include_router(ws_router, prefix="/ws")
+# Metricas (formato Prometheus en /metrics)
+app.include_router(metrics_router)
 
 # 🚀 Inicializar base de datos en el arranque
 @app.on_event("startup")
 async def startup_event():
     init_db()
     logger.info("🚀 Base de datos inicializada correctamente.")
+
+    from src.services.persistence import persistence_worker
+    persistence_worker.iniciar()
+
+    # Cache de tickers alimentada por el stream desde el arranque (suscribir bloquea: fuera del loop)
+    from src.services.market_data_service import ticker_cache
+    try:
+        await asyncio.to_thread(ticker_cache.iniciar)
+    except Exception as e:
+        logger.warning(f"⚠️ Cache de tickers sin stream, se suscribira en la primera consulta: {e}")
+
+    from src.services.strategy_shards import sharded_runner
+    if sharded_runner is not None:
+        sharded_runner.arrancar(asyncio.get_running_loop())
+
+    # Reanudar las estrategias que estaban en ejecucion al apagar (ver CHECKPOINT_DIR)
+    from src.services.checkpoint import checkpoints
+    from src.services.strategy_service import strategy_runner
+    await checkpoints.reanudar(strategy_runner)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from src.services.market_data_service import ticker_cache
+    await ticker_cache.cerrar()
@@ -0,0 +1,2 @@
+# src/metrics/__init__.py
+from .registro import Contador, Gauge, Histograma, Registro, registro, histograma, gauge, contador
@@ -0,0 +1,190 @@
+# src/metrics/registro.py
+"""
+Metricas en memoria (histogramas y gauges con etiquetas) exportables en formato
+de texto de Prometheus, sin dependencias externas.
+"""
+import bisect
+import math
+import threading
+from typing import Callable
+
+# Cubetas (segundos) para latencias: de 100 us a 10 s
+CUBETAS_LATENCIA = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(nombres: tuple, valores: tuple, extra: str = "") -> str:
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    return repr(float(valor))
+
+
+class Histograma:
+    """
+    Histograma por cubetas fijas. `observar` es O(log cubetas) bajo un lock corto.
+    """
+
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple = (), cubetas: tuple = CUBETAS_LATENCIA):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.cubetas = tuple(sorted(cubetas))
+        # etiquetas -> [conteo por cubeta (+Inf al final), suma, total]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *etiquetas):
+        i = bisect.bisect_left(self.cubetas, valor)
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                serie = self._series[etiquetas] = [[0] * (len(self.cubetas) + 1), 0.0, 0]
+            serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def cuantil(self, q: float, *etiquetas) -> float:
+        """
+        Estimacion del cuantil `q` interpolando dentro de la cubeta (como histogram_quantile).
+        """
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None or serie[2] == 0:
+                return math.nan
+            conteos, total = list(serie[0]), serie[2]
+
+        objetivo = q * total
+        acumulado = 0
+        for i, conteo in enumerate(conteos):
+            if acumulado + conteo >= objetivo and conteo:
+                if i == len(self.cubetas):
+                    return self.cubetas[-1]
+                inferior = self.cubetas[i - 1] if i else 0.0
+                return inferior + (self.cubetas[i] - inferior) * (objetivo - acumulado) / conteo
+            acumulado += conteo
+        return self.cubetas[-1]
+
+    def resumen(self) -> list[dict]:
+        with self._lock:
+            series = {etiquetas: (serie[1], serie[2]) for etiquetas, serie in self._series.items()}
+        return [
+            {
+                **dict(zip(self.etiquetas, etiquetas)),
+                "n": total,
+                "media_ms": suma / total * 1000 if total else 0.0,
+                "p50_ms": self.cuantil(0.5, *etiquetas) * 1000,
+                "p99_ms": self.cuantil(0.99, *etiquetas) * 1000,
+            }
+            for etiquetas, (suma, total) in series.items()
+        ]
+
+    def exportar(self) -> list[str]:
+        with self._lock:
+            series = {etiquetas: (list(s[0]), s[1], s[2]) for etiquetas, s in self._series.items()}
+        lineas = []
+        for etiquetas, (conteos, suma, total) in series.items():
+            acumulado = 0
+            for limite, conteo in zip(self.cubetas + (math.inf,), conteos):
+                acumulado += conteo
+                le = 'le="' + _numero(limite) + '"'
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, etiquetas, le)} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, etiquetas)} {_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, etiquetas)} {total}")
+        return lineas
+
+
+class Gauge:
+    """
+    Valor instantaneo. Con `funcion` se calcula al exportar: debe devolver un numero
+    o un dict {tupla de etiquetas: valor}.
+    """
+
+    tipo = "gauge"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple = (), funcion: Callable = None):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.funcion = funcion
+        self._valores: dict[tuple, float] = {}
+
+    def fijar(self, valor: float, *etiquetas):
+        self._valores[etiquetas] = valor
+
+    def valores(self) -> dict:
+        if self.funcion is None:
+            return dict(self._valores)
+        resultado = self.funcion()
+        return resultado if isinstance(resultado, dict) else {(): resultado}
+
+    def exportar(self) -> list[str]:
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, etiquetas)} {_numero(valor)}" for etiquetas, valor in self.valores().items()]
+
+
+class Contador(Gauge):
+    """
+    Total acumulado que solo crece (se reinicia con el proceso). Con `funcion` se lee al
+    exportar, con el mismo formato que Gauge; la funcion debe devolver valores monotonos.
+    """
+
+    tipo = "counter"
+
+    def incrementar(self, cantidad: float = 1, *etiquetas):
+        self._valores[etiquetas] = self._valores.get(etiquetas, 0) + cantidad
+
+
+class Registro:
+    def __init__(self):
+        self._metricas: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metrica):
+        with self._lock:
+            # Registrar dos veces el mismo nombre devuelve la metrica existente
+            return self._metricas.setdefault(metrica.nombre, metrica)
+
+    def obtener(self, nombre: str):
+        return self._metricas.get(nombre)
+
+    def exportar(self) -> str:
+        """
+        Todas las metricas en formato de texto de Prometheus (version 0.0.4).
+        """
+        lineas = []
+        for metrica in list(self._metricas.values()):
+            try:
+                cuerpo = metrica.exportar()
+            except Exception as e:  # Un gauge con funcion rota no debe tumbar el endpoint
+                lineas.append(f"# {metrica.nombre}: error al calcular ({e})")
+                continue
+            lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+            lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+            lineas.extend(cuerpo)
+        return "\n".join(lineas) + "\n"
+
+
+registro = Registro()
+
+
+def histograma(nombre: str, ayuda: str, etiquetas: tuple = (), cubetas: tuple = CUBETAS_LATENCIA) -> Histograma:
+    return registro.registrar(Histograma(nombre, ayuda, etiquetas, cubetas))
+
+
+def gauge(nombre: str, ayuda: str, etiquetas: tuple = (), funcion: Callable = None) -> Gauge:
+    return registro.registrar(Gauge(nombre, ayuda, etiquetas, funcion))
+
+
+def contador(nombre: str, ayuda: str, etiquetas: tuple = (), funcion: Callable = None) -> Contador:
+    return registro.registrar(Contador(nombre, ayuda, etiquetas, funcion))
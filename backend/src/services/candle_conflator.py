@@ -0,0 +1,114 @@
+# src/services/candle_conflator.py
+from config.settings import CANDLE_STREAM_HZ
+from src.services.ws_manager import ws_manager, WebSocketManager
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger("TRADING_BOT")
+
+
+class CandleConflator:
+    """
+    Etapa de conflacion delante de ws_manager para los grupos de candle-stream.
+
+    Binance envia varias actualizaciones por segundo de la vela en formacion; aqui solo
+    se guarda la ultima por (symbol, interval, open_time) y se envia a la frecuencia que
+    pidio cada cliente. Las velas cerradas salen siempre de inmediato.
+    """
+
+    def __init__(self, manager: WebSocketManager = ws_manager, hz: float = CANDLE_STREAM_HZ):
+        self.manager = manager
+        self.hz = hz
+        # (group, hz) -> {clave: mensaje}
+        self._pendientes: dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+        # hz -> tarea de vaciado en el loop del manager
+        self._tareas: dict[float, asyncio.Task] = {}
+        # (group, symbol, interval) -> open_time de la ultima vela cerrada de ese stream
+        self._cerradas: dict[tuple, int] = {}
+        self.recibidas = 0
+        self.enviadas = 0
+
+    async def publicar(self, mensaje: dict, group: str, clave, cerrada: bool = False):
+        """
+        Puede llamarse desde el loop de cualquier estrategia.
+        """
+        tasas = self.manager.tasas(group)
+        if not tasas:
+            return
+        with self._lock:
+            self.recibidas += 1
+            if not cerrada and self._ya_cerrada(group, clave):
+                return
+
+        if cerrada:
+            # La vela cerrada reemplaza cualquier actualizacion pendiente de la misma vela y,
+            # desde aqui, las que aun esten por enviarse se descartan (ver _vaciar)
+            with self._lock:
+                if clave is not None:
+                    stream = (group, *clave[:-1])
+                    self._cerradas[stream] = max(clave[-1], self._cerradas.get(stream, clave[-1]))
+                for hz in tasas:
+                    self._pendientes.get((group, hz), {}).pop(clave, None)
+                self.enviadas += 1
+            await self.manager.broadcast(mensaje, group=group, clave=clave)
+            return
+
+        for hz in tasas:
+            if not hz:
+                # Clientes que pidieron rate=0 reciben cada actualizacion
+                with self._lock:
+                    self.enviadas += 1
+                await self.manager.broadcast(mensaje, group=group, clave=clave, hz=hz)
+                continue
+            with self._lock:
+                self._pendientes.setdefault((group, hz), {})[clave] = mensaje
+            if hz not in self._tareas:
+                self.manager.ejecutar_en_loop(self._asegurar_tarea, hz)
+
+    def _ya_cerrada(self, group: str, clave) -> bool:
+        # Con el lock tomado. Una actualizacion de una vela ya cerrada llegaria al cliente
+        # despues de la vela final y la pisaria
+        if clave is None:
+            return False
+        cerrada = self._cerradas.get((group, *clave[:-1]))
+        return cerrada is not None and clave[-1] <= cerrada
+
+    def _asegurar_tarea(self, hz: float):
+        if hz not in self._tareas:
+            self._tareas[hz] = asyncio.get_running_loop().create_task(self._vaciar(hz))
+
+    async def _vaciar(self, hz: float):
+        try:
+            while True:
+                await asyncio.sleep(1 / hz)
+                with self._lock:
+                    lotes = [(group, self._pendientes.pop((group, tasa))) for group, tasa in list(self._pendientes) if tasa == hz]
+
+                for group, mensajes in lotes:
+                    for clave, mensaje in mensajes.items():
+                        # La vela pudo cerrarse despues de sacar el lote: se comprueba justo antes de
+                        # encolar, que ocurre en este mismo loop igual que el encolado de la vela cerrada
+                        with self._lock:
+                            if self._ya_cerrada(group, clave):
+                                continue
+                            self.enviadas += 1
+                        await self.manager.broadcast(mensaje, group=group, clave=clave, hz=hz)
+
+                if not lotes and not any(hz in self.manager.tasas(group) for group in list(self.manager.active_connections)):
+                    # Ningun cliente usa esta frecuencia
+                    break
+        finally:
+            self._tareas.pop(hz, None)
+
+    def estadisticas(self) -> dict:
+        return {
+            "hz": self.hz,
+            "recibidas": self.recibidas,
+            "enviadas": self.enviadas,
+            "frecuencias_activas": sorted(self._tareas),
+        }
+
+
+candle_conflator = CandleConflator()
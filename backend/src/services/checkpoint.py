@@ -0,0 +1,212 @@
+# src/services/checkpoint.py
+from config.settings import CHECKPOINT_DIR, CHECKPOINT_INTERVAL
+from core.trade_manager.trade_journal import trade_journal
+from core.trade_manager.paper_exchange import paper_exchange
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+logger = logging.getLogger("TRADING_BOT")
+
+# Journal de operaciones y exchange simulado (compartidos por todas las estrategias del proceso)
+ARCHIVO_GLOBAL = "runtime.json"
+
+
+def _escribir_atomico(ruta: str, escribir):
+    """
+    Escribe en un temporal y lo renombra: un fallo a mitad nunca deja un checkpoint a medias.
+    """
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, "wb") as f:
+        escribir(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+class CheckpointStore:
+    """
+    Snapshots periodicos de las estrategias en ejecucion para un reinicio en caliente.
+
+    Cada estrategia guarda `<key>.npz` con sus ultimas velas (array columnas x velas) y un
+    JSON con symbol, timeframe, test y el estado de sus indicadores. El journal de operaciones
+    y el exchange simulado van en `runtime.json`. Las escrituras son atomicas y las hace un
+    hilo propio, asi el loop de la estrategia solo copia su estado y sigue.
+    """
+
+    def __init__(self, directorio: str = CHECKPOINT_DIR, intervalo: float = CHECKPOINT_INTERVAL):
+        self.directorio = directorio
+        self.intervalo = intervalo
+        # En los shards el journal vive en el proceso principal: solo alli se guarda el estado global
+        self.globales = True
+        self._cola: queue.Queue = queue.Queue()
+        self._hilo: threading.Thread = None
+        self._lock = threading.Lock()
+        self._ultimo: dict[str, float] = {}
+        self._seq_guardado = None
+        self.escritos = 0
+
+    @property
+    def activo(self) -> bool:
+        return bool(self.directorio)
+
+    def _ruta(self, key: str) -> str:
+        return os.path.join(self.directorio, f"{key}.npz")
+
+    # --- Estrategias ---
+
+    def debe_guardar(self, key: str) -> bool:
+        return self.activo and time.monotonic() - self._ultimo.get(key, 0.0) >= self.intervalo
+
+    def guardar(self, key: str, meta: dict, velas: np.ndarray):
+        """
+        Encola el snapshot de una estrategia. `velas` debe ser una copia (ver CandleBuffer.exportar).
+        """
+        if not self.activo:
+            return
+        self._ultimo[key] = time.monotonic()
+        self._encolar(("guardar", key, {**meta, "guardado_en": int(time.time() * 1000)}, velas))
+
+    def borrar(self, key: str):
+        """
+        Olvida el checkpoint de una estrategia detenida por el usuario (no se reanuda al reiniciar).
+        """
+        self._ultimo.pop(key, None)
+        if self.activo:
+            self._encolar(("borrar", key))
+
+    def cargar(self, key: str):
+        """
+        (meta, velas) del checkpoint de `key`, o None si no hay uno valido.
+        """
+        ruta = self._ruta(key)
+        if not self.activo or not os.path.exists(ruta):
+            return None
+        try:
+            with np.load(ruta, allow_pickle=False) as datos:
+                return json.loads(str(datos["meta"])), datos["velas"]
+        except Exception as e:
+            logger.warning(f"⚠️ Checkpoint ilegible {ruta}, se ignora: {e}")
+            return None
+
+    def listar(self) -> list[dict]:
+        if not self.activo or not os.path.isdir(self.directorio):
+            return []
+        metas = []
+        for archivo in sorted(os.listdir(self.directorio)):
+            if archivo.endswith(".npz"):
+                snapshot = self.cargar(archivo[:-4])
+                if snapshot is not None:
+                    metas.append(snapshot[0])
+        return metas
+
+    # --- Journal y exchange simulado ---
+
+    def guardar_globales(self):
+        if not self.activo or not self.globales:
+            return
+        seq = trade_journal.ultimo_seq
+        estado = {"journal": trade_journal.snapshot(), "paper": paper_exchange.estado()}
+        contenido = json.dumps(estado, separators=(",", ":")).encode("utf-8")
+        os.makedirs(self.directorio, exist_ok=True)
+        _escribir_atomico(os.path.join(self.directorio, ARCHIVO_GLOBAL), lambda f: f.write(contenido))
+        self._seq_guardado = seq
+
+    def restaurar_globales(self):
+        ruta = os.path.join(self.directorio, ARCHIVO_GLOBAL)
+        if not self.activo or not os.path.exists(ruta):
+            return
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                estado = json.load(f)
+            trade_journal.restaurar(estado["journal"])
+            paper_exchange.restaurar(estado["paper"])
+            self._seq_guardado = trade_journal.ultimo_seq
+            logger.info(f"♻️ Journal restaurado ({len(estado['journal'])} operaciones, seq {trade_journal.ultimo_seq})")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo restaurar {ruta}: {e}")
+
+    async def reanudar(self, runner):
+        """
+        Arranque: restaura journal y exchange simulado y vuelve a lanzar las estrategias con
+        checkpoint; cada una retoma sus velas e indicadores y solo descarga las velas perdidas.
+        """
+        if not self.activo:
+            return
+        await asyncio.to_thread(self.restaurar_globales)
+        # El hilo escritor tambien guarda el journal periodicamente
+        self.iniciar()
+        for meta in await asyncio.to_thread(self.listar):
+            logger.info(f"♻️ Reanudando {meta['key']} ({meta['timeframe']}) desde checkpoint")
+            await asyncio.to_thread(runner.iniciar_estrategia, meta["symbol"], meta["strategy"], meta["timeframe"], meta["test"])
+
+    # --- Escritor ---
+
+    def _encolar(self, item):
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._bucle, name="checkpoints", daemon=True)
+                self._hilo.start()
+        self._cola.put(item)
+
+    def iniciar(self):
+        if self.activo:
+            self._encolar(("globales",))
+
+    def _bucle(self):
+        while True:
+            try:
+                item = self._cola.get(timeout=self.intervalo)
+            except queue.Empty:
+                item = ("globales",)
+            if item is None:
+                self._escribir_globales()
+                return
+            try:
+                if item[0] == "guardar":
+                    self._escribir(*item[1:])
+                elif item[0] == "borrar":
+                    ruta = self._ruta(item[1])
+                    if os.path.exists(ruta):
+                        os.remove(ruta)
+                else:
+                    self._escribir_globales()
+            except Exception:
+                logger.exception(f"❌ Error escribiendo checkpoint ({item[0]})")
+
+    def _escribir(self, key: str, meta: dict, velas: np.ndarray):
+        os.makedirs(self.directorio, exist_ok=True)
+        _escribir_atomico(self._ruta(key), lambda f: np.savez(f, velas=velas, meta=np.array(json.dumps(meta))))
+        self.escritos += 1
+
+    def _escribir_globales(self):
+        if self.globales and (trade_journal.ultimo_seq != self._seq_guardado or paper_exchange.resumen()["ordenes_abiertas"]):
+            self.guardar_globales()
+
+    def detener(self):
+        """
+        Escribe lo pendiente (y el estado global) antes de salir.
+        """
+        with self._lock:
+            hilo = self._hilo
+        if hilo is not None and hilo.is_alive():
+            self._cola.put(None)
+            hilo.join(timeout=10)
+        elif self.activo:
+            self._escribir_globales()
+
+    def estadisticas(self) -> dict:
+        return {
+            "directorio": self.directorio,
+            "intervalo": self.intervalo,
+            "escritos": self.escritos,
+            "pendientes": self._cola.qsize(),
+        }
+
+
+checkpoints = CheckpointStore()
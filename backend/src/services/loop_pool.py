@@ -0,0 +1,132 @@
+# src/services/loop_pool.py
+from core.trade_manager.trade_executor import cerrar_clientes_async
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger("TRADING_BOT")
+
+
+class EventLoopPool:
+    """
+    Pool fijo de event loops, cada uno corriendo en su propio hilo.
+
+    Las estrategias se ejecutan como tareas dentro de estos loops en lugar de
+    tener un hilo y un loop privados cada una; arrancar y detener una estrategia
+    se reduce a crear o cancelar una tarea.
+    """
+
+    def __init__(self, size: int = 1, name: str = "strategy-loop"):
+        self.size = max(1, size)
+        self.name = name
+        self._loops: list[asyncio.AbstractEventLoop] = []
+        self._threads: list[threading.Thread] = []
+        self._tareas: dict[asyncio.AbstractEventLoop, set] = {}
+        self._lock = threading.Lock()
+
+    def _iniciar(self):
+        with self._lock:
+            if self._loops:
+                return
+            for i in range(self.size):
+                loop = asyncio.new_event_loop()
+                listo = threading.Event()
+                thread = threading.Thread(
+                    target=self._correr_loop, args=(loop, listo), name=f"{self.name}-{i}", daemon=True
+                )
+                thread.start()
+                listo.wait()
+                self._loops.append(loop)
+                self._threads.append(thread)
+                self._tareas[loop] = set()
+            logger.info(f"🧵 Pool de event loops iniciado con {self.size} loop(s)")
+
+    @staticmethod
+    def _correr_loop(loop: asyncio.AbstractEventLoop, listo: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(listo.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+            logger.info("🔎 Loop cerrado correctamente.")
+
+    def _loop_menos_cargado(self) -> asyncio.AbstractEventLoop:
+        return min(self._loops, key=lambda loop: len(self._tareas[loop]))
+
+    def _programar_tarea(self, coro, name: str = None):
+        self._iniciar()
+        loop = self._loop_menos_cargado()
+        tareas = self._tareas[loop]
+
+        async def _crear():
+            tarea = asyncio.get_running_loop().create_task(coro, name=name)
+            tareas.add(tarea)
+            tarea.add_done_callback(tareas.discard)
+            return tarea
+
+        return loop, asyncio.run_coroutine_threadsafe(_crear(), loop)
+
+    def crear_tarea(self, coro, name: str = None, timeout: float = 10) -> tuple[asyncio.AbstractEventLoop, asyncio.Task]:
+        """
+        Programa `coro` como tarea en el loop con menos tareas y devuelve (loop, tarea).
+        """
+        loop, futuro = self._programar_tarea(coro, name)
+        return loop, futuro.result(timeout)
+
+    async def crear_tarea_async(self, coro, name: str = None, timeout: float = 10) -> tuple[asyncio.AbstractEventLoop, asyncio.Task]:
+        """
+        Igual que `crear_tarea`, esperando sin bloquear el event loop que llama (p.ej. el de FastAPI).
+        """
+        loop, futuro = self._programar_tarea(coro, name)
+        return loop, await asyncio.wait_for(asyncio.wrap_future(futuro), timeout)
+
+    @staticmethod
+    def _programar_cancelacion(loop: asyncio.AbstractEventLoop, tarea: asyncio.Task):
+        async def _cancelar():
+            tarea.cancel()
+            try:
+                await tarea
+            except asyncio.CancelledError:
+                logger.info(f"⛔ Tarea {tarea.get_name()} cancelada correctamente.")
+            except Exception as e:
+                logger.warning(f"⚠️ La tarea {tarea.get_name()} terminó con error al cancelarse: {e}")
+
+        return asyncio.run_coroutine_threadsafe(_cancelar(), loop)
+
+    @staticmethod
+    def cancelar_tarea(loop: asyncio.AbstractEventLoop, tarea: asyncio.Task, timeout: float = 30):
+        """
+        Cancela la tarea desde cualquier hilo y espera a que termine su limpieza.
+        """
+        if loop.is_closed():
+            return
+        EventLoopPool._programar_cancelacion(loop, tarea).result(timeout)
+
+    @staticmethod
+    async def cancelar_tarea_async(loop: asyncio.AbstractEventLoop, tarea: asyncio.Task, timeout: float = 30):
+        """
+        Igual que `cancelar_tarea`; la limpieza de la estrategia no bloquea el event loop que espera.
+        """
+        if loop.is_closed():
+            return
+        await asyncio.wait_for(asyncio.wrap_future(EventLoopPool._programar_cancelacion(loop, tarea)), timeout)
+
+    def total_tareas(self) -> int:
+        return sum(len(tareas) for tareas in self._tareas.values())
+
+    def cerrar(self, timeout: float = 10):
+        with self._lock:
+            loops, self._loops = self._loops, []
+            threads, self._threads = self._threads, []
+            self._tareas.clear()
+        for loop in loops:
+            # Las sesiones HTTP de ordenes (AsyncClient) viven en el loop: cerrarlas antes de pararlo
+            try:
+                asyncio.run_coroutine_threadsafe(cerrar_clientes_async(loop), loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudieron cerrar los clientes HTTP del loop: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,105 @@
+# src/services/market_candles.py
+from core.market_data.symbol_catalog import symbol_catalog
+from src.wsclients.stream_hub import stream_hub, BinanceStreamHub
+from src.services.candle_conflator import candle_conflator, CandleConflator
+from src.services.ws_manager import ws_manager
+import asyncio
+import logging
+import re
+import threading
+
+logger = logging.getLogger("TRADING_BOT")
+
+# Grupo de candle-stream con las velas de mercado de un simbolo: "BTCUSDT@5m"
+PATRON_GRUPO = re.compile(r"^([A-Z0-9]+)@([0-9]+[mhd])$")
+
+
+class MarketCandles:
+    """
+    Velas de mercado para grupos de candle-stream `SYMBOL@interval`, sin estrategia.
+
+    El grupo se suscribe al hub con el primer cliente y se libera con el ultimo. Los
+    intervalos agregados salen del mismo stream de 1m del simbolo, asi que cambiar de
+    temporalidad en el frontend no abre streams nuevos en Binance.
+    """
+
+    def __init__(self, hub: BinanceStreamHub = stream_hub, conflator: CandleConflator = candle_conflator):
+        self.hub = hub
+        self.conflator = conflator
+        self._clientes: dict[str, int] = {}
+        self._callbacks: dict[str, callable] = {}
+        self._lock = threading.Lock()
+
+    def grupo(self, group: str):
+        """
+        (symbol, interval) si `group` es un grupo de mercado; None si es de una estrategia.
+        """
+        coincidencia = PATRON_GRUPO.match(group)
+        if coincidencia is None:
+            return None
+        symbol, interval = coincidencia.groups()
+        if interval != "1m" and not self.hub.es_agregado(interval):
+            return None
+        return symbol, interval
+
+    async def agregar_cliente(self, group: str):
+        symbol, interval = self.grupo(group)
+        with self._lock:
+            self._clientes[group] = self._clientes.get(group, 0) + 1
+            if self._clientes[group] > 1:
+                return
+            callback = self._callbacks[group] = self._callback(group)
+        loop = asyncio.get_running_loop()
+        stream = BinanceStreamHub.kline_stream(symbol, interval)
+        # La suscripcion puede abrir una conexion nueva y la semilla hace REST: fuera del loop
+        await loop.run_in_executor(None, self.hub.suscribir, stream, callback)
+        await loop.run_in_executor(None, self._sembrar, symbol, interval)
+        logger.info(f"🕯️ Velas de mercado {group} publicadas por candle-stream")
+
+    async def quitar_cliente(self, group: str):
+        symbol, interval = self.grupo(group)
+        with self._lock:
+            self._clientes[group] = self._clientes.get(group, 1) - 1
+            if self._clientes[group] > 0:
+                return
+            del self._clientes[group]
+            callback = self._callbacks.pop(group)
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.hub.desuscribir, BinanceStreamHub.kline_stream(symbol, interval), callback
+        )
+
+    def _sembrar(self, symbol: str, interval: str):
+        if self.hub.es_agregado(interval):
+            self.hub.sembrar(symbol, interval, symbol_catalog.client)
+
+    def _callback(self, group: str):
+        def publicar(_, data: dict):
+            # Hilo lector del hub: se publica en el loop del manager, como las estrategias
+            loop = ws_manager.loop
+            if loop is None or loop.is_closed():
+                return
+            k = data["k"]
+            mensaje = {
+                "tipo": "candle",
+                "symbol": k["s"],
+                "open_time": k["t"],
+                "open": float(k["o"]),
+                "high": float(k["h"]),
+                "low": float(k["l"]),
+                "close": float(k["c"]),
+                "volume": float(k["v"]),
+                "interval": k["i"],
+                "close_time": k["T"],
+            }
+            clave = (k["s"], k["i"], k["t"])
+            asyncio.run_coroutine_threadsafe(
+                self.conflator.publicar(mensaje, group=group, clave=clave, cerrada=k["x"]), loop
+            )
+        return publicar
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return dict(self._clientes)
+
+
+market_candles = MarketCandles()
@@ -0,0 +1,159 @@
+# src/services/market_data_service.py
+from config.settings import BINANCE_FUTURES_REST_URL, TICKER_MAX_AGE
+from src.wsclients.stream_hub import stream_hub, BinanceStreamHub
+from fastapi import HTTPException
+import aiohttp
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger("TRADING_BOT")
+
+# Stream con el ticker de 24h de todos los simbolos (un mensaje por segundo con los que cambiaron)
+TICKER_STREAM = "!ticker@arr"
+
+# Segundos sin reintentar la suscripcion tras un fallo (mientras tanto las lecturas van por REST)
+REINTENTO_SUSCRIPCION = 30
+
+# Campo del evento del stream -> campo de la respuesta REST /fapi/v1/ticker/24hr
+CAMPOS_TICKER = {
+    "s": "symbol",
+    "p": "priceChange",
+    "P": "priceChangePercent",
+    "w": "weightedAvgPrice",
+    "c": "lastPrice",
+    "Q": "lastQty",
+    "o": "openPrice",
+    "h": "highPrice",
+    "l": "lowPrice",
+    "v": "volume",
+    "q": "quoteVolume",
+    "O": "openTime",
+    "C": "closeTime",
+    "F": "firstId",
+    "L": "lastId",
+    "n": "count",
+}
+
+
+def _ahora_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class TickerCache:
+    """
+    Estadisticas de 24h de todos los simbolos en memoria, alimentadas por `!ticker@arr`.
+
+    Las lecturas no tocan la red; solo un fallo en frio (simbolo nunca visto o dato mas
+    viejo que `max_age` segundos, p.ej. si se cayo el stream) hace un GET REST
+    asincrono con una sesion HTTP reutilizada. Cada respuesta incluye `updatedAt` (ms)
+    y la `fuente` del dato.
+    """
+
+    def __init__(self, hub: BinanceStreamHub = stream_hub, max_age: float = TICKER_MAX_AGE):
+        self.hub = hub
+        self.max_age = max_age
+        self._tickers: dict[str, dict] = {}
+        self._suscrito = False
+        self._lock = threading.Lock()
+        # Sesion HTTP para los fallos en frio (ligada al loop que la creo)
+        self._session: aiohttp.ClientSession = None
+        self._session_loop = None
+        self._reintentar_en = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def iniciar(self):
+        """
+        Suscribe la cache a `!ticker@arr`. Bloqueante (abre la conexion del hub): llamar
+        desde un hilo, nunca desde el loop de eventos.
+        """
+        # El lock se mantiene durante la suscripcion: una llamada concurrente espera en vez de duplicarla
+        with self._lock:
+            if self._suscrito:
+                return
+            self.hub.suscribir(TICKER_STREAM, self._on_tickers)
+            # Solo tras suscribir con exito; si falla, la siguiente lectura lo vuelve a intentar
+            self._suscrito = True
+        logger.info("📈 Cache de tickers suscrita a !ticker@arr")
+
+    def detener(self):
+        with self._lock:
+            if not self._suscrito:
+                return
+            self._suscrito = False
+            self.hub.desuscribir(TICKER_STREAM, self._on_tickers)
+
+    def _on_tickers(self, _, data):
+        # Hilo lector del WebSocket: solo reemplaza entradas del dict
+        for evento in data:
+            ticker = {campo: evento.get(clave) for clave, campo in CAMPOS_TICKER.items()}
+            ticker["updatedAt"] = evento.get("E")
+            ticker["fuente"] = "stream"
+            self._tickers[ticker["symbol"]] = ticker
+
+    def _vigente(self, ticker: dict) -> bool:
+        return ticker is not None and _ahora_ms() - (ticker["updatedAt"] or 0) <= self.max_age * 1000
+
+    async def obtener(self, symbol: str) -> dict:
+        symbol = symbol.upper()
+        if not self._suscrito and time.monotonic() >= self._reintentar_en:
+            # Normalmente ya se suscribio en el arranque; si no, sin bloquear el loop
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.iniciar)
+            except Exception as e:
+                self._reintentar_en = time.monotonic() + REINTENTO_SUSCRIPCION
+                logger.warning(f"⚠️ No se pudo suscribir a {TICKER_STREAM}, se usa REST: {e}")
+
+        ticker = self._tickers.get(symbol)
+        if self._vigente(ticker):
+            self.hits += 1
+            return ticker
+
+        self.misses += 1
+        ticker = await self._obtener_rest(symbol)
+        # No pisar un dato mas nuevo que haya llegado por el stream mientras tanto
+        actual = self._tickers.get(symbol)
+        if actual is None or (actual["updatedAt"] or 0) < ticker["updatedAt"]:
+            self._tickers[symbol] = ticker
+        return ticker
+
+    def _sesion(self) -> aiohttp.ClientSession:
+        # Una sesion (y su pool de conexiones) por loop; se recrea si se cerro o cambio el loop
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession()
+            self._session_loop = loop
+        return self._session
+
+    async def _obtener_rest(self, symbol: str) -> dict:
+        url = f"{BINANCE_FUTURES_REST_URL}/fapi/v1/ticker/24hr"
+        try:
+            async with self._sesion().get(url, params={"symbol": symbol}) as response:
+                if response.status != 200:
+                    raise HTTPException(status_code=response.status, detail="Error al obtener los datos del mercado")
+                data = await response.json()
+        except aiohttp.ClientError as e:
+            raise HTTPException(status_code=502, detail=f"Error al obtener los datos del mercado: {e}")
+
+        ticker = {campo: data[campo] for campo in CAMPOS_TICKER.values()}
+        ticker["updatedAt"] = _ahora_ms()
+        ticker["fuente"] = "rest"
+        return ticker
+
+    async def cerrar(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def estadisticas(self) -> dict:
+        return {
+            "simbolos": len(self._tickers),
+            "suscrito": self._suscrito,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+ticker_cache = TickerCache()
@@ -0,0 +1,344 @@
+# src/services/market_scanner.py
+from concurrent.futures import ThreadPoolExecutor
+from binance.helpers import interval_to_milliseconds
+from config.settings import (
+    SCANNER_INTERVAL, SCANNER_BARS, SCANNER_GRACE, SCANNER_TOP, SCANNER_WARMUP_WORKERS, SL_DOLLAR, TP_DOLLAR,
+)
+from core.market_data.symbol_catalog import symbol_catalog
+from core.market_data.daily_cache import daily_ema_cache
+from core.market_data.kline_store import kline_store
+from src.strategies.scalping.scalping_lp import ScalpingStrategyLP
+from src.wsclients.stream_hub import stream_hub, BinanceStreamHub
+from src.services.ws_manager import ws_manager
+import asyncio
+import logging
+import threading
+import time
+import numpy as np
+
+logger = logging.getLogger("TRADING_BOT")
+
+GRUPO = "scanner"
+
+# Filas de la matriz de velas (campo x simbolo x vela)
+CAMPOS = ("open_time", "open", "high", "low", "close", "volume")
+T, O, H, L, C, V = range(len(CAMPOS))
+
+
+def pesos_ema(periodo: int, n: int) -> np.ndarray:
+    """
+    Pesos w tales que `cierres @ w` es el ultimo valor de `ema(cierres, periodo)` sobre
+    una ventana de n velas (la primera vela es la semilla, como en la version batch).
+    """
+    alpha = 2 / (periodo + 1)
+    w = alpha * (1 - alpha) ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    w[0] = (1 - alpha) ** (n - 1)
+    return w
+
+
+class MarketScanner:
+    """
+    Evalua las condiciones de entrada de ScalpingStrategyLP sobre todos los simbolos a la vez.
+
+    Las ultimas `barras` velas cerradas de cada simbolo viven en una sola matriz
+    (campo x simbolo x vela) indexada por tiempo: la vela que abre en t ocupa la columna
+    (t / intervalo) % barras, asi cada mensaje del stream se escribe en su sitio en O(1).
+    Al cerrar cada vela (mas `espera` segundos para que lleguen los demas simbolos) se
+    calculan EMAs, RSI, volumen medio y rupturas para todos los simbolos con operaciones
+    de arrays, y las coincidencias ordenadas por volumen relativo se publican en el grupo
+    `scanner`. El filtro de la EMA diaria solo se consulta para esas pocas coincidencias.
+    """
+
+    def __init__(self, interval: str = SCANNER_INTERVAL, barras: int = SCANNER_BARS, espera: float = SCANNER_GRACE,
+                 top: int = SCANNER_TOP, hub: BinanceStreamHub = stream_hub):
+        self.interval = interval
+        self.barras = barras
+        self.espera = espera
+        self.top = top
+        self.hub = hub
+        self.intervalo_ms = interval_to_milliseconds(interval)
+
+        # Periodos de los indicadores que declara la estrategia (ver BaseStrategy.INDICADORES)
+        indicadores = ScalpingStrategyLP.INDICADORES
+        self.ema_rapida = indicadores["ema9"].period
+        self.ema_lenta = indicadores["ema26"].period
+        self.rsi_periodo = indicadores["rsi"].period
+        self.volumen_periodo = indicadores["vol_prom"].period
+        self._pesos = {
+            periodo: (pesos_ema(periodo, barras), pesos_ema(periodo, barras - 1))
+            for periodo in (self.ema_rapida, self.ema_lenta)
+        }
+
+        self.simbolos: list[str] = []
+        self._filas: dict[str, int] = {}
+        self._velas = np.full((len(CAMPOS), 0, barras), np.nan)
+        self._lock = threading.Lock()
+        self._clientes = 0
+        self._clientes_lock = threading.Lock()
+        # Serializa iniciar/detener por cambios de clientes (se mantiene durante toda la transicion)
+        self._ciclo_lock = threading.Lock()
+        self._programada = 0
+        self._temporizador: threading.Timer = None
+        self._calentamiento: ThreadPoolExecutor = None
+        self.ultimo: dict = None
+        self.evaluaciones = 0
+
+    @property
+    def activo(self) -> bool:
+        return bool(self.simbolos)
+
+    # --- Clientes del grupo ---
+
+    async def agregar_cliente(self):
+        with self._clientes_lock:
+            self._clientes += 1
+            if self._clientes > 1:
+                return
+        # Catalogo, suscripciones y REST de calentamiento: fuera del loop
+        await asyncio.get_running_loop().run_in_executor(None, self._sincronizar)
+
+    async def quitar_cliente(self):
+        with self._clientes_lock:
+            self._clientes -= 1
+            if self._clientes > 0:
+                return
+        await asyncio.get_running_loop().run_in_executor(None, self._sincronizar)
+
+    def _sincronizar(self):
+        """
+        Deja el scanner activo si hay clientes y detenido si no. Las transiciones se serializan
+        y el numero de clientes se vuelve a leer tras cada una: un ultimo cliente que se va
+        mientras `iniciar` aun corre detiene el scanner al terminar, en vez de adelantarse a el.
+        """
+        with self._ciclo_lock:
+            while True:
+                with self._clientes_lock:
+                    clientes = self._clientes
+                if clientes > 0 and not self.activo:
+                    self.iniciar()
+                    if not self.activo:
+                        # Catalogo vacio: nada que escanear
+                        return
+                elif clientes == 0 and self.activo:
+                    self.detener()
+                else:
+                    return
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self, simbolos: list[str] = None):
+        """
+        Suscribe las velas de todos los simbolos en TRADING y carga su historial en segundo plano.
+        """
+        simbolos = simbolos if simbolos is not None else symbol_catalog.simbolos()
+        with self._lock:
+            self.simbolos = list(simbolos)
+            self._filas = {symbol: i for i, symbol in enumerate(self.simbolos)}
+            self._velas = np.full((len(CAMPOS), len(self.simbolos), self.barras), np.nan)
+            self._programada = 0
+        streams = [BinanceStreamHub.kline_stream(symbol, self.interval) for symbol in self.simbolos]
+        self.hub.suscribir_varios(streams, self._on_kline)
+
+        # El stream ya esta escribiendo: el historial solo completa las columnas anteriores
+        self._calentamiento = ThreadPoolExecutor(max_workers=SCANNER_WARMUP_WORKERS, thread_name_prefix="scanner-warmup")
+        for symbol in self.simbolos:
+            self._calentamiento.submit(self._calentar, symbol)
+        logger.info(f"🔭 Scanner {self.interval} iniciado sobre {len(self.simbolos)} simbolos ({self.barras} velas)")
+
+    def detener(self):
+        if not self.activo:
+            return
+        streams = [BinanceStreamHub.kline_stream(symbol, self.interval) for symbol in self.simbolos]
+        self.hub.desuscribir_varios(streams, self._on_kline)
+        if self._calentamiento is not None:
+            self._calentamiento.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+            self.simbolos, self._filas = [], {}
+            self._velas = np.full((len(CAMPOS), 0, self.barras), np.nan)
+        logger.info("🔭 Scanner detenido")
+
+    def _calentar(self, symbol: str):
+        try:
+            df = kline_store.obtener(symbol_catalog.client, symbol, self.interval, limite=self.barras)
+        except Exception as e:
+            logger.warning(f"⚠️ Scanner: sin historial para {symbol}: {e}")
+            return
+        if df.empty:
+            return
+        valores = np.stack([df[campo].to_numpy(dtype=np.float64) for campo in CAMPOS])
+        self.escribir(symbol, valores)
+
+    # --- Datos ---
+
+    def escribir(self, symbol: str, valores: np.ndarray):
+        """
+        Guarda velas cerradas de `symbol` (array campos x velas) en sus columnas;
+        una vela nunca reemplaza a otra mas reciente que ocupe la misma columna.
+        """
+        columnas = (valores[T] // self.intervalo_ms).astype(np.int64) % self.barras
+        with self._lock:
+            fila = self._filas.get(symbol)
+            if fila is None:
+                return
+            actuales = self._velas[T, fila, columnas]
+            nuevas = ~(actuales >= valores[T])
+            self._velas[:, fila, columnas[nuevas]] = valores[:, nuevas]
+
+    def _on_kline(self, _, data: dict):
+        # Hilo lector del hub: solo velas cerradas
+        k = data["k"]
+        if not k["x"]:
+            return
+        open_time = int(k["t"])
+        valores = np.array([[open_time], [float(k["o"])], [float(k["h"])], [float(k["l"])], [float(k["c"])], [float(k["v"])]])
+        self.escribir(k["s"], valores)
+        self._programar(open_time)
+
+    def _programar(self, open_time: int):
+        # Una evaluacion por vela: la primera vela cerrada de cada intervalo la programa
+        with self._lock:
+            if open_time <= self._programada:
+                return
+            self._programada = open_time
+            self._temporizador = threading.Timer(self.espera, self._evaluar_y_publicar, (open_time,))
+            self._temporizador.daemon = True
+            self._temporizador.start()
+
+    def ventana(self, open_time: int) -> np.ndarray:
+        """
+        Copia de las velas (campos x simbolos x barras) que terminan en la vela `open_time`, en
+        orden cronologico; las celdas que no corresponden a su minuto quedan en NaN.
+        """
+        tiempos = open_time - self.intervalo_ms * np.arange(self.barras - 1, -1, -1, dtype=np.int64)
+        columnas = (tiempos // self.intervalo_ms) % self.barras
+        with self._lock:
+            velas = self._velas[:, :, columnas]
+        velas[:, velas[T] != tiempos] = np.nan
+        return velas
+
+    # --- Evaluacion ---
+
+    def evaluar(self, open_time: int) -> dict:
+        """
+        Una pasada vectorizada sobre todos los simbolos para la vela que abre en `open_time`.
+        """
+        inicio = time.perf_counter()
+        velas = self.ventana(open_time)
+        open_, high, low, close, volume = velas[O], velas[H], velas[L], velas[C], velas[V]
+
+        # Minutos sin vela (hueco en el stream): precio anterior y volumen cero
+        huecos = np.isnan(close)
+        indices = np.where(huecos, 0, np.arange(self.barras))
+        np.maximum.accumulate(indices, axis=1, out=indices)
+        filas = np.arange(close.shape[0])[:, None]
+        close = close[filas, indices]
+        high = np.where(huecos, close, high)
+        low = np.where(huecos, close, low)
+        volume = np.where(huecos, 0.0, volume)
+        # Solo se evaluan los simbolos con la vela actual y la ventana completa
+        evaluables = ~huecos[:, -1] & ~np.isnan(close[:, 0])
+
+        ema_rapida, ema_rapida_prev = self._ema(close, self.ema_rapida)
+        ema_lenta, ema_lenta_prev = self._ema(close, self.ema_lenta)
+        cruce_alcista = (ema_rapida_prev < ema_lenta_prev) & (ema_rapida > ema_lenta)
+        cruce_bajista = (ema_rapida_prev > ema_lenta_prev) & (ema_rapida < ema_lenta)
+
+        ruptura_alcista = high[:, -1] > high[:, -3:-1].max(axis=1)
+        ruptura_bajista = low[:, -1] < low[:, -3:-1].min(axis=1)
+
+        volumen_medio = volume[:, -self.volumen_periodo:].mean(axis=1)
+        volumen_ok = volume[:, -1] > volumen_medio * 2
+
+        rsi = self._rsi(close)
+        vela_alcista = close[:, -1] > open_[:, -1]
+        vela_bajista = close[:, -1] < open_[:, -1]
+
+        with np.errstate(invalid="ignore"):
+            largo = evaluables & cruce_alcista & ruptura_alcista & volumen_ok & (rsi > 50) & vela_alcista
+            corto = evaluables & cruce_bajista & ruptura_bajista & volumen_ok & (rsi < 50) & vela_bajista
+        vectorizado = time.perf_counter() - inicio
+
+        coincidencias = []
+        for fila in np.flatnonzero(largo | corto):
+            modo = "LONG" if largo[fila] else "SHORT"
+            symbol = self.simbolos[fila]
+            precio = float(close[fila, -1])
+            if not self._tendencia_diaria(symbol, modo, precio, open_time + self.intervalo_ms):
+                continue
+            coincidencias.append({
+                "symbol": symbol,
+                "modo": modo,
+                "precio": precio,
+                "sl": precio - SL_DOLLAR if modo == "LONG" else precio + SL_DOLLAR,
+                "tp": precio + TP_DOLLAR if modo == "LONG" else precio - TP_DOLLAR,
+                "rsi": float(rsi[fila]),
+                "volumen_relativo": float(volume[fila, -1] / volumen_medio[fila]),
+                "ema_rapida": float(ema_rapida[fila]),
+                "ema_lenta": float(ema_lenta[fila]),
+            })
+        coincidencias.sort(key=lambda c: c["volumen_relativo"], reverse=True)
+
+        return {
+            "tipo": "scanner",
+            "interval": self.interval,
+            "open_time": open_time,
+            "simbolos": int(evaluables.sum()),
+            "duracion_ms": (time.perf_counter() - inicio) * 1000,
+            "vectorizado_ms": vectorizado * 1000,
+            "coincidencias": coincidencias[:self.top],
+        }
+
+    def _ema(self, close: np.ndarray, periodo: int) -> tuple:
+        # Ultimo y penultimo valor de la EMA: dos productos matriz-vector
+        pesos, pesos_prev = self._pesos[periodo]
+        return close @ pesos, close[:, :-1] @ pesos_prev
+
+    def _rsi(self, close: np.ndarray) -> np.ndarray:
+        # Mismas medias moviles de ganancias y perdidas que `rsi` sobre las ultimas `periodo` diferencias
+        delta = np.diff(close[:, -(self.rsi_periodo + 1):], axis=1)
+        ganancia = np.where(delta > 0, delta, 0.0).mean(axis=1)
+        perdida = np.where(delta < 0, -delta, 0.0).mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - 100 / (1 + ganancia / perdida)
+        return np.where(perdida == 0, np.where(ganancia > 0, 100.0, np.nan), rsi)
+
+    def _tendencia_diaria(self, symbol: str, modo: str, precio: float, timestamp_ms: int) -> bool:
+        # Mismo filtro flexible que la estrategia; una consulta REST por simbolo y dia (cache compartida)
+        try:
+            ema_diaria = daily_ema_cache.obtener(symbol, symbol_catalog.client, timestamp_ms)
+        except Exception as e:
+            logger.warning(f"⚠️ Scanner: sin EMA diaria para {symbol}: {e}")
+            return False
+        ema_dia, serie = ema_diaria.valor(precio), ema_diaria.serie(precio, 3)
+        if modo == "LONG":
+            return precio > ema_dia or all(a <= b for a, b in zip(serie, serie[1:]))
+        return precio < ema_dia or all(a >= b for a, b in zip(serie, serie[1:]))
+
+    def _evaluar_y_publicar(self, open_time: int):
+        try:
+            resultado = self.evaluar(open_time)
+        except Exception:
+            logger.exception("❌ Error en la pasada del scanner")
+            return
+        self.ultimo = resultado
+        self.evaluaciones += 1
+        logger.info(f"🔭 Scanner {self.interval}: {resultado['simbolos']} simbolos en {resultado['duracion_ms']:.1f} ms, "
+                    f"{len(resultado['coincidencias'])} coincidencias")
+        loop = ws_manager.loop
+        if loop is not None and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(ws_manager.broadcast(resultado, group=GRUPO), loop)
+
+    def estadisticas(self) -> dict:
+        return {
+            "interval": self.interval,
+            "simbolos": len(self.simbolos),
+            "barras": self.barras,
+            "clientes": self._clientes,
+            "evaluaciones": self.evaluaciones,
+            "ultima": None if self.ultimo is None else {k: self.ultimo[k] for k in ("open_time", "simbolos", "duracion_ms")},
+        }
+
+
+market_scanner = MarketScanner()
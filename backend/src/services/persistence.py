@@ -0,0 +1,213 @@
+# src/services/persistence.py
+from config.settings import (
+    PERSISTENCE_BATCH_SIZE,
+    PERSISTENCE_FLUSH_INTERVAL,
+    PERSISTENCE_QUEUE_SIZE,
+    MAX_RETRIES,
+    RETRY_DELAY,
+)
+from datetime import datetime, timezone
+from decimal import Decimal
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger("TRADING_BOT")
+
+_FIN = object()
+
+
+def _decimal(valor):
+    if valor is None or valor == "":
+        return None
+    return Decimal(str(valor))
+
+
+def _fecha(timestamp_ms):
+    if timestamp_ms is None:
+        return None
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
+
+def fila_orden(operacion: dict) -> dict:
+    """
+    Convierte una operacion del journal ('new-trade') en una fila de `ordenes`.
+    """
+    precio = _decimal(operacion.get("precio"))
+    es_entrada = operacion.get("orden") == "ENTRY"
+    return {
+        "tipo": operacion.get("orden"),
+        "precio_entrada": precio if es_entrada else None,
+        "precio_salida": None if es_entrada else precio,
+        # PnL realizado de la ejecucion (exchange simulado); None si la orden no lo informa
+        "resultado": _decimal(operacion.get("pnl")),
+        "estado": operacion.get("status"),
+        "symbol": operacion.get("simbolo"),
+        "nombre_estrategia": operacion.get("estrategia"),
+        "orden_id": str(operacion["orden_id"]) if operacion.get("orden_id") is not None else None,
+        "side": operacion.get("side"),
+        "cantidad": _decimal(operacion.get("quantity")),
+        "fecha_evento": _fecha(operacion.get("timestamp")),
+    }
+
+
+def fila_transaccion(operacion: dict) -> dict:
+    """
+    Fila de `transacciones` para una orden ejecutada (None si no hubo ejecucion).
+    """
+    if operacion.get("status") != "FILLED":
+        return None
+    precio = _decimal(operacion.get("precio"))
+    cantidad = _decimal(operacion.get("quantity"))
+    return {
+        "tipo": "Compra" if operacion.get("side") == "BUY" else "Venta",
+        "monto": precio * cantidad if precio is not None and cantidad is not None else None,
+        "symbol": operacion.get("simbolo"),
+        "nombre_estrategia": operacion.get("estrategia"),
+        "orden_id": str(operacion["orden_id"]) if operacion.get("orden_id") is not None else None,
+        "precio": precio,
+        "cantidad": cantidad,
+    }
+
+
+class PersistenceWorker:
+    """
+    Escritura diferida (write-behind) de ordenes y transacciones.
+
+    El runtime solo deja los eventos en una cola acotada (sin bloquear nunca; si la cola
+    esta llena el evento se descarta y se cuenta). Un hilo de fondo los agrupa y los
+    inserta en bloque cuando junta `batch_size` filas o pasan `intervalo` segundos.
+    Un lote que falla se reprograma con espera exponencial sin detener a los siguientes.
+    """
+
+    def __init__(self, batch_size: int = PERSISTENCE_BATCH_SIZE, intervalo: float = PERSISTENCE_FLUSH_INTERVAL,
+                 max_cola: int = PERSISTENCE_QUEUE_SIZE, engine=None):
+        self.batch_size = batch_size
+        self.intervalo = intervalo
+        self._cola: queue.Queue = queue.Queue(maxsize=max_cola)
+        self._engine = engine
+        self._hilo: threading.Thread = None
+        self._lock = threading.Lock()
+        # Lotes fallidos (plazo, seq, intento, operaciones); solo los toca el hilo escritor
+        self._reintentos: list[tuple] = []
+        self._seq = itertools.count()
+        self.escritas = 0
+        self.descartadas = 0
+        self.lotes = 0
+        self.errores = 0
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            # Import diferido: el runtime no depende de la base de datos para arrancar
+            from src.database.database import engine
+            self._engine = engine
+        return self._engine
+
+    def iniciar(self):
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+                self._hilo.start()
+
+    def detener(self, timeout: float = 10):
+        """
+        Escribe lo pendiente y detiene el hilo.
+        """
+        with self._lock:
+            hilo = self._hilo
+            self._hilo = None
+        if hilo is not None and hilo.is_alive():
+            self._cola.put(_FIN)
+            hilo.join(timeout)
+
+    def registrar_operaciones(self, operaciones: list[dict]):
+        """
+        Encola las operaciones para persistir. No bloquea.
+        """
+        if self._hilo is None:
+            self.iniciar()
+        for operacion in operaciones:
+            try:
+                self._cola.put_nowait(operacion)
+            except queue.Full:
+                self.descartadas += 1
+                logger.warning(f"⚠️ Cola de persistencia llena, operacion descartada: {operacion.get('orden_id')}")
+
+    def _run(self):
+        pendientes = []
+        limite = time.monotonic() + self.intervalo
+        while True:
+            espera = min(limite, self._reintentos[0][0]) if self._reintentos else limite
+            try:
+                evento = self._cola.get(timeout=max(0.0, espera - time.monotonic()))
+            except queue.Empty:
+                evento = None
+
+            if evento is _FIN:
+                self._escribir(pendientes)
+                # Ultimo intento (sin esperar su plazo) para los lotes pendientes de reintento
+                while self._reintentos:
+                    _, _, intento, lote = heapq.heappop(self._reintentos)
+                    self._escribir(lote, intento, reintentar=False)
+                return
+            if evento is not None:
+                pendientes.append(evento)
+
+            if len(pendientes) >= self.batch_size or time.monotonic() >= limite:
+                self._escribir(pendientes)
+                pendientes = []
+                limite = time.monotonic() + self.intervalo
+
+            while self._reintentos and self._reintentos[0][0] <= time.monotonic():
+                _, _, intento, lote = heapq.heappop(self._reintentos)
+                self._escribir(lote, intento)
+
+    def _escribir(self, operaciones: list[dict], intento: int = 1, reintentar: bool = True):
+        """
+        Inserta el lote. Si falla se reprograma tras RETRY_DELAY * 2^(intento-1) segundos, hasta
+        MAX_RETRIES intentos: el hilo nunca duerme, asi los lotes nuevos se siguen escribiendo.
+        """
+        if not operaciones:
+            return
+        from sqlalchemy import insert
+        from src.database.models import Orden, Transaccion
+
+        ordenes = [fila_orden(op) for op in operaciones]
+        transacciones = [fila for fila in map(fila_transaccion, operaciones) if fila is not None]
+
+        try:
+            # Un INSERT por tabla con todas las filas (executemany) en una sola transaccion
+            with self.engine.begin() as conn:
+                conn.execute(insert(Orden), ordenes)
+                if transacciones:
+                    conn.execute(insert(Transaccion), transacciones)
+            self.escritas += len(ordenes) + len(transacciones)
+            self.lotes += 1
+            return
+        except Exception as e:
+            self.errores += 1
+            logger.warning(f"⚠️ Error persistiendo {len(ordenes)} ordenes (intento {intento}/{MAX_RETRIES}): {e}")
+
+        if reintentar and intento < MAX_RETRIES:
+            plazo = time.monotonic() + RETRY_DELAY * 2 ** (intento - 1)
+            heapq.heappush(self._reintentos, (plazo, next(self._seq), intento + 1, operaciones))
+            return
+        logger.error(f"❌ Se descartan {len(ordenes)} ordenes tras {intento} intentos fallidos")
+        self.descartadas += len(operaciones)
+
+    def estadisticas(self) -> dict:
+        return {
+            "en_cola": self._cola.qsize(),
+            "pendientes_reintento": sum(len(lote) for *_, lote in list(self._reintentos)),
+            "escritas": self.escritas,
+            "lotes": self.lotes,
+            "descartadas": self.descartadas,
+            "errores": self.errores,
+        }
+
+
+persistence_worker = PersistenceWorker()
@@ -0,0 +1,225 @@
+# src/services/replay.py
+"""
+Replay offline del runtime de estrategias a partir de mensajes kline grabados.
+
+    PYTHONPATH=src python -m src.services.replay grabacion.jsonl --symbol BTCUSDT --strategy scalping-lp --timeframe 1m --speed 0
+
+Las velas pasan por el pipeline completo de `StrategyRunner._run_strategy`
+(indicadores, check_entry, TradeExecutor en modo mock y broadcasts de ws_manager)
+sin tocar la red. Los ficheros se graban con KLINE_RECORD_DIR o con `exportar_klines`.
+"""
+from binance.helpers import interval_to_milliseconds
+from config.settings import HISTORY_WARMUP_BARS
+from core.market_data.candle_aggregator import CandleAggregator
+from core.market_data.kline_store import COLUMNAS
+from src.wsclients.replay_ws import ReplayWebSocket, tiempo_mensaje
+import argparse
+import asyncio
+import json
+import logging
+import time
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("TRADING_BOT")
+
+
+def leer_mensajes(ruta: str) -> list[dict]:
+    """
+    Lee un fichero JSON lines de mensajes kline (eventos sueltos o en formato combined-stream).
+    """
+    mensajes = []
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            if not linea.strip():
+                continue
+            message = json.loads(linea)
+            if "data" in message:
+                message = message["data"]
+            if "k" in message:
+                mensajes.append(message)
+    mensajes.sort(key=tiempo_mensaje)
+    return mensajes
+
+
+def exportar_klines(klines: list, symbol: str, interval: str, ruta: str):
+    """
+    Convierte velas en formato REST de Binance en mensajes kline cerrados para replay.
+    """
+    with open(ruta, "w", encoding="utf-8") as f:
+        for kline in klines:
+            open_time, o, h, l, c, v, close_time = kline[:7]
+            message = {
+                "e": "kline", "E": int(close_time) + 1, "s": symbol.upper(),
+                "k": {"t": int(open_time), "T": int(close_time), "s": symbol.upper(), "i": interval,
+                      "o": str(o), "h": str(h), "l": str(l), "c": str(c), "v": str(v), "x": True},
+            }
+            f.write(json.dumps(message, separators=(",", ":")) + "\n")
+
+
+class ReplayClient:
+    """
+    Sustituto offline de `binance.client.Client`: sirve `get_historical_klines` desde las
+    velas grabadas; los intervalos mayores (p.ej. 1d para la EMA diaria) se agregan a partir de ellas.
+    """
+
+    def __init__(self, fuente: "ReplaySource"):
+        self.fuente = fuente
+
+    def get_historical_klines(self, symbol, interval, start_str=None, end_str=None, limit=None, **kwargs):
+        velas = self.fuente.velas_cerradas(symbol)
+        if interval != self.fuente.interval:
+            velas = _agregar(velas, self.fuente.intervalo_mayor(interval))
+        filas = [[int(v[0]), str(v[1]), str(v[2]), str(v[3]), str(v[4]), str(v[5]), int(v[6])] for v in velas]
+        return filas[-limit:] if limit else filas
+
+
+def _agregar(velas: np.ndarray, intervalo_ms: int) -> np.ndarray:
+    if len(velas) == 0:
+        return velas
+    grupos = velas[:, 0] // intervalo_ms
+    inicios = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]])
+    finales = np.r_[inicios[1:], len(velas)] - 1
+    return np.column_stack([
+        grupos[inicios] * intervalo_ms,
+        velas[inicios, 1],
+        np.maximum.reduceat(velas[:, 2], inicios),
+        np.minimum.reduceat(velas[:, 3], inicios),
+        velas[finales, 4],
+        np.add.reduceat(velas[:, 5], inicios),
+        (grupos[inicios] + 1) * intervalo_ms - 1,
+    ])
+
+
+class ReplaySource:
+    """
+    Fuente de datos enchufable en `StrategyRunner.fuente`: las primeras `warmup` velas
+    cerradas del fichero se usan como historial inicial y el resto de mensajes se
+    reproducen por el ReplayWebSocket.
+    """
+
+    def __init__(self, ruta: str, velocidad: float = None, warmup: int = HISTORY_WARMUP_BARS):
+        self.ruta = ruta
+        self.velocidad = velocidad
+        self.mensajes = leer_mensajes(ruta)
+        if not self.mensajes:
+            raise ValueError(f"No hay mensajes kline en {ruta}")
+        self.interval = self.mensajes[0]["k"]["i"]
+
+        cerradas = [m for m in self.mensajes if m["k"]["x"]]
+        if len(cerradas) <= warmup:
+            warmup = len(cerradas) // 2
+            logger.warning(f"⚠️ Pocas velas en el replay: se usan {warmup} como historial inicial")
+        self.warmup = warmup
+        self._fin_warmup = cerradas[warmup - 1]["k"]["T"] if warmup else -1
+
+    def client(self) -> ReplayClient:
+        return ReplayClient(self)
+
+    def intervalo_mayor(self, interval: str) -> int:
+        """
+        Milisegundos de `interval` si se puede construir con las velas grabadas.
+        """
+        ms, base = interval_to_milliseconds(interval), interval_to_milliseconds(self.interval)
+        if ms < base or ms % base:
+            raise ValueError(f"El replay tiene velas de {self.interval}: no se puede construir {interval}")
+        return ms
+
+    def velas_cerradas(self, symbol: str) -> np.ndarray:
+        velas = {}
+        for m in self.mensajes:
+            k = m["k"]
+            if k["x"] and k["s"] == symbol.upper():
+                velas[k["t"]] = (k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"])
+        return np.array(sorted(velas.values()), dtype=np.float64).reshape(-1, len(COLUMNAS))
+
+    def historial_inicial(self, symbol: str, interval: str, limite: int) -> pd.DataFrame:
+        velas = self.velas_cerradas(symbol)
+        velas = velas[velas[:, 6] <= self._fin_warmup]
+        if interval != self.interval:
+            velas = _agregar(velas, self.intervalo_mayor(interval))
+            # La ultima vela agregada puede no estar completa al final del warmup: la termina el replay
+            velas = velas[velas[:, 6] <= self._fin_warmup]
+        velas = velas[-limite:]
+        df = pd.DataFrame(velas, columns=list(COLUMNAS))
+        df["open_time"] = df["open_time"].astype("int64")
+        df["close_time"] = df["close_time"].astype("int64")
+        df["symbol"] = symbol.upper()
+        return df
+
+    def websocket(self, symbol: str, interval: str, logger: logging.Logger = None) -> ReplayWebSocket:
+        mensajes = [m for m in self.mensajes if m["k"]["s"] == symbol.upper() and m["k"]["T"] > self._fin_warmup]
+        if interval != self.interval:
+            mensajes = self._agregar_mensajes(symbol.upper(), interval, mensajes)
+        return ReplayWebSocket(mensajes, self.velocidad, logger)
+
+    def _agregar_mensajes(self, symbol: str, interval: str, mensajes: list) -> list:
+        """
+        Construye los mensajes de `interval` con el CandleAggregator, como en vivo con el stream de 1m.
+        """
+        if self.interval != "1m":
+            raise ValueError(f"Solo se agregan en replay grabaciones de 1m (esta es de {self.interval})")
+        self.intervalo_mayor(interval)
+        agregador = CandleAggregator([interval])
+        # La vela en curso al terminar el warmup se completa con sus minutos, como hace el hub con REST
+        previas = self.velas_cerradas(symbol)
+        agregador.sembrar(symbol, interval, previas[previas[:, 6] <= self._fin_warmup].tolist())
+        return [
+            mensaje
+            for m in mensajes
+            for _, mensaje in agregador.procesar(m["k"], (interval,), m.get("E"))
+        ]
+
+
+async def ejecutar_replay(ruta: str, symbol: str, strategy_name: str, timeframe: str = None,
+                          velocidad: float = None, runner=None) -> dict:
+    """
+    Ejecuta una estrategia sobre una grabacion y devuelve velas/segundo y tiempos por etapa.
+    """
+    from src.services.strategy_runtime import StrategyRunner
+    from core.trade_manager.paper_exchange import PaperExchange
+
+    fuente = ReplaySource(ruta, velocidad)
+    runner = runner or StrategyRunner()
+    runner.fuente = fuente
+    # Exchange simulado propio: el replay no toca las ordenes ni posiciones del modo test en vivo
+    runner.exchange = PaperExchange()
+    # Las operaciones del replay se recogen aqui: no pasan por la base de datos, el journal ni el status-stream
+    operaciones = []
+
+    async def recoger_operaciones(nuevas: list, group="status"):
+        operaciones.extend(nuevas)
+
+    runner.publicar_operaciones = recoger_operaciones
+    runner.tiempos.reiniciar()
+
+    inicio = time.perf_counter()
+    await runner._run_strategy(symbol.upper(), strategy_name, timeframe or fuente.interval, test=True)
+    duracion = time.perf_counter() - inicio
+
+    etapas = runner.tiempos.resumen()
+    mensajes = etapas.get("vela", {}).get("n", 0)
+    return {
+        "mensajes": mensajes,
+        "velas_cerradas": etapas.get("indicadores", {}).get("n", 0),
+        "segundos": duracion,
+        "velas_por_segundo": mensajes / duracion if duracion else 0.0,
+        "etapas": etapas,
+        "paper": runner.exchange.resumen(),
+        "operaciones": operaciones,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay de velas grabadas a traves del runtime de estrategias")
+    parser.add_argument("ruta")
+    parser.add_argument("--symbol", required=True)
+    parser.add_argument("--strategy", default="scalping-lp")
+    parser.add_argument("--timeframe", default=None)
+    parser.add_argument("--speed", type=float, default=0, help="multiplicador de tiempo real (0 = maxima velocidad)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    resultado = asyncio.run(ejecutar_replay(args.ruta, args.symbol, args.strategy, args.timeframe, args.speed or None))
+    resultado["operaciones"] = len(resultado["operaciones"])
+    print(json.dumps(resultado, indent=2))
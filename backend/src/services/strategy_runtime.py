@@ -1,42 +1,142 @@
 # src/services/strategy_runtime.py
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import asyncio
+import functools
+import os
 import threading
-from core import ContextStrategy, TradeExecutor
+import time
+from core import CandleBuffer, ContextStrategy, TradeExecutor
+from core.trade_manager.trade_executor import cerrar_clientes_async
 from src.wsclients.binance_ws import BinanceWebSocket
+from src.wsclients.replay_ws import KlineRecorder
 # from src.controllers.ws_controller import clients
 from src.services.ws_manager import ws_manager
+from src.services.candle_conflator import candle_conflator
+from core.trade_manager.trade_journal import trade_journal
+from core.trade_manager.paper_exchange import paper_exchange
+from core.market_data.symbol_catalog import symbol_catalog
+from core.market_data.kline_store import kline_store
+from src.services.checkpoint import checkpoints
+from src.services.persistence import persistence_worker
+from src.services.loop_pool import EventLoopPool
 from binance.client import Client
+from binance.helpers import interval_to_milliseconds
 from config.settings import *
-import pandas as pd
+from metrics import histograma
 import logging
 import signal
 
-# Diccionario en memerioa para almacenar operaciones activas    
-operaciones = []
 
 logger = logging.getLogger("TRADING_BOT")
 
-class StrategyRunner:
+DURACION_ETAPA = histograma("trading_stage_seconds", "Duracion de cada etapa del procesamiento de una vela", ("stage", "symbol", "strategy"))
+LATENCIA_SENAL_ORDEN = histograma("trading_signal_to_order_seconds", "Desde la recepcion de la vela que da la senal hasta el ack de la entrada", ("symbol", "strategy"))
+
+
+class TiemposEtapas:
+    """
+    Tiempo acumulado por etapa del procesamiento de cada vela (para replay y profiling).
+    Con symbol y strategy la medicion tambien alimenta el histograma de Prometheus.
+    """
+
     def __init__(self):
+        self._etapas: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def medir(self, etapa: str, symbol: str = None, strategy: str = None):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(etapa, time.perf_counter() - inicio, symbol, strategy)
+
+    def registrar(self, etapa: str, segundos: float, symbol: str = None, strategy: str = None):
+        if symbol is not None:
+            DURACION_ETAPA.observar(segundos, etapa, symbol, strategy)
+        with self._lock:
+            datos = self._etapas.setdefault(etapa, [0, 0.0, 0.0])
+            datos[0] += 1
+            datos[1] += segundos
+            datos[2] = max(datos[2], segundos)
+
+    def reiniciar(self):
+        with self._lock:
+            self._etapas.clear()
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                etapa: {
+                    "n": n,
+                    "total_ms": total * 1000,
+                    "media_us": total / n * 1e6 if n else 0.0,
+                    "max_us": maximo * 1e6,
+                }
+                for etapa, (n, total, maximo) in self._etapas.items()
+            }
+
+
+class StrategyRunner:
+    def __init__(self, modo: str = STRATEGY_RUNTIME_MODE):
         self.task = {}
-        self.client = Client(api_key=API_KEY, api_secret=API_SECRET)
+        # Estrategias cuya tarea se esta creando en el pool (ver iniciar_estrategia_async)
+        self._arrancando = set()
+        self.modo = modo
+        self._client = None
         self.timeframe = INTERVAL
+        # Trabajo bloqueante (REST, pandas) acotado a un numero fijo de hilos
+        self.executor = ThreadPoolExecutor(max_workers=STRATEGY_EXECUTOR_WORKERS, thread_name_prefix="strategy-io")
+        self.loop_pool = EventLoopPool(STRATEGY_EVENT_LOOPS) if modo == "shared" else None
+        # Destino de las notificaciones (velas, operaciones); un shard lo redirige al proceso principal
+        self.publicar = ws_manager.broadcast
+        self.publicar_candle = candle_conflator.publicar
+        self.publicar_operaciones = publicar_operaciones
+        # Fuente de velas alternativa (p.ej. ReplaySource); None = Binance en vivo
+        self.fuente = None
+        # Exchange simulado de las estrategias en modo test (un replay usa uno propio, ver ejecutar_replay)
+        self.exchange = paper_exchange
+        self.tiempos = TiemposEtapas()
+
+    @property
+    def client(self):
+        # Perezoso: el constructor de Client hace un ping a Binance
+        if self._client is None:
+            self._client = Client(api_key=API_KEY, api_secret=API_SECRET)
+        return self._client
 
     # def estrategias_disponibles(self):
     #     return list(ContextStrategy.STRATEGIES.keys())
+
+    def _en_ejecucion(self, key):
+        _, handle = self.task[key]
+        if isinstance(handle, threading.Thread):
+            return handle.is_alive()
+        return not handle.done()
     
+    def _ya_en_ejecucion(self, key, symbol, strategy_name):
+        # Mensaje si la estrategia ya corre (o se esta lanzando); las que terminaron se olvidan
+        if key in self._arrancando or (key in self.task and self._en_ejecucion(key)):
+            logger.info(f"⚠️ La estrategia {strategy_name} ya está en ejecución para {symbol}")
+            return f"La estrategia {strategy_name} ya está en ejecución para {symbol}"
+        self.task.pop(key, None)
+        return None
+
     def iniciar_estrategia(self, symbol, strategy_name, timeframe, test=False):
         key = f"{symbol}_{strategy_name}"
         self.timeframe = timeframe
-        if key in self.task:
-            _, thread = self.task[key]
-            if thread.is_alive():
-                logger.info(f"⚠️ La estrategia {strategy_name} ya está en ejecución para {symbol}")
-                return f"La estrategia {strategy_name} ya está en ejecución para {symbol}"
-            else:
-                del self.task[key]
+        mensaje = self._ya_en_ejecucion(key, symbol, strategy_name)
+        if mensaje:
+            return mensaje
+
+        if self.loop_pool is not None:
+            loop, tarea = self.loop_pool.crear_tarea(self._run_strategy(symbol, strategy_name, timeframe, test), name=key)
+            self.task[key] = (loop, tarea)
+            logger.info(f"🚀 Lanzando nueva estrategia: {key} como tarea ({self.loop_pool.total_tareas()} en el pool)")
+            return f"Strategy {strategy_name} started for {symbol}"
 
-        thread = threading.Thread(target=self.__run_loop, args=(symbol, strategy_name, test))
+        thread = threading.Thread(target=self.__run_loop, args=(symbol, strategy_name, timeframe, test))
         thread.start()
 
         logger.info(f"🚀 Lanzando nueva estrategia: {key}, thread id: {thread.ident}")
@@ -46,12 +146,35 @@ class StrategyRunner:
         self.task[key] = (None, thread)
         return f"Strategy {strategy_name} started for {symbol}"
     
-    def __run_loop(self, symbol, strategy_name, test):
+    async def iniciar_estrategia_async(self, symbol, strategy_name, timeframe, test=False):
+        """
+        Igual que `iniciar_estrategia`, para los handlers async de la API: no bloquea el event loop que la llama.
+        """
+        if self.loop_pool is None:
+            # Modo "thread": cada estrategia tiene su hilo, lanzarlo no espera a ningun loop
+            return await asyncio.to_thread(self.iniciar_estrategia, symbol, strategy_name, timeframe, test)
+
+        key = f"{symbol}_{strategy_name}"
+        self.timeframe = timeframe
+        mensaje = self._ya_en_ejecucion(key, symbol, strategy_name)
+        if mensaje:
+            return mensaje
+        # Reservada mientras se espera al loop del pool: otra peticion igual no la lanza dos veces
+        self._arrancando.add(key)
+        try:
+            loop, tarea = await self.loop_pool.crear_tarea_async(self._run_strategy(symbol, strategy_name, timeframe, test), name=key)
+        finally:
+            self._arrancando.discard(key)
+        self.task[key] = (loop, tarea)
+        logger.info(f"🚀 Lanzando nueva estrategia: {key} como tarea ({self.loop_pool.total_tareas()} en el pool)")
+        return f"Strategy {strategy_name} started for {symbol}"
+
+    def __run_loop(self, symbol, strategy_name, timeframe, test):
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
         self.task[f'{symbol}_{strategy_name}'] = (loop, threading.current_thread())
-        task = loop.create_task(self._run_strategy(symbol, strategy_name, test))
+        task = loop.create_task(self._run_strategy(symbol, strategy_name, timeframe, test))
 
         try:
             loop.run_until_complete(task)
@@ -61,30 +184,119 @@ class StrategyRunner:
             logger.exception(f"Error en el bucle de eventos: {e}")
         finally:
             logger.info("Tarea finalizada")
+            loop.run_until_complete(cerrar_clientes_async(loop))
             loop.run_until_complete(loop.shutdown_asyncgens())
             loop.close()
 
             logger.info("🔎 Loop cerrado correctamente.")
 
-    async def _run_strategy(self, symbol, strategy_name, test):
+    async def _en_executor(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    async def _restaurar_checkpoint(self, key, trade_strategy, velas, client, symbol, timeframe) -> bool:
+        """
+        Carga velas e indicadores del checkpoint de `key` y descarga solo las velas cerradas
+        desde entonces. False si no hay un checkpoint utilizable (arranque en frio).
+        """
+        snapshot = await self._en_executor(checkpoints.cargar, key)
+        if snapshot is None:
+            return False
+        meta, datos = snapshot
+        if meta.get("timeframe") != timeframe or datos.ndim != 2 or datos.shape[1] == 0:
+            return False
+        intervalo_ms = interval_to_milliseconds(timeframe)
+        perdidas = (int(time.time() * 1000) - int(datos[0, -1])) // intervalo_ms - 1
+        if perdidas > HISTORY_WARMUP_BARS:
+            logger.info(f"♻️ Checkpoint de {key} demasiado antiguo ({perdidas} velas perdidas): arranque en frio")
+            return False
+
+        velas.importar(datos)
+        if meta.get("indicadores") is None:
+            trade_strategy.preparar_indicadores(velas.to_frame())
+        else:
+            trade_strategy.restaurar_indicadores(meta["indicadores"])
+
+        if perdidas > 0:
+            df = await self._en_executor(kline_store.obtener, client, symbol, timeframe, desde_ms=velas.last_open_time + 1)
+            # Las velas perdidas solo actualizan indicadores: sus senales ya no son operables
+            for vela in df.to_dict("records"):
+                velas.append(vela)
+                trade_strategy.actualizar_indicadores(vela)
+            perdidas = len(df)
+        else:
+            perdidas = 0
+        logger.info(f"♻️ {key} reanudada desde checkpoint ({len(velas)} velas, {perdidas} recuperadas)")
+        return True
+
+    def _guardar_checkpoint(self, key, symbol, strategy_name, timeframe, test, trade_strategy, velas):
+        meta = {
+            "key": key,
+            "symbol": symbol,
+            "strategy": strategy_name,
+            "timeframe": timeframe,
+            "test": test,
+            "indicadores": trade_strategy.estado_indicadores(),
+        }
+        checkpoints.guardar(key, meta, velas.exportar())
+
+    async def _run_strategy(self, symbol, strategy_name, timeframe, test):
         logger.info(f"symbol: {symbol}, strategy: {strategy_name}, test: {test}")
         logger.info("Iniciando estrategia...")
+        key = f"{symbol}_{strategy_name}"
 
-        self.client = Client(api_key=API_KEY, api_secret=API_SECRET, testnet=test)
-        trade_strategy = ContextStrategy.get_strategy(strategy=strategy_name, binance_client=self.client, logger=logger)
-        trade_executor = TradeExecutor(client=self.client, symbol=symbol, logger=logger, isMock=test)
+        fuente = self.fuente
+        if fuente is None:
+            # Cliente propio por estrategia (testnet o no); su constructor hace un ping a Binance
+            client = await self._en_executor(Client, api_key=API_KEY, api_secret=API_SECRET, testnet=test)
+        else:
+            client = fuente.client()
+        trade_strategy = ContextStrategy.get_strategy(strategy=strategy_name, binance_client=client, logger=logger)
+        trade_executor = TradeExecutor(client=client, symbol=symbol, logger=logger, isMock=test, estrategia=strategy_name,
+                                       exchange=self.exchange)
+
+        # Solo se conservan las ultimas velas en un buffer de tamaño fijo; el historial completo se libera
+        velas = CandleBuffer(symbol, timeframe, capacity=CANDLE_BUFFER_SIZE)
+        persistir = fuente is None and checkpoints.activo
+
+        # En vivo, las estrategias del mismo simbolo y temporalidad comparten los indicadores que declaran
+        # (el replay usa los suyos: sus velas son de otro momento)
+        if fuente is None:
+            trade_strategy.compartir_indicadores(symbol, timeframe)
 
-        # Obtiene historial inicial sufiecient antes de arrancar el websocket
-        df_hist = trade_strategy.obtener_historial_inicial(symbol, self.timeframe, period=50) 
+        try:
+            # Con checkpoint se retoma el estado guardado; si no, historial inicial suficiente antes de arrancar el websocket
+            if not (persistir and await self._restaurar_checkpoint(key, trade_strategy, velas, client, symbol, timeframe)):
+                if fuente is None:
+                    df_hist = await self._en_executor(trade_strategy.obtener_historial_inicial, symbol, timeframe, period=50, limite=HISTORY_WARMUP_BARS)
+                else:
+                    df_hist = fuente.historial_inicial(symbol, timeframe, HISTORY_WARMUP_BARS)
+                trade_strategy.preparar_indicadores(df_hist)
+                velas.cargar(df_hist)
+                del df_hist
+        except BaseException:
+            trade_strategy.liberar_indicadores()
+            raise
 
         try:
-            async with BinanceWebSocket(symbol, self.timeframe, logger) as bws:
+            if fuente is not None:
+                conexion = fuente.websocket(symbol, timeframe, logger)
+            else:
+                recorder = KlineRecorder(os.path.join(KLINE_RECORD_DIR, f"{symbol}_{timeframe}.jsonl")) if KLINE_RECORD_DIR else None
+                conexion = BinanceWebSocket(symbol, timeframe, logger, recorder=recorder)
+
+            async with conexion as bws:
+                if fuente is None and bws.hub.es_agregado(timeframe):
+                    # El intervalo se construye con el stream de 1m: completar la vela ya en curso
+                    await self._en_executor(bws.hub.sembrar, symbol, timeframe, client)
                 async for kline in bws.klines_stream():
+                    inicio_vela = time.perf_counter()
                     candle = kline["k"]
 
-                    groupName = symbol + strategy_name + self.timeframe
+                    groupName = symbol + strategy_name + timeframe
 
                     # Siempre que recibimos nueva data, enviamos a clientes
+                    inicio = time.perf_counter()
                     await self.notificar_candle({
                         "symbol": symbol,
                         "open_time": candle["t"],
@@ -95,11 +307,24 @@ class StrategyRunner:
                         "volume": float(candle["v"]),
                         "interval": candle["i"],
                         "close_time": candle["T"],
-                    }, group=groupName)
-
-
-                    if candle["x"]:
-                        nueva_fila = pd.DataFrame([{
+                    }, group=groupName, cerrada=candle["x"])
+                    self.tiempos.registrar("notificar_candle", time.perf_counter() - inicio, symbol, strategy_name)
+
+                    # En modo test cada vela ejecuta contra el exchange simulado los SL/TP pendientes
+                    if test:
+                        with self.tiempos.medir("paper", symbol, strategy_name):
+                            eventos = self.exchange.procesar_vela(
+                                symbol, candle["t"], float(candle["o"]), float(candle["h"]), float(candle["l"]),
+                                float(candle["c"]), close_time=candle["T"], cerrada=candle["x"],
+                            )
+                        if eventos:
+                            await self.notificar_entrada(operaciones_paper(eventos, strategy_name, candle["T"]), "status")
+
+                    if candle["x"] and velas.last_open_time is not None and candle["t"] <= velas.last_open_time:
+                        # Ya incluida en el historial (p.ej. recuperada del checkpoint)
+                        pass
+                    elif candle["x"]:
+                        vela = {
                             "open_time": candle["t"],
                             "open": float(candle["o"]),
                             "high": float(candle["h"]),
@@ -108,18 +333,26 @@ class StrategyRunner:
                             "volume": float(candle["v"]),
                             "close_time": candle["T"],
                             "symbol": symbol,
-                        }])
-                        df_hist = pd.concat([df_hist, nueva_fila], ignore_index=True).iloc[-100:]
-
-                        modo, entry_price, sl, tp = trade_strategy.check_entry(df_hist)
+                        }
+                        with self.tiempos.medir("indicadores", symbol, strategy_name):
+                            velas.append(vela)
+                            trade_strategy.actualizar_indicadores(vela)
+
+                        # check_entry puede consultar REST (EMA diaria) en un fallo de cache: no bloquear el loop
+                        with self.tiempos.medir("check_entry", symbol, strategy_name):
+                            modo, entry_price, sl, tp = await self._en_executor(trade_strategy.check_entry, velas)
                         if modo:
                             qty = trade_strategy.calculate_position_size(entry_price, sl)
                             logger.info(f"💥 Señal {modo} - Entry: {entry_price}, SL: {sl}, TP: {tp}")
                             # Implementar Trade Manager
-                            resultado = trade_executor.place_order(mode=modo, entry_price=entry_price, sl_price=sl, tp_price=tp, quantity=qty)
+                            with self.tiempos.medir("orden", symbol, strategy_name):
+                                resultado = await trade_executor.place_order_async(mode=modo, entry_price=entry_price, sl_price=sl, tp_price=tp, quantity=qty)
+                            if resultado and bws.recibido_en is not None:
+                                LATENCIA_SENAL_ORDEN.observar(time.perf_counter() - bws.recibido_en, symbol, strategy_name)
                             # resultado = None
                             if resultado:
                                 logger.info(f"Ordenes de compra y venta creadas: {resultado}")
+                                operaciones = []
 
                                 entry = resultado['order']
                                 if entry:
@@ -176,22 +409,32 @@ class StrategyRunner:
                                         }
                                     )
                                 
-                                await self.notificar_entrada(operaciones, "status")
+                                # Solo se difunden las operaciones nuevas (ver TradeJournal)
+                                with self.tiempos.medir("notificar_entrada", symbol, strategy_name):
+                                    await self.notificar_entrada(operaciones, "status")
                             else:
                                 logger.error("Error al crear las órdenes de compra y venta.")
+
+                        if persistir and checkpoints.debe_guardar(key):
+                            self._guardar_checkpoint(key, symbol, strategy_name, timeframe, test, trade_strategy, velas)
+
+                    self.tiempos.registrar("vela", time.perf_counter() - inicio_vela, symbol, strategy_name)
         except asyncio.CancelledError:
             await bws.close()
             logger.warn("⚠️ Estrategia cancelada por el usuario y WebSocket cerrado.")
             raise
         except Exception as e:
             logger.exception(f"Error en el bucle principal: {e}")
+        finally:
+            # Ultimo estado para reanudar (si la detuvo el usuario, detener_estrategia lo borra despues)
+            if persistir:
+                self._guardar_checkpoint(key, symbol, strategy_name, timeframe, test, trade_strategy, velas)
+            trade_strategy.liberar_indicadores()
 
-    async def notificar_entrada(self, operaciones: dict, group="status"):
-        for operacion in operaciones:
-            mensaje = dict(operacion)
-            await ws_manager.broadcast(mensaje, group=group)
+    async def notificar_entrada(self, operaciones: list, group="status"):
+        await self.publicar_operaciones(operaciones, group=group)
 
-    async def notificar_candle(self, candle: dict, group="candles"):
+    async def notificar_candle(self, candle: dict, group="candles", cerrada=False):
         mensaje = {
             "tipo": "candle",
             "symbol": candle["symbol"],
@@ -205,50 +448,140 @@ class StrategyRunner:
             "close_time": candle["close_time"]
         }
         # logger.info(f"📊 Enviando candle a clientes: {mensaje}, en el grupo {group}")
-        await ws_manager.broadcast(mensaje, group=group)
-
-    def detener_estrategia(self, symbol, strategy_name, timeframe):
-        import time
-
+        # Solo se envia la ultima actualizacion de cada vela en formacion (ver CandleConflator)
+        clave = (candle["symbol"], candle["interval"], candle["open_time"])
+        await self.publicar_candle(mensaje, group=group, clave=clave, cerrada=cerrada)
+
+    def detener_estrategia(self, symbol, strategy_name, timeframe=None, conservar_checkpoint=False):
+        """
+        Cancela la estrategia. Si la detiene el usuario se borra su checkpoint; al apagar el
+        servidor (`conservar_checkpoint`) se conserva para reanudarla en el siguiente arranque.
+        """
         key = f"{symbol}_{strategy_name}"
         if key not in self.task:
             logger.warning(f"⚠️ La estrategia {strategy_name} no está en ejecución para {symbol}")
             return f"La estrategia {strategy_name} no está en ejecución para {symbol}"
         
 
-        loop, thread = self.task[key]
+        loop, handle = self.task[key]
 
-        async def cancelar_tareas():
-            tasks = [t for t in asyncio.all_tasks(loop) if t is not asyncio.current_task(loop)]
-            for task in tasks:
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    logger.info(f"⛔ Tarea {task.get_name()} cancelada correctamente.")
-            loop.stop()
+        if isinstance(handle, asyncio.Task):
+            EventLoopPool.cancelar_tarea(loop, handle)
+        else:
+            async def cancelar_tareas():
+                tasks = [t for t in asyncio.all_tasks(loop) if t is not asyncio.current_task(loop)]
+                for task in tasks:
+                    task.cancel()
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        logger.info(f"⛔ Tarea {task.get_name()} cancelada correctamente.")
+                loop.stop()
 
-        asyncio.run_coroutine_threadsafe(cancelar_tareas(), loop=loop)
-        thread.join()
+            asyncio.run_coroutine_threadsafe(cancelar_tareas(), loop=loop)
+            handle.join()
 
-        loop.close()
+            loop.close()
+
+        return self._olvidar(key, symbol, strategy_name, handle, conservar_checkpoint)
 
-        del self.task[key]
+    def _olvidar(self, key, symbol, strategy_name, handle, conservar_checkpoint=False):
+        # Solo si sigue siendo la misma ejecucion: otra peticion pudo relanzarla mientras se cancelaba
+        if self.task.get(key, (None, None))[1] is handle:
+            del self.task[key]
+        if not conservar_checkpoint:
+            checkpoints.borrar(key)
 
         logger.info(f"🔎 Estado actual de tareas: {list(self.task.keys())}")
         return f"Strategy {strategy_name} detenida para {symbol}"
 
+    async def detener_estrategia_async(self, symbol, strategy_name, timeframe=None):
+        """
+        Igual que `detener_estrategia` (la espera a que la estrategia termine su limpieza no bloquea el event loop).
+        """
+        key = f"{symbol}_{strategy_name}"
+        _, handle = self.task.get(key, (None, None))
+        if not isinstance(handle, asyncio.Task):
+            # Modo "thread" (join del hilo) o estrategia inexistente
+            return await asyncio.to_thread(self.detener_estrategia, symbol, strategy_name, timeframe)
+
+        loop, tarea = self.task[key]
+        await EventLoopPool.cancelar_tarea_async(loop, tarea)
+        return self._olvidar(key, symbol, strategy_name, tarea)
+
     def detener_todas(self):
         for key in list(self.task.keys()):
             symbol, strategy_name = key.split("_", 1)
-            self.detener_estrategia(symbol, strategy_name)
+            self.detener_estrategia(symbol, strategy_name, conservar_checkpoint=True)
+        if self.loop_pool is not None:
+            # Cierra tambien las sesiones HTTP de ordenes de cada loop; el pool se recrea al lanzar otra
+            self.loop_pool.cerrar()
+
+    def estado(self):
+        """
+        Estado de cada estrategia registrada: 'running' o 'stopped'.
+        """
+        return {key: "running" if self._en_ejecucion(key) else "stopped" for key in list(self.task.keys())}
+
+    def en_ejecucion(self) -> int:
+        """
+        Numero de estrategias en ejecucion (para las metricas; se lee de memoria).
+        """
+        return sum(1 for key in list(self.task.keys()) if key in self.task and self._en_ejecucion(key))
+
+    async def estado_async(self):
+        # En este proceso el estado se lee de memoria; la version async iguala la interfaz de ShardedStrategyRunner
+        return self.estado()
 
     def get_symbols(self):
-        exchange_info = self.client.futures_exchange_info()
-        symbols = [symbol["symbol"] for symbol in exchange_info["symbols"] if symbol["status"] == "TRADING"]
-        return sorted(symbols)
+        return symbol_catalog.simbolos()
+
+TIPOS_PAPER = {"MARKET": "ENTRY", "STOP_MARKET": "STOP_LOSS", "LIMIT": "TAKE_PROFIT"}
+
+
+def operaciones_paper(eventos: list[dict], estrategia: str, timestamp: int) -> list[dict]:
+    """
+    Ejecuciones y expiraciones del exchange simulado con la forma de las operaciones del status-stream.
+    """
+    return [
+        {
+            "tipo": "new-trade",
+            "simbolo": evento["symbol"],
+            "estrategia": evento.get("estrategia") or estrategia,
+            "orden": TIPOS_PAPER[evento["type"]],
+            "orden_id": evento["orderId"],
+            "precio": evento["avgPrice"] if evento["status"] == "FILLED" else (evento["stopPrice"] if evento["type"] == "STOP_MARKET" else evento["price"]),
+            "quantity": evento["executedQty"],
+            "side": evento["side"],
+            "status": evento["status"],
+            "pnl": evento["realizedPnl"],
+            "timestamp": timestamp,
+        }
+        for evento in eventos
+    ]
+
+
+async def publicar_operaciones(operaciones: list, group="status"):
+    """
+    Registra las operaciones en el journal y difunde solo esas entradas (con su `seq`).
+
+    El registro y el encolado ocurren juntos en el loop de ws_manager, asi un cliente
+    que se conecta recibe cada operacion o en su snapshot o como delta, nunca en ambos.
+    Ademas se encolan para la escritura diferida en base de datos (no bloquea).
+    """
+    persistence_worker.registrar_operaciones(operaciones)
+    def registrar_y_difundir():
+        for entrada in trade_journal.registrar(operaciones):
+            ws_manager.difundir(entrada, group=group)
+
+    if ws_manager.loop is None or ws_manager.loop.is_closed():
+        # Aun no hay clientes conectados
+        trade_journal.registrar(operaciones)
+    else:
+        ws_manager.ejecutar_en_loop(registrar_y_difundir)
+
 
 strategy_runner = StrategyRunner()
 
 def get_operations():
-    return operaciones
\ No newline at end of file
+    return trade_journal.snapshot()
\ No newline at end of file
@@ -1,13 +1,17 @@
 # src/services/strategy_service.py
-from src.services.strategy_runtime import StrategyRunner
+from src.services.strategy_runtime import strategy_runner as local_runner
+from src.services.strategy_shards import sharded_runner
 from src.core import ContextStrategy
-import requests
+from core.market_data.symbol_catalog import symbol_catalog
+from src.services.market_data_service import ticker_cache
+import asyncio
 from fastapi import HTTPException
 
-strategy_runner = StrategyRunner()
+# Con STRATEGY_SHARDS > 0 las estrategias se reparten entre procesos; si no, corren en este proceso
+strategy_runner = sharded_runner or local_runner
 
 async def execute_strategy(symbol: str, strategy_name: str, timeframe: str, test: bool = False):
-    resultado = strategy_runner.iniciar_estrategia(symbol, strategy_name, timeframe, test)
+    resultado = await strategy_runner.iniciar_estrategia_async(symbol, strategy_name, timeframe, test)
     return {"success": True, "data": resultado}
 
 async def stop_strategy(symbol: str, strategy_name: str, timeframe: str):
@@ -16,46 +20,33 @@ async def stop_strategy(symbol: str, strategy_name: str, timeframe: str):
     if key not in strategy_runner.task:
         raise HTTPException(status_code=404, detail="Estrategia no encontrada")
 
-    resultado = strategy_runner.detener_estrategia(symbol, strategy_name, timeframe)
+    resultado = await strategy_runner.detener_estrategia_async(symbol, strategy_name, timeframe)
+    return {"success": True, "data": resultado}
+
+async def get_strategies_status():
+    resultado = await strategy_runner.estado_async()
     return {"success": True, "data": resultado}
 
 async def get_available_strategies():
     resultado = list(ContextStrategy.STRATEGIES.keys())
     return {"success": True, "data": resultado}
 
-async def get_symbols(q: str = None):
-    all_symbols = strategy_runner.get_symbols()
-    if not q:
-        return {"success": True, "data": all_symbols}
-    symbols = [symbol for symbol in all_symbols if q.lower() in symbol.lower()]
+async def get_symbols(q: str = None, limit: int = None):
+    if not symbol_catalog.cargado:
+        # Solo la primera vez se descarga el exchange info; despues se sirve de memoria
+        await asyncio.to_thread(symbol_catalog.refrescar)
+    symbols = symbol_catalog.buscar(q, limit)
     return {"success": True, "data": symbols}
 
+async def get_symbol_info(symbol: str):
+    if not symbol_catalog.cargado:
+        await asyncio.to_thread(symbol_catalog.refrescar)
+    info = symbol_catalog.info(symbol)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Simbolo no encontrado")
+    return {"success": True, "data": info}
+
 async def get_market_data(symbol: str):
-    url = f"https://fapi.binance.com/fapi/v1/ticker/24hr?symbol={symbol.upper()}"
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail="Error al obtener los datos del mercado")
-    
-    data = response.json()
-
-    result  = {
-        "symbol": data["symbol"],
-        "priceChange": data["priceChange"],
-        "priceChangePercent": data["priceChangePercent"],
-        "weightedAvgPrice": data["weightedAvgPrice"],
-        "lastPrice": data["lastPrice"],
-        "lastQty": data["lastQty"],
-        "openPrice": data["openPrice"],
-        "highPrice": data["highPrice"],
-        "lowPrice": data["lowPrice"],
-        "volume": data["volume"],
-        "quoteVolume": data["quoteVolume"],
-        "openTime": data["openTime"],
-        "closeTime": data["closeTime"],
-        "firstId": data["firstId"],
-        "lastId": data["lastId"],
-        "count": data["count"]
-    }
-
-    return {"success": True, "data": result}
\ No newline at end of file
+    # Desde memoria (stream !ticker@arr); REST asincrono solo en un fallo en frio
+    result = await ticker_cache.obtener(symbol)
+    return {"success": True, "data": result}
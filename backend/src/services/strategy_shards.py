@@ -0,0 +1,242 @@
+# src/services/strategy_shards.py
+from concurrent.futures import Future
+from config.settings import STRATEGY_SHARDS
+import multiprocessing as mp
+import asyncio
+import bisect
+import hashlib
+import itertools
+import logging
+import signal
+import threading
+
+logger = logging.getLogger("TRADING_BOT")
+
+
+class HashRing:
+    """
+    Anillo de hash consistente: asigna cada simbolo a un shard y, si cambia el numero
+    de shards, solo se mueve la fraccion minima de simbolos.
+    """
+
+    def __init__(self, shards: int, replicas: int = 64):
+        self.shards = shards
+        self._anillo = sorted(
+            (self._hash(f"shard-{shard}-{replica}"), shard)
+            for shard in range(shards)
+            for replica in range(replicas)
+        )
+        self._hashes = [h for h, _ in self._anillo]
+
+    @staticmethod
+    def _hash(valor: str) -> int:
+        return int.from_bytes(hashlib.blake2b(valor.encode(), digest_size=8).digest(), "big")
+
+    def shard_de(self, symbol: str) -> int:
+        i = bisect.bisect(self._hashes, self._hash(symbol.upper())) % len(self._anillo)
+        return self._anillo[i][1]
+
+
+def _shard_worker(indice: int, comandos: mp.Queue, eventos: mp.Queue):
+    """
+    Proceso de un shard: aloja su propio StrategyRunner y reenvia al proceso
+    principal las notificaciones que normalmente irian a ws_manager.
+    """
+    # El proceso principal decide cuando parar (comando "salir")
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from src.services.strategy_runtime import strategy_runner
+    from src.services.checkpoint import checkpoints
+
+    async def publicar(mensaje: dict, group: str = "status", clave=None, cerrada=None):
+        eventos.put(("evento", group, mensaje, clave, cerrada))
+
+    async def publicar_operaciones(operaciones: list, group: str = "status"):
+        eventos.put(("operaciones", group, operaciones))
+
+    strategy_runner.publicar = publicar
+    strategy_runner.publicar_candle = publicar
+    # El journal que ven los clientes vive en el proceso principal
+    strategy_runner.publicar_operaciones = publicar_operaciones
+    # Los checkpoints del journal y del exchange simulado los escribe el proceso principal
+    checkpoints.globales = False
+    logger.info(f"🧩 Shard {indice} listo")
+
+    while True:
+        comando, id_comando, args = comandos.get()
+        try:
+            if comando == "salir":
+                strategy_runner.detener_todas()
+                checkpoints.detener()
+                eventos.put(("respuesta", id_comando, None, None))
+                break
+            metodo = getattr(strategy_runner, comando)
+            eventos.put(("respuesta", id_comando, metodo(*args), None))
+        except Exception as e:
+            logger.exception(f"❌ Error ejecutando '{comando}' en el shard {indice}")
+            eventos.put(("respuesta", id_comando, None, repr(e)))
+
+
+class ShardedStrategyRunner:
+    """
+    Reparte las estrategias entre `shards` procesos segun el hash consistente del simbolo.
+
+    Expone la misma interfaz que StrategyRunner para los servicios: cada llamada se
+    enruta al shard propietario del simbolo y las notificaciones de los shards se
+    difunden desde este proceso a traves de ws_manager.
+    """
+
+    def __init__(self, shards: int = STRATEGY_SHARDS):
+        self.shards = shards
+        self.ring = HashRing(shards)
+        self.task = {}  # key -> shard
+        self.loop = None
+        self._procesos = []
+        self._comandos = []
+        self._eventos = None
+        self._pendientes: dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._lector = None
+        self._lock = threading.Lock()
+
+    def arrancar(self, loop: asyncio.AbstractEventLoop):
+        """
+        Lanza los procesos de los shards. `loop` es el event loop de FastAPI, donde se
+        hacen los broadcasts de los eventos recibidos.
+        """
+        with self._lock:
+            if self._procesos:
+                return
+            self.loop = loop
+            ctx = mp.get_context("spawn")
+            self._eventos = ctx.Queue()
+            for indice in range(self.shards):
+                comandos = ctx.Queue()
+                proceso = ctx.Process(
+                    target=_shard_worker, args=(indice, comandos, self._eventos), name=f"strategy-shard-{indice}", daemon=True
+                )
+                proceso.start()
+                self._procesos.append(proceso)
+                self._comandos.append(comandos)
+
+            self._lector = threading.Thread(target=self._leer_eventos, name="strategy-shards-eventos", daemon=True)
+            self._lector.start()
+            logger.info(f"🧩 {self.shards} shards de estrategias iniciados")
+
+    def _leer_eventos(self):
+        from src.services.ws_manager import ws_manager
+        from src.services.candle_conflator import candle_conflator
+        from src.services.strategy_runtime import publicar_operaciones
+
+        while True:
+            evento = self._eventos.get()
+            if evento is None:
+                break
+            if evento[0] == "respuesta":
+                _, id_comando, resultado, error = evento
+                futuro = self._pendientes.pop(id_comando, None)
+                # Sin futuro o cancelado: quien llamo ya dejo de esperar (timeout)
+                if futuro is None or not futuro.set_running_or_notify_cancel():
+                    continue
+                if error:
+                    futuro.set_exception(RuntimeError(error))
+                else:
+                    futuro.set_result(resultado)
+            elif evento[0] == "operaciones":
+                _, group, operaciones = evento
+                asyncio.run_coroutine_threadsafe(publicar_operaciones(operaciones, group), self.loop)
+            else:
+                _, group, mensaje, clave, cerrada = evento
+                if cerrada is None:
+                    asyncio.run_coroutine_threadsafe(ws_manager.broadcast(mensaje, group=group, clave=clave), self.loop)
+                else:
+                    # Velas: la conflacion se hace aqui, una sola vez para todos los shards
+                    asyncio.run_coroutine_threadsafe(candle_conflator.publicar(mensaje, group, clave, cerrada), self.loop)
+
+    def _enviar(self, shard: int, comando: str, *args) -> tuple[int, Future]:
+        if not self._procesos:
+            self.arrancar(self.loop or asyncio.get_event_loop())
+        id_comando = next(self._ids)
+        futuro = Future()
+        self._pendientes[id_comando] = futuro
+        self._comandos[shard].put((comando, id_comando, args))
+        return id_comando, futuro
+
+    def _llamar(self, shard: int, comando: str, *args, timeout: float = 60):
+        # Bloqueante: solo fuera del event loop de la API (apagado, reanudacion en un hilo)
+        _, futuro = self._enviar(shard, comando, *args)
+        return futuro.result(timeout)
+
+    async def _llamar_async(self, shard: int, comando: str, *args, timeout: float = 60):
+        """
+        Espera la respuesta del shard sin bloquear el event loop: un shard colgado solo
+        retrasa (hasta `timeout`) la peticion que lo espera, no el resto de la API.
+        """
+        id_comando, futuro = self._enviar(shard, comando, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(futuro), timeout)
+        except asyncio.TimeoutError:
+            self._pendientes.pop(id_comando, None)
+            raise
+
+    def iniciar_estrategia(self, symbol, strategy_name, timeframe, test=False):
+        shard = self.ring.shard_de(symbol)
+        resultado = self._llamar(shard, "iniciar_estrategia", symbol, strategy_name, timeframe, test)
+        self.task[f"{symbol}_{strategy_name}"] = shard
+        return resultado
+
+    async def iniciar_estrategia_async(self, symbol, strategy_name, timeframe, test=False):
+        shard = self.ring.shard_de(symbol)
+        resultado = await self._llamar_async(shard, "iniciar_estrategia", symbol, strategy_name, timeframe, test)
+        self.task[f"{symbol}_{strategy_name}"] = shard
+        return resultado
+
+    def detener_estrategia(self, symbol, strategy_name, timeframe=None):
+        key = f"{symbol}_{strategy_name}"
+        shard = self.task.pop(key, self.ring.shard_de(symbol))
+        return self._llamar(shard, "detener_estrategia", symbol, strategy_name, timeframe)
+
+    async def detener_estrategia_async(self, symbol, strategy_name, timeframe=None):
+        key = f"{symbol}_{strategy_name}"
+        shard = self.task.pop(key, self.ring.shard_de(symbol))
+        return await self._llamar_async(shard, "detener_estrategia", symbol, strategy_name, timeframe)
+
+    def estado(self):
+        estado = {}
+        for shard in range(len(self._procesos)):
+            estado.update(self._llamar(shard, "estado"))
+        return estado
+
+    async def estado_async(self):
+        # Todos los shards a la vez: la peticion tarda lo que el shard mas lento
+        estado = {}
+        for parcial in await asyncio.gather(*(self._llamar_async(shard, "estado") for shard in range(len(self._procesos)))):
+            estado.update(parcial)
+        return estado
+
+    def en_ejecucion(self) -> int:
+        """
+        Estrategias lanzadas y no detenidas segun el registro de este proceso. Las metricas
+        lo leen en cada scrape sin preguntar a los shards (no hay ida y vuelta entre procesos).
+        """
+        return len(self.task)
+
+    def detener_todas(self):
+        for shard in range(len(self._procesos)):
+            try:
+                self._llamar(shard, "salir")
+            except Exception as e:
+                logger.error(f"❌ Error deteniendo el shard {shard}: {e}")
+        for proceso in self._procesos:
+            proceso.join(timeout=10)
+        if self._eventos is not None:
+            self._eventos.put(None)
+        self._procesos, self._comandos = [], []
+        self.task.clear()
+
+    def get_symbols(self):
+        from src.services.strategy_runtime import strategy_runner
+        return strategy_runner.get_symbols()
+
+
+sharded_runner = ShardedStrategyRunner() if STRATEGY_SHARDS > 0 else None
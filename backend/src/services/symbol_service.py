@@ -1,36 +1,47 @@
 # src/services/symbol_service.py
-from fastapi import Depends
-from sqlalchemy.orm import Session
-from src.database.deps import get_db
+from src.database.database import SessionLocal
 from src.database.models import EstrategiaActiva
 from fastapi import HTTPException
+import asyncio
 
-async def create_active_symbol(symbol: str, strategy_name: str, db: Session = Depends(get_db)):
+
+def _crear(symbol: str, strategy_name: str):
+    with SessionLocal() as db:
+        estrategia = EstrategiaActiva(
+            symbol=symbol,
+            nombre_estrategia=strategy_name
+        )
+
+        db.add(estrategia)
+        db.commit()
+        db.refresh(estrategia)
+        return estrategia
+
+
+def _eliminar(symbol: str, strategy_name: str):
+    with SessionLocal() as db:
+        estrategia = db.query(EstrategiaActiva).filter(
+            EstrategiaActiva.symbol == symbol,
+            EstrategiaActiva.nombre_estrategia == strategy_name
+        ).first()
+
+        if not estrategia:
+            raise HTTPException(status_code=404, detail="Estrategia no encontrada")
+
+        db.delete(estrategia)
+        db.commit()
+        return {"message": "Estrategia eliminada con éxito"}
+
+
+async def create_active_symbol(symbol: str, strategy_name: str):
     """
     Crea una nueva estrategia en la base de datos.
+    La sesion (sincrona) se usa en un hilo para no bloquear el event loop.
     """
-    estrategia = EstrategiaActiva(
-        symbol=symbol,
-        nombre_estrategia=strategy_name
-    )
-
-    db.add(estrategia)
-    db.commit()
-    db.refresh(estrategia)
-    return estrategia
+    return await asyncio.to_thread(_crear, symbol, strategy_name)
 
-async def delete_active_symbol(symbol: str, strategy_name: str, db: Session = Depends(get_db)):
+async def delete_active_symbol(symbol: str, strategy_name: str):
     """
     Elimina una estrategia de la base de datos.
     """
-    estrategia = db.query(EstrategiaActiva).filter(
-        EstrategiaActiva.symbol == symbol,
-        EstrategiaActiva.nombre_estrategia == strategy_name
-    ).first()
-
-    if not estrategia:
-        raise HTTPException(status_code=404, detail="Estrategia no encontrada")
-
-    db.delete(estrategia)
-    db.commit()
-    return {"message": "Estrategia eliminada con éxito"}
\ No newline at end of file
+    return await asyncio.to_thread(_eliminar, symbol, strategy_name)
@@ -0,0 +1,63 @@
+# src/services/ws_formats.py
+import json
+
+try:
+    import msgpack
+except ImportError:  # msgpack es opcional
+    msgpack = None
+
+FORMATOS = ("json", "array", "msgpack")
+
+# Formato "array": cada mensaje viaja como [tipo, *valores] en el orden de estos campos.
+# El cliente recibe este esquema una vez al conectarse. Los campos nuevos van al final
+# para no mover las posiciones que ya leen los clientes.
+ESQUEMA_ARRAY = {
+    "candle": ["symbol", "open_time", "open", "high", "low", "close", "volume", "interval", "close_time"],
+    "new-trade": ["simbolo", "estrategia", "orden", "orden_id", "precio", "quantity", "side", "status", "timestamp", "seq", "pnl"],
+}
+
+
+def formato_disponible(formato: str) -> str:
+    """
+    Devuelve el formato a usar para lo que pidio el cliente; JSON si no se reconoce
+    o si falta la dependencia.
+    """
+    if formato == "msgpack" and msgpack is None:
+        return "json"
+    return formato if formato in FORMATOS else "json"
+
+
+def codificar(message: dict, formato: str = "json"):
+    """
+    Codifica un mensaje. str para json/array (frame de texto), bytes para msgpack.
+    """
+    if formato == "msgpack":
+        return msgpack.packb(message, use_bin_type=True)
+    if formato == "array":
+        campos = ESQUEMA_ARRAY.get(message.get("tipo"))
+        if campos is not None:
+            message = [message["tipo"], *[message.get(campo) for campo in campos]]
+    # Mismo formato que WebSocket.send_json
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def lote(codificados: list, formato: str = "json"):
+    """
+    Junta varios mensajes ya codificados en un solo frame (una lista) sin volver a codificarlos.
+    """
+    if formato == "msgpack":
+        packer = msgpack.Packer()
+        return packer.pack_array_header(len(codificados)) + b"".join(codificados)
+    return "[" + ",".join(codificados) + "]"
+
+
+def saludo(group: str, formato: str, batch: int, pedido: str = "json") -> dict:
+    """
+    Primer mensaje de la conexion; informa el formato realmente usado si no es el JSON por defecto.
+    """
+    mensaje = {"message": f"Connected to {group} group"}
+    if formato != "json" or pedido != "json" or batch > 1:
+        mensaje.update({"formato": formato, "batch": batch})
+    if formato == "array":
+        mensaje["schema"] = ESQUEMA_ARRAY
+    return mensaje
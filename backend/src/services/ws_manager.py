@@ -1,48 +1,251 @@
 # src/services/ws_manager.py
 from fastapi import WebSocket
+from config.settings import WS_SEND_QUEUE_SIZE, WS_SLOW_CONSUMER_POLICY
+from src.services.ws_formats import codificar, lote
+from metrics import histograma
+from collections import deque
+import asyncio
 import logging
+import time
+
+DURACION_BROADCAST = histograma("trading_broadcast_seconds", "Codificacion y encolado de un broadcast a todos los clientes del grupo", ("group",))
+
+POLITICAS = ("drop_oldest", "conflate", "disconnect")
+
+
+class ClienteWS:
+    """
+    Conexion de un cliente con su cola de envio acotada y la tarea que la vacia.
+
+    Cada elemento de la cola es [clave, texto]; con la politica 'conflate' un mensaje
+    nuevo con la misma clave que uno pendiente lo reemplaza en su sitio. El texto ya
+    viene codificado en el formato del cliente (str, o bytes para msgpack).
+    """
+
+    def __init__(self, websocket: WebSocket, group: str, max_cola: int, politica: str, hz: float = None,
+                 formato: str = "json", batch: int = 1):
+        if politica not in POLITICAS:
+            raise ValueError(f"Politica de consumidor lento desconocida: {politica}")
+        self.websocket = websocket
+        self.group = group
+        self.max_cola = max_cola
+        self.politica = politica
+        # Frecuencia de envio pedida para las velas en formacion (None = la del conflator, 0 = sin limite)
+        self.hz = hz
+        self.formato = formato
+        # Mensajes maximos por frame; con batch > 1 cada frame es una lista
+        self.batch = batch
+        self.cola: deque[list] = deque()
+        self.pendientes_por_clave: dict = {}
+        self.hay_datos = asyncio.Event()
+        self.enviados = 0
+        self.descartados = 0
+        self.conflados = 0
+        self.tarea: asyncio.Task = None
+
+    def encolar(self, texto, clave=None) -> bool:
+        """
+        Agrega un mensaje ya serializado. Devuelve False si el cliente debe desconectarse.
+        """
+        if clave is not None and self.politica == "conflate":
+            pendiente = self.pendientes_por_clave.get(clave)
+            if pendiente is not None:
+                pendiente[1] = texto
+                self.conflados += 1
+                return True
+
+        if len(self.cola) >= self.max_cola:
+            if self.politica == "disconnect":
+                return False
+            descartado = self.cola.popleft()
+            if self.pendientes_por_clave.get(descartado[0]) is descartado:
+                del self.pendientes_por_clave[descartado[0]]
+            self.descartados += 1
+
+        item = [clave, texto]
+        self.cola.append(item)
+        if clave is not None:
+            self.pendientes_por_clave[clave] = item
+        self.hay_datos.set()
+        return True
+
+    def siguiente(self):
+        item = self.cola.popleft()
+        if item[0] is not None and self.pendientes_por_clave.get(item[0]) is item:
+            del self.pendientes_por_clave[item[0]]
+        if not self.cola:
+            self.hay_datos.clear()
+        return item[1]
+
+    def siguiente_frame(self):
+        """
+        Devuelve (frame, cantidad de mensajes que contiene).
+        """
+        if self.batch <= 1:
+            return self.siguiente(), 1
+        mensajes = [self.siguiente() for _ in range(min(self.batch, len(self.cola)))]
+        return lote(mensajes, self.formato), len(mensajes)
+
+    def estadisticas(self) -> dict:
+        return {
+            "cliente": f"{self.websocket.client.host}:{self.websocket.client.port}" if self.websocket.client else None,
+            "cola": len(self.cola),
+            "enviados": self.enviados,
+            "descartados": self.descartados,
+            "conflados": self.conflados,
+            "politica": self.politica,
+            "hz": self.hz,
+            "formato": self.formato,
+            "batch": self.batch,
+        }
+
 
 class WebSocketManager:
-    def __init__(self):
+    def __init__(self, max_cola: int = WS_SEND_QUEUE_SIZE, politica: str = WS_SLOW_CONSUMER_POLICY):
         # self.active_connections: list[WebSocket] = []
-        self.active_connections: dict[str, list[WebSocket]] = {
+        self.active_connections: dict[str, list[ClienteWS]] = {
             "status": [],
             "candles": []
         }
+        self.max_cola = max_cola
+        self.politica = politica
+        self.desconectados_por_lentitud = 0
+        # Descartes de los clientes ya desconectados, por grupo: el total nunca baja al irse un cliente
+        self._descartados_cerrados: dict[str, int] = {}
+        # Loop de FastAPI: los envios siempre ocurren aqui aunque el broadcast venga de otro hilo
+        self.loop: asyncio.AbstractEventLoop = None
         self.logger = logging.getLogger(__name__)
     
-    async def connect(self, websocket: WebSocket, group: str = "status"):
+    async def connect(self, websocket: WebSocket, group: str = "status", politica: str = None, hz: float = None,
+                      formato: str = "json", batch: int = 1) -> ClienteWS:
         await websocket.accept()
+        self.loop = asyncio.get_running_loop()
+        cliente = ClienteWS(websocket, group, self.max_cola, politica or self.politica, hz, formato, batch)
+        cliente.tarea = asyncio.create_task(self._enviar(cliente))
         if group not in self.active_connections:
             self.active_connections[group] = []
-        self.active_connections[group].append(websocket)
+        self.active_connections[group].append(cliente)
         self.logger.info(f"🔗 Nuevo cliente WebSocket conectado en grupo: '{group}': {websocket}")
+        return cliente
 
     async def disconnect(self, websocket: WebSocket, group: str = "status"):
-        if group in self.active_connections and websocket in self.active_connections[group]:
-            if websocket in self.active_connections[group]:
-                self.active_connections[group].remove(websocket)
+        cliente = self._quitar(websocket, group)
+        if cliente is not None and cliente.tarea is not asyncio.current_task():
+            cliente.tarea.cancel()
+
+    def _quitar(self, websocket: WebSocket, group: str) -> ClienteWS:
+        for cliente in self.active_connections.get(group, []):
+            if cliente.websocket is websocket:
+                self.active_connections[group].remove(cliente)
+                if cliente.descartados:
+                    self._descartados_cerrados[group] = self._descartados_cerrados.get(group, 0) + cliente.descartados
                 self.logger.info(f"🔌 Cliente WebSocket desconectado del grupo: '{group}': {websocket}")
+                return cliente
+        return None
 
-    async def broadcast(self, message: dict, group: str = "status"):
-        if group not in self.active_connections:
-            self.logger.warning(f"⚠️ Grupo '{group}' no encontrado para el broadcast.")
+    async def _enviar(self, cliente: ClienteWS):
+        """
+        Tarea por cliente: vacia su cola, de modo que un cliente lento no frena a los demas.
+        """
+        try:
+            while True:
+                await cliente.hay_datos.wait()
+                frame, cantidad = cliente.siguiente_frame()
+                if isinstance(frame, bytes):
+                    await cliente.websocket.send_bytes(frame)
+                else:
+                    await cliente.websocket.send_text(frame)
+                cliente.enviados += cantidad
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudo enviar mensaje a websocket ({cliente.group}): Error: {e}")
+            await self.disconnect(cliente.websocket, cliente.group)
+
+    def _encolar(self, message: dict, codificados: dict, group: str, clave=None, hz=None):
+        clientes = self.active_connections.get(group)
+        if not clientes:
             return
-    
-        disconnected_clients = []
-        for connection in self.active_connections[group]:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                self.logger.warning(f"⚠️ No se pudo mensaje a websocket ({group}): Error: {e}")
-                disconnected_clients.append(connection)
-
-        for ws in disconnected_clients:
-            self.disconnect(ws, group)
-
-        if self.active_connections[group]:
-            self.logger.info(f"📡 Mensaje enviado a {len(self.active_connections[group])} clientes en grupo '{group}'.")
-        else:
-            self.logger.warning(f"⚠️ No hay clientes conectados en el grupo '{group}'.")
-
-ws_manager = WebSocketManager()
\ No newline at end of file
+        for cliente in list(clientes):
+            if hz is not None and cliente.hz != hz:
+                continue
+            if cliente.formato not in codificados:
+                # Cliente conectado despues de codificar el mensaje
+                codificados[cliente.formato] = codificar(message, cliente.formato)
+            if not cliente.encolar(codificados[cliente.formato], clave):
+                self.desconectados_por_lentitud += 1
+                self.logger.warning(f"🐢 Cliente lento desconectado del grupo '{group}' (cola llena)")
+                self._quitar(cliente.websocket, group)
+                cliente.tarea.cancel()
+                asyncio.ensure_future(cliente.websocket.close(code=1008))
+
+    def ejecutar_en_loop(self, fn, *args):
+        """
+        Ejecuta fn en el loop del manager: directamente si ya estamos en el, o con
+        call_soon_threadsafe si la llamada viene del loop de una estrategia.
+        """
+        try:
+            en_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            en_loop = False
+
+        if en_loop:
+            fn(*args)
+        elif self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(fn, *args)
+
+    def tasas(self, group: str) -> set:
+        return {cliente.hz for cliente in list(self.active_connections.get(group, []))}
+
+    async def broadcast(self, message: dict, group: str = "status", clave=None, hz=None):
+        """
+        Codifica el mensaje una sola vez por formato y lo deja en la cola de cada cliente del grupo.
+
+        :param clave: identifica mensajes que se pueden conflar (p.ej. la misma vela);
+                      solo se usa con la politica 'conflate'
+        :param hz: si se indica, solo a los clientes que pidieron esa frecuencia
+        """
+        if not self.active_connections.get(group):
+            self.logger.debug(f"Sin clientes en el grupo '{group}' para el broadcast.")
+            return
+
+        inicio = time.perf_counter()
+        formatos = {cliente.formato for cliente in list(self.active_connections[group])}
+        codificados = {formato: codificar(message, formato) for formato in formatos}
+        self.ejecutar_en_loop(self._encolar, message, codificados, group, clave, hz)
+        DURACION_BROADCAST.observar(time.perf_counter() - inicio, group)
+
+    def difundir(self, message: dict, group: str = "status", clave=None, hz=None):
+        """
+        Version sincrona de broadcast; solo puede llamarse desde el loop del manager.
+        """
+        if not self.active_connections.get(group):
+            return
+        self._encolar(message, {}, group, clave, hz)
+
+    def descartados_por_grupo(self) -> dict[str, int]:
+        """
+        Mensajes descartados por clientes lentos desde el arranque, por grupo (contador monotono).
+        """
+        totales = dict(self._descartados_cerrados)
+        for group, clientes in list(self.active_connections.items()):
+            descartados = sum(c.descartados for c in list(clientes))
+            if descartados or group in totales:
+                totales[group] = totales.get(group, 0) + descartados
+        return totales
+
+    def estadisticas(self) -> dict:
+        grupos = {
+            group: [cliente.estadisticas() for cliente in clientes]
+            for group, clientes in self.active_connections.items()
+            if clientes
+        }
+        return {
+            "clientes": sum(len(c) for c in grupos.values()),
+            "cola_total": sum(c["cola"] for clientes in grupos.values() for c in clientes),
+            "descartados_total": sum(self.descartados_por_grupo().values()),
+            "desconectados_por_lentitud": self.desconectados_por_lentitud,
+            "grupos": grupos,
+        }
+
+ws_manager = WebSocketManager()
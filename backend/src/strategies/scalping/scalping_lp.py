@@ -1,75 +1,95 @@
 # src/strategies/scalping/scalping_lp.py
-from core import BaseStrategy
-from indicators.ema import ema_gpt, ema
-from indicators.rsi import rsi
-from indicators.volume import volume_sma
+from core import BaseStrategy, CandleBuffer
+from core.market_data.daily_cache import MS_POR_DIA, daily_ema_cache
+from core.market_data.kline_store import kline_store
+from indicators.graph import Indicator
 from binance.client import Client
 from config.settings import *
-import pandas as pd
+import numpy as np
 import logging
+import time
 
 class ScalpingStrategyLP(BaseStrategy):
+    # Indicadores incrementales: se siembran con el historial y se actualizan en O(1) por vela
+    INDICADORES = {
+        "ema9": Indicator("ema", "close", 9),
+        "ema26": Indicator("ema", "close", 26),
+        "ema50": Indicator("ema", "close", 50),
+        "rsi": Indicator("rsi", "close", 5),
+        "vol_prom": Indicator("sma", "volume", 20),
+    }
+
     def __init__(self, binance_client: Client, logger: logging.Logger = None):
+        super().__init__()
         self.client = binance_client
         self.logger = logger
 
-    def obtener_historial_inicial(self, symbol, interval='15m', period=50):
+    def obtener_historial_inicial(self, symbol, interval='15m', period=50, limite=None):
+        """
+        Velas cerradas recientes desde el almacen local, que solo descarga de Binance
+        las velas que faltan desde la ultima guardada.
+
+        :param period: dias de historial si no se indica `limite`
+        :param limite: numero de velas mas recientes a devolver
+        """
         self.logger.info(f"*****Obteniendo historial inicial para {symbol}")
-        klines = self.client.get_historical_klines(symbol, interval, f"{period} days ago UTC")
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time', 
-            'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume', 
-            'taker_buy_quote_asset_volume', 'ignore'
-        ])
-        df['open'] = df['open'].astype(float)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
+        desde_ms = int(time.time() * 1000) - period * MS_POR_DIA
+        df = kline_store.obtener(self.client, symbol, interval, desde_ms=desde_ms, limite=limite)
         self.logger.info(f"*****Datos historicos obtenidos: {len(df)} filas")
         return df
 
-    def obtener_ema_diaria(self, symbol, period=20, days=30):
-        # Obtener datos históricos
-        historial = self.client.get_historical_klines(symbol, Client.KLINE_INTERVAL_1DAY, limit=50)
-        closes = [float(kline[4]) for kline in historial]
-
-        # calcular EMA
-        serie_ema = ema_gpt(pd.Series(closes), period)
-
-        # extraer el último valor de la EMA
-        valor_actual = serie_ema.iloc[-1]
-
-        return valor_actual, serie_ema
-
-    def check_entry(self, df):
-        # self.logger.info(f'*****Contenido de df: {df}')
-        df["ema9"] = ema(df["close"], 9)
-        df["ema26"] = ema(df["close"], 26)
-        df["ema50"] = ema(df["close"], 50)
-        df["rsi"] = rsi(df["close"], 5)
-        df["vol_prom"] = volume_sma(df["volume"], 20)
-
-        ema_cruce_alcista = (df["ema9"].iloc[-2] < df["ema26"].iloc[-2]) & (df["ema9"].iloc[-1] > df["ema26"].iloc[-1])
-        ema_cruce_bajista = (df["ema9"].iloc[-2] > df["ema26"].iloc[-2]) & (df["ema9"].iloc[-1] < df["ema26"].iloc[-1])
-
-        breackout_alcista = df["high"].iloc[-1] > df["high"].iloc[-3:-1].max()
-        breackout_bajista = df["low"].iloc[-1] < df["low"].iloc[-3:-1].min()
-
-        volumen_ok = df["volume"].iloc[-1] > df["vol_prom"].iloc[-1] * 2
-        rsi_long_ok = df["rsi"].iloc[-1] > 50
-        rsi_short_ok = df["rsi"].iloc[-1] < 50
-
-
-        vela_alcista = df["close"].iloc[-1] > df["open"].iloc[-1]
-        vela_bajista = df["close"].iloc[-1] < df["open"].iloc[-1]
+    def obtener_ema_diaria(self, symbol, close_actual, timestamp_ms=None):
+        # La EMA de los dias cerrados sale de la cache compartida (una consulta REST por dia y simbolo);
+        # el dia en curso se completa con el cierre actual
+        ema_diaria = daily_ema_cache.obtener(symbol, self.client, timestamp_ms)
+        return ema_diaria.valor(close_actual), ema_diaria.serie(close_actual, 3)
+
+    def check_entry(self, velas):
+        """
+        Evalua las condiciones de entrada sobre la ultima vela cerrada.
+
+        :param velas: CandleBuffer (o DataFrame con las mismas columnas) con las velas recientes
+        """
+        # El grafo compartido lo alimenta el runtime. Con un grafo propio (llamada directa, benchmarks)
+        # los indicadores se siembran aqui y se vuelven a sembrar si las velas no terminan en la
+        # ultima que procesaron (p.ej. otra ventana de un DataFrame)
+        if self._compartido is None:
+            try:
+                ultima = int(np.asarray(velas["open_time"])[-1])
+            except KeyError:
+                ultima = None
+            if self.ema9.value is None or (ultima is not None and ultima != self.grafo.last_open_time):
+                self.grafo.reset()
+                self.preparar_indicadores(velas)
+
+        open_ = np.asarray(velas["open"])
+        high = np.asarray(velas["high"])
+        low = np.asarray(velas["low"])
+        close = np.asarray(velas["close"])
+        volume = np.asarray(velas["volume"])
+        symbol = velas.symbol if isinstance(velas, CandleBuffer) else velas["symbol"].iloc[-1]
+
+        ema_cruce_alcista = (self.ema9.previous < self.ema26.previous) & (self.ema9.value > self.ema26.value)
+        ema_cruce_bajista = (self.ema9.previous > self.ema26.previous) & (self.ema9.value < self.ema26.value)
+
+        breackout_alcista = high[-1] > high[-3:-1].max()
+        breackout_bajista = low[-1] < low[-3:-1].min()
+
+        volumen_ok = volume[-1] > self.vol_prom.value * 2
+        rsi_long_ok = self.rsi.value > 50
+        rsi_short_ok = self.rsi.value < 50
+
+
+        vela_alcista = close[-1] > open_[-1]
+        vela_bajista = close[-1] < open_[-1]
 
         # EMA diaria (Filtro tendencia flexible)
-        ema_dia_actual, serie_ema_diaria = self.obtener_ema_diaria(df["symbol"].iloc[-1])
-        close_actual = df["close"].iloc[-1]
+        close_actual = close[-1]
+        # El dia se toma del cierre de la vela (no del reloj) para que el filtro sea reproducible
+        ema_dia_actual, serie_ema_diaria = self.obtener_ema_diaria(symbol, close_actual, int(np.asarray(velas["close_time"])[-1]) + 1)
 
-        permitido_long = close_actual > ema_dia_actual or serie_ema_diaria.iloc[-3:].is_monotonic_increasing
-        permitido_short = close_actual < ema_dia_actual or serie_ema_diaria.iloc[-3:].is_monotonic_decreasing
+        permitido_long = close_actual > ema_dia_actual or all(a <= b for a, b in zip(serie_ema_diaria, serie_ema_diaria[1:]))
+        permitido_short = close_actual < ema_dia_actual or all(a >= b for a, b in zip(serie_ema_diaria, serie_ema_diaria[1:]))
 
         # Condicion de entrada Long
         condicion_long = (
@@ -106,12 +126,12 @@ class ScalpingStrategyLP(BaseStrategy):
         # self.logger.info(f"*****condicion_short: {condicion_short}")
 
         if condicion_long:
-            entry_price = df["close"].iloc[-1]
+            entry_price = close[-1]
             sl = entry_price - SL_DOLLAR
             tp = entry_price + TP_DOLLAR
             return "LONG", entry_price, sl, tp
         elif condicion_short:
-            entry_price = df["close"].iloc[-1]
+            entry_price = close[-1]
             sl = entry_price + SL_DOLLAR
             tp = entry_price - TP_DOLLAR
             return "SHORT", entry_price, sl, tp
@@ -1,56 +1,80 @@
 # src/wsclients/binance_ws.py
-from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
+from src.wsclients.stream_hub import BinanceStreamHub, stream_hub
+from src.wsclients.replay_ws import KlineRecorder
+from metrics import histograma, gauge
 import asyncio
 import logging
-import json
+import time
+import weakref
+
+RETRASO_RECEPCION = histograma("trading_kline_receive_lag_seconds", "Desde el evento en Binance (E) hasta su recepcion en el handler", ("symbol", "interval"))
+ESPERA_COLA = histograma("trading_kline_queue_dwell_seconds", "Tiempo del mensaje en la cola antes de que klines_stream lo entregue", ("symbol", "interval"))
+
+_activos = weakref.WeakSet()
+gauge("trading_kline_queue_depth", "Mensajes kline pendientes en la cola de cada estrategia", ("symbol", "interval"),
+      funcion=lambda: {(ws.symbol, ws.interval): ws.queue.qsize() for ws in list(_activos)})
 
 class BinanceWebSocket:
-    def __init__(self, symbol, interval, logger: logging.Logger = None):
+    def __init__(self, symbol, interval, logger: logging.Logger = None, hub: BinanceStreamHub = None,
+                 recorder: KlineRecorder = None):
         self.symbol = symbol.upper()
         self.interval = interval
-        self.client = None
+        self.stream = BinanceStreamHub.kline_stream(self.symbol, interval)
+        self.hub = hub or stream_hub
         self.logger = logger or logging.getLogger(__name__)
         self.loop = None
         self.queue = asyncio.Queue()
+        self.suscrito = False
+        # Opcional: graba los mensajes para reproducirlos despues (ver ReplayWebSocket)
+        self.recorder = recorder
+        # perf_counter de recepcion del ultimo mensaje entregado (para medir senal -> orden)
+        self.recibido_en = None
+        _activos.add(self)
 
     def message_handler(self, _, message: dict):
+        # Se ejecuta en el hilo lector del hub: el mensaje ya viene decodificado
         try:
-            if isinstance(message, str):
-                message = json.loads(message)
             if "k" not in message:
                 return
-            self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+            recibido = time.perf_counter()
+            if "E" in message:
+                RETRASO_RECEPCION.observar(max(0.0, time.time() - message["E"] / 1000), self.symbol, self.interval)
+            if self.recorder is not None:
+                self.recorder.escribir(message)
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, (recibido, message))
         except Exception as e:
             self.logger.exception(f"❌ Error procesando mensaje del WebSocket. Mensaje original: {message}")
 
     async def __aenter__(self):
         self.loop = asyncio.get_running_loop()
-        self.client = UMFuturesWebsocketClient(on_message=self.message_handler)
-        self.client.kline(symbol=self.symbol, interval=self.interval, id=1)
-        self.logger.info("Conexión WebSocket establecida con Binance Future")
+        # La suscripcion puede abrir una conexion nueva (bloqueante), asi que va al executor
+        await self.loop.run_in_executor(None, self.hub.suscribir, self.stream, self.message_handler)
+        self.suscrito = True
+        self.logger.info(f"Suscripción a {self.stream} establecida con Binance Future")
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        if self.client:
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, self.client.stop)
-            await self.queue.put(None)  # Señal para terminar generador
-            self.logger.info("Conexión WebSocket cerrada con Binance Future")
+        await self.close()
 
     async def klines_stream(self):
         try:
             while True:
-                message = await self.queue.get()
-                if message is None:  # Salir del generador
+                item = await self.queue.get()
+                if item is None:  # Salir del generador
                     break
+                self.recibido_en, message = item
+                ESPERA_COLA.observar(time.perf_counter() - self.recibido_en, self.symbol, self.interval)
                 yield message
         except asyncio.CancelledError:
             self.logger.info("⛔ klines_stream() cancelado con éxito.")
             return
 
-    
     async def close(self):
-        if self.client:
-            await self.client.stop()
+        if self.suscrito:
+            self.suscrito = False
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.hub.desuscribir, self.stream, self.message_handler)
             await self.queue.put(None)  # Señal para terminar generador
-            self.logger.info("🔌 WebSocket Binance cerrado correctamente.")
+            if self.recorder is not None:
+                self.recorder.cerrar()
+            self.logger.info(f"🔌 Suscripción a {self.stream} cerrada.")
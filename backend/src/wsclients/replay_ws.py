@@ -0,0 +1,81 @@
+# src/wsclients/replay_ws.py
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+
+
+def tiempo_mensaje(message: dict) -> int:
+    """
+    Momento (ms) del evento kline: `E` si esta, si no el cierre de la vela.
+    """
+    return message.get("E") or message["k"]["T"]
+
+
+class ReplayWebSocket:
+    """
+    Misma interfaz que BinanceWebSocket (`async with` + `klines_stream()`), pero
+    reproduce mensajes kline grabados.
+
+    :param velocidad: multiplicador sobre el tiempo real (60 = un minuto por segundo);
+                      None o 0 reproduce a maxima velocidad
+    """
+
+    def __init__(self, mensajes: list[dict], velocidad: float = None, logger: logging.Logger = None):
+        self.mensajes = mensajes
+        self.velocidad = velocidad
+        self.logger = logger or logging.getLogger(__name__)
+        self.cerrado = False
+        self.recibido_en = None
+
+    async def __aenter__(self):
+        self.logger.info(f"⏪ Replay de {len(self.mensajes)} mensajes kline (velocidad: {self.velocidad or 'maxima'})")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def klines_stream(self):
+        loop = asyncio.get_running_loop()
+        inicio_real = loop.time()
+        inicio_grabado = tiempo_mensaje(self.mensajes[0]) if self.mensajes else 0
+
+        for message in self.mensajes:
+            if self.cerrado:
+                break
+            if self.velocidad:
+                objetivo = inicio_real + (tiempo_mensaje(message) - inicio_grabado) / 1000 / self.velocidad
+                await asyncio.sleep(max(0.0, objetivo - loop.time()))
+            else:
+                # Ceder el loop para que la estrategia se pueda cancelar
+                await asyncio.sleep(0)
+            self.recibido_en = time.perf_counter()
+            yield message
+
+    async def close(self):
+        self.cerrado = True
+
+
+class KlineRecorder:
+    """
+    Graba los mensajes kline recibidos en un fichero JSON lines reproducible con ReplayWebSocket.
+    `escribir` se llama desde el hilo lector del WebSocket.
+    """
+
+    def __init__(self, ruta: str):
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        self.ruta = ruta
+        self._fichero = open(ruta, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def escribir(self, message: dict):
+        linea = json.dumps(message, separators=(",", ":"))
+        with self._lock:
+            if not self._fichero.closed:
+                self._fichero.write(linea + "\n")
+
+    def cerrar(self):
+        with self._lock:
+            self._fichero.close()
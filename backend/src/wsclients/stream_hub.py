@@ -0,0 +1,233 @@
+# src/wsclients/stream_hub.py
+from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
+from config.settings import WS_MAX_STREAMS_PER_CONNECTION
+from core.market_data.candle_aggregator import CandleAggregator
+from core.market_data.daily_cache import daily_ema_cache
+from typing import Callable
+import logging
+import threading
+import time
+import json
+
+logger = logging.getLogger("TRADING_BOT")
+
+
+class _ConexionCombinada:
+    """
+    Una conexion combined-stream de Binance Futures y los streams suscritos en ella.
+    """
+
+    def __init__(self, on_message):
+        self.client = UMFuturesWebsocketClient(on_message=on_message, is_combined=True)
+        self.streams: set[str] = set()
+
+
+class BinanceStreamHub:
+    """
+    Multiplexa todos los streams de mercado sobre unas pocas conexiones combinadas.
+
+    Cada stream (p.ej. `btcusdt@kline_1m`) se suscribe una sola vez aunque lo usen
+    varias estrategias; los mensajes se decodifican una vez y se reparten a todos
+    los callbacks registrados para ese stream. Los callbacks se ejecutan en el hilo
+    lector de la conexion, asi que deben ser rapidos y seguros entre hilos
+    (p.ej. `loop.call_soon_threadsafe(queue.put_nowait, ...)`).
+
+    Los streams kline de los intervalos que soporta el agregador (5m, 1h, ...) no se
+    suscriben en Binance: se construyen en memoria a partir de `<symbol>@kline_1m`, de
+    modo que todas las temporalidades de un simbolo comparten una sola suscripcion.
+    """
+
+    def __init__(self, max_streams_por_conexion: int = WS_MAX_STREAMS_PER_CONNECTION,
+                 agregador: CandleAggregator = None):
+        self.max_streams_por_conexion = max_streams_por_conexion
+        self.agregador = agregador if agregador is not None else CandleAggregator()
+        self._lock = threading.Lock()
+        self._conexiones: list[_ConexionCombinada] = []
+        self._stream_conexion: dict[str, _ConexionCombinada] = {}
+        # stream -> tupla de callbacks; se reemplaza la tupla en cada cambio para leerla sin lock
+        self._suscriptores: dict[str, tuple[Callable[[str, dict], None], ...]] = {}
+        # stream de 1m -> intervalos agregados con suscriptores (tupla, se lee sin lock)
+        self._derivados: dict[str, tuple[str, ...]] = {}
+
+    @staticmethod
+    def kline_stream(symbol: str, interval: str) -> str:
+        return f"{symbol.lower()}@kline_{interval}"
+
+    def _base_agregada(self, stream: str):
+        """
+        Stream de 1m del que sale `stream` si es un kline agregado localmente; None si no.
+        """
+        simbolo, _, tipo = stream.partition("@")
+        if not tipo.startswith("kline_") or not self.agregador.soporta(tipo[6:]):
+            return None
+        return self.kline_stream(simbolo, "1m")
+
+    def es_agregado(self, interval: str) -> bool:
+        return self.agregador.soporta(interval)
+
+    def _necesita_upstream(self, base: str) -> bool:
+        return bool(self._suscriptores.get(base) or self._derivados.get(base))
+
+    def suscribir(self, stream: str, callback: Callable[[str, dict], None]):
+        self.suscribir_varios([stream], callback)
+
+    def suscribir_varios(self, streams: list[str], callback: Callable[[str, dict], None]):
+        """
+        Registra `callback` en cada stream; los streams nuevos se envian a Binance
+        en un solo mensaje SUBSCRIBE por conexion.
+        """
+        with self._lock:
+            nuevos_por_conexion: dict[int, tuple[_ConexionCombinada, list[str]]] = {}
+            for stream in streams:
+                callbacks = self._suscriptores.get(stream, ())
+                if callback in callbacks:
+                    continue
+                self._suscriptores[stream] = callbacks + (callback,)
+                base = self._base_agregada(stream)
+                if base is not None:
+                    interval = stream.partition("@kline_")[2]
+                    if interval not in self._derivados.get(base, ()):
+                        self._derivados[base] = self._derivados.get(base, ()) + (interval,)
+                    stream = base
+                if stream in self._stream_conexion:
+                    continue
+
+                conexion = self._conexion_disponible()
+                conexion.streams.add(stream)
+                self._stream_conexion[stream] = conexion
+                nuevos_por_conexion.setdefault(id(conexion), (conexion, []))[1].append(stream)
+
+            for conexion, nuevos in nuevos_por_conexion.values():
+                conexion.client.subscribe(nuevos)
+                logger.info(f"📡 Streams suscritos en conexion combinada: {nuevos}")
+
+    def desuscribir(self, stream: str, callback: Callable[[str, dict], None]):
+        self.desuscribir_varios([stream], callback)
+
+    def desuscribir_varios(self, streams: list[str], callback: Callable[[str, dict], None]):
+        """
+        Quita `callback` de cada stream; cuando un stream se queda sin suscriptores se
+        desuscribe en Binance y las conexiones vacias se cierran.
+        """
+        cerrar = []
+        with self._lock:
+            quitados_por_conexion: dict[int, tuple[_ConexionCombinada, list[str]]] = {}
+            for stream in streams:
+                callbacks = tuple(cb for cb in self._suscriptores.get(stream, ()) if cb != callback)
+                if callbacks:
+                    self._suscriptores[stream] = callbacks
+                    continue
+
+                self._suscriptores.pop(stream, None)
+                simbolo = stream.partition("@")[0].upper()
+                base = self._base_agregada(stream)
+                if base is not None:
+                    interval = stream.partition("@kline_")[2]
+                    self._derivados[base] = tuple(i for i in self._derivados.get(base, ()) if i != interval)
+                    if not self._derivados[base]:
+                        del self._derivados[base]
+                    # La vela diaria se sigue mientras llegue el 1m (ver _on_message): se libera con el
+                    if interval != "1d":
+                        self.agregador.olvidar(simbolo, interval)
+                    stream = base
+                if self._necesita_upstream(stream):
+                    continue
+                if stream == self.kline_stream(simbolo, "1m"):
+                    # Sin stream de 1m no se alimenta ninguna vela agregada del simbolo (tampoco la diaria implicita)
+                    self.agregador.olvidar(simbolo)
+                conexion = self._stream_conexion.pop(stream, None)
+                if conexion is None:
+                    continue
+                conexion.streams.discard(stream)
+                quitados_por_conexion.setdefault(id(conexion), (conexion, []))[1].append(stream)
+
+            for conexion, quitados in quitados_por_conexion.values():
+                if conexion.streams:
+                    conexion.client.unsubscribe(quitados)
+                else:
+                    self._conexiones.remove(conexion)
+                    cerrar.append(conexion)
+                logger.info(f"🔌 Streams desuscritos: {quitados}")
+
+        # Cerrar fuera del lock: stop() espera a que termine el hilo lector
+        for conexion in cerrar:
+            conexion.client.stop()
+
+    def _conexion_disponible(self) -> _ConexionCombinada:
+        for conexion in self._conexiones:
+            if len(conexion.streams) < self.max_streams_por_conexion:
+                return conexion
+        conexion = _ConexionCombinada(self._on_message)
+        self._conexiones.append(conexion)
+        logger.info(f"🔗 Nueva conexion combinada con Binance Future ({len(self._conexiones)} activas)")
+        return conexion
+
+    def _on_message(self, _, message):
+        try:
+            if isinstance(message, str):
+                message = json.loads(message)
+            stream = message.get("stream")
+            if stream is None:  # Respuestas a SUBSCRIBE/UNSUBSCRIBE
+                return
+            data = message["data"]
+            self._entregar(stream, data)
+            if "k" in data and data["k"].get("i") == "1m":
+                derivados = self._derivados.get(stream, ())
+                if "1d" not in derivados and self.agregador.soporta("1d"):
+                    # La vela diaria se sigue siempre para alimentar la cache de EMA diaria
+                    derivados += ("1d",)
+                for interval, mensaje in self.agregador.procesar(data["k"], derivados, data.get("E")):
+                    self._entregar(self.kline_stream(data["k"]["s"], interval), mensaje)
+                    if interval == "1d" and mensaje["k"]["x"]:
+                        # Cierre diario local: la EMA diaria avanza sin ir a Binance
+                        daily_ema_cache.cerrar_dia(mensaje["s"], mensaje["k"]["t"], float(mensaje["k"]["c"]))
+        except Exception:
+            logger.exception(f"❌ Error procesando mensaje del WebSocket. Mensaje original: {message}")
+
+    def _entregar(self, stream: str, data: dict):
+        for callback in self._suscriptores.get(stream, ()):
+            try:
+                callback(stream, data)
+            except Exception:
+                logger.exception(f"❌ Error entregando mensaje del stream {stream}")
+
+    def sembrar(self, symbol: str, interval: str, client):
+        """
+        Completa con REST (una sola llamada de velas de 1m) la vela agregada en curso,
+        para suscripciones que empiezan a mitad de vela. Un fallo solo se registra:
+        la primera vela saldria con los minutos recibidos desde la suscripcion.
+        """
+        if not self.agregador.soporta(interval):
+            return
+        ahora = int(time.time() * 1000)
+        desde = self.agregador.inicio(interval, ahora)
+        if desde + 60 * 1000 > ahora:
+            return
+        try:
+            klines = client.get_historical_klines(symbol, "1m", desde)
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo completar la vela {interval} en curso de {symbol}: {e}")
+            return
+        # Solo minutos cerrados: el minuto en formacion llega por el stream
+        self.agregador.sembrar(symbol.upper(), interval, [k for k in klines if int(k[6]) < ahora])
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "conexiones": len(self._conexiones),
+                "streams": len(self._stream_conexion),
+                "suscriptores": sum(len(cbs) for cbs in self._suscriptores.values()),
+                "agregados": sum(len(i) for i in self._derivados.values()),
+            }
+
+    def cerrar(self):
+        with self._lock:
+            conexiones, self._conexiones = self._conexiones, []
+            self._stream_conexion.clear()
+            self._suscriptores.clear()
+            self._derivados.clear()
+        for conexion in conexiones:
+            conexion.client.stop()
+
+
+stream_hub = BinanceStreamHub()
@@ -0,0 +1,150 @@
+# tests/benchmarks/conftest.py
+"""
+Benchmarks del backend. No corren por defecto:
+
+    python -m pytest tests/benchmarks --benchmark                  # medir y comprobar las relaciones
+    python -m pytest tests/benchmarks --benchmark --benchmark-save # ademas, guardar baselines.json local
+
+Cada medicion guarda el mejor tiempo por llamada (el minimo de varias repeticiones,
+lo menos sensible al ruido). Las regresiones se detectan comparando mediciones de la
+misma ejecucion (`Bench.comparar`, p.ej. CandleBuffer frente a pd.concat), que no
+dependen de la maquina. baselines.json no se versiona: si existe (generado en esta
+maquina con --benchmark-save), un benchmark tambien falla si, tras una segunda tanda
+de confirmacion, sigue mas lento que su baseline por encima de --benchmark-threshold.
+"""
+import json
+import os
+import sys
+import time
+import pytest
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.dirname(os.path.dirname(DIRECTORIO))
+for ruta in (BACKEND, os.path.join(BACKEND, "src")):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+BASELINES = os.path.join(DIRECTORIO, "baselines.json")
+RESULTADOS = os.path.join(DIRECTORIO, "results", "latest.json")
+
+_resultados: dict[str, dict] = {}
+
+
+def pytest_addoption(parser):
+    grupo = parser.getgroup("benchmark")
+    grupo.addoption("--benchmark", action="store_true", default=False, help="ejecutar los benchmarks")
+    grupo.addoption("--benchmark-save", action="store_true", default=False, help="guardar los resultados como baselines")
+    grupo.addoption("--benchmark-threshold", type=float, default=2.0,
+                    help="factor maximo sobre el baseline antes de considerarlo una regresion")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: benchmark de rendimiento (solo con --benchmark)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    saltar = pytest.mark.skip(reason="benchmarks desactivados (usar --benchmark)")
+    for item in items:
+        if DIRECTORIO in str(item.fspath):
+            item.add_marker(saltar)
+
+
+def _cargar_baselines() -> dict:
+    if not os.path.exists(BASELINES):
+        return {}
+    with open(BASELINES, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Bench:
+    """
+    Mide una funcion sin argumentos: calibra cuantas llamadas caben en ~`objetivo_s`
+    y toma el mejor de `repeticiones` muestras.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.baselines = _cargar_baselines()
+
+    def __call__(self, nombre: str, fn, repeticiones: int = 7, objetivo_s: float = 0.1, numero: int = None) -> float:
+        if numero is None:
+            numero = 1
+            while True:
+                inicio = time.perf_counter()
+                for _ in range(numero):
+                    fn()
+                if time.perf_counter() - inicio >= objetivo_s or numero >= 1_000_000:
+                    break
+                numero *= 2
+
+        muestras = self._muestrear(fn, numero, repeticiones)
+        baseline = self.baselines.get(nombre)
+        umbral = self.config.getoption("--benchmark-threshold")
+        comparar = baseline and not self.config.getoption("--benchmark-save")
+        if comparar and min(muestras) > baseline["segundos"] * umbral:
+            # Confirmar con una segunda tanda antes de declarar una regresion (ruido de la maquina)
+            muestras += self._muestrear(fn, numero, repeticiones)
+
+        mejor = min(muestras)
+        _resultados[nombre] = {
+            "segundos": mejor,
+            "mediana_s": sorted(muestras)[len(muestras) // 2],
+            "numero": numero,
+            "repeticiones": repeticiones,
+        }
+
+        if comparar and mejor > baseline["segundos"] * umbral:
+            pytest.fail(
+                f"Regresion en {nombre}: {mejor * 1e6:.1f} us vs baseline {baseline['segundos'] * 1e6:.1f} us "
+                f"(umbral x{umbral})"
+            )
+        return mejor
+
+    @staticmethod
+    def comparar(nombre: str, referencia: str, maximo: float):
+        """
+        Falla si `nombre` tarda mas de `maximo` veces lo que `referencia`, ambos medidos en
+        esta ejecucion (p.ej. maximo=1/20: al menos 20 veces mas rapido). No hace nada si
+        alguno no se midio (benchmarks filtrados con -k).
+        """
+        if nombre not in _resultados or referencia not in _resultados:
+            return
+        medido = _resultados[nombre]["segundos"]
+        limite = _resultados[referencia]["segundos"] * maximo
+        if medido > limite:
+            pytest.fail(
+                f"Regresion en {nombre}: {medido * 1e6:.1f} us, limite {limite * 1e6:.1f} us "
+                f"(x{maximo:g} de {referencia} en esta misma ejecucion)"
+            )
+
+    @staticmethod
+    def _muestrear(fn, numero: int, repeticiones: int) -> list[float]:
+        muestras = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            for _ in range(numero):
+                fn()
+            muestras.append((time.perf_counter() - inicio) / numero)
+        return muestras
+
+
+@pytest.fixture
+def bench(request):
+    return Bench(request.config)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _resultados:
+        return
+    os.makedirs(os.path.dirname(RESULTADOS), exist_ok=True)
+    with open(RESULTADOS, "w", encoding="utf-8") as f:
+        json.dump(_resultados, f, indent=2, sort_keys=True)
+
+    if session.config.getoption("--benchmark-save"):
+        baselines = _cargar_baselines()
+        baselines.update(_resultados)
+        with open(BASELINES, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
@@ -0,0 +1,38 @@
+# tests/benchmarks/datos.py
+"""
+Datos sinteticos reproducibles (semilla fija) para los benchmarks.
+"""
+import numpy as np
+import pandas as pd
+
+MINUTO_MS = 60_000
+INICIO_MS = 1_700_006_400_000  # 2023-11-15 00:00 UTC
+
+
+def velas(n: int, symbol: str = "BTCUSDT", semilla: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(semilla)
+    close = 30_000 + rng.standard_normal(n).cumsum() * 5
+    open_ = np.r_[close[0], close[:-1]]
+    ruido = np.abs(rng.standard_normal(n)) * 3
+    open_time = INICIO_MS + np.arange(n, dtype=np.int64) * MINUTO_MS
+    return pd.DataFrame({
+        "open_time": open_time,
+        "open": open_,
+        "high": np.maximum(open_, close) + ruido,
+        "low": np.minimum(open_, close) - ruido,
+        "close": close,
+        "volume": rng.gamma(2.0, 50.0, n),
+        "close_time": open_time + MINUTO_MS - 1,
+        "symbol": symbol,
+    })
+
+
+def klines_diarias(n: int = 50, semilla: int = 11) -> list:
+    """
+    Velas diarias en el formato de `Client.get_historical_klines`.
+    """
+    rng = np.random.default_rng(semilla)
+    close = 30_000 + rng.standard_normal(n).cumsum() * 200
+    dia = 86_400_000
+    inicio = INICIO_MS - (n - 1) * dia
+    return [[inicio + i * dia, str(c), str(c), str(c), str(c), "1000", inicio + (i + 1) * dia - 1] for i, c in enumerate(close)]
@@ -0,0 +1,59 @@
+# tests/benchmarks/test_broadcast.py
+import asyncio
+import pytest
+from src.services.ws_manager import WebSocketManager
+
+MENSAJES = 20
+
+
+class _Cliente:
+    host = "bench"
+    port = 0
+
+
+class WebSocketFalso:
+    client = _Cliente()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, texto):
+        pass
+
+    async def send_bytes(self, datos):
+        pass
+
+    async def close(self, code=1000):
+        pass
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("clientes", [1, 10, 100, 1000])
+def test_broadcast_fan_out(bench, clientes):
+    loop = asyncio.new_event_loop()
+    manager = WebSocketManager(max_cola=MENSAJES * 2)
+
+    async def conectar():
+        for _ in range(clientes):
+            await manager.connect(WebSocketFalso(), group="bench")
+
+    loop.run_until_complete(conectar())
+    mensaje = {"tipo": "candle", "symbol": "BTCUSDT", "open_time": 1, "open": 1.0, "high": 2.0,
+               "low": 0.5, "close": 1.5, "volume": 10.0, "interval": "1m", "close_time": 59_999}
+
+    async def ronda():
+        # Broadcast de MENSAJES mensajes y espera a que todos los clientes los envien
+        for _ in range(MENSAJES):
+            await manager.broadcast(mensaje, group="bench")
+        while any(cliente.cola for cliente in manager.active_connections["bench"]):
+            await asyncio.sleep(0)
+
+    try:
+        bench(f"ws_manager.broadcast[{clientes}_clientes]", lambda: loop.run_until_complete(ronda()), repeticiones=3)
+        # El mensaje se codifica una vez por formato: cada cliente extra cuesta mucho menos que el primero
+        bench.comparar(f"ws_manager.broadcast[{clientes}_clientes]", "ws_manager.broadcast[1_clientes]", max(1, clientes / 2))
+    finally:
+        for cliente in manager.active_connections["bench"]:
+            cliente.tarea.cancel()
+        loop.run_until_complete(asyncio.sleep(0))
+        loop.close()
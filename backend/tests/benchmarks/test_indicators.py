@@ -0,0 +1,65 @@
+# tests/benchmarks/test_indicators.py
+import pytest
+from indicators.ema import ema, ema_gpt
+from indicators.rsi import rsi
+from indicators.volume import volume_sma
+from indicators.graph import Indicator, IndicatorGraph
+from tests.benchmarks.datos import velas
+
+LONGITUDES = [100, 1_000, 10_000]
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("n", LONGITUDES)
+def test_ema(bench, n):
+    close = velas(n)["close"]
+    bench(f"indicators.ema[{n}]", lambda: ema(close, 26))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("n", LONGITUDES)
+def test_ema_gpt(bench, n):
+    close = velas(n)["close"]
+    bench(f"indicators.ema_gpt[{n}]", lambda: ema_gpt(close, 26))
+    # Vectorizada frente al bucle de `ema` (medida antes en esta ejecucion)
+    bench.comparar(f"indicators.ema_gpt[{n}]", f"indicators.ema[{n}]", 1 / 5)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("n", LONGITUDES)
+def test_rsi(bench, n):
+    close = velas(n)["close"]
+    bench(f"indicators.rsi[{n}]", lambda: rsi(close, 5))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("n", LONGITUDES)
+def test_volume_sma(bench, n):
+    volume = velas(n)["volume"]
+    bench(f"indicators.volume_sma[{n}]", lambda: volume_sma(volume, 20))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("consumidores", [1, 10])
+def test_graph_update(bench, consumidores):
+    """
+    Una vela cerrada entregada a `consumidores` estrategias que comparten el grafo:
+    el coste debe depender de los indicadores unicos, no de las estrategias.
+    """
+    datos = velas(1_000)
+    grafo = IndicatorGraph()
+    specs = [Indicator("ema", "close", 9), Indicator("ema", "close", 26), Indicator("ema", "close", 50),
+             Indicator("rsi", "close", 5), Indicator("sma", "volume", 20)]
+    for _ in range(consumidores):
+        grafo.require(specs)
+    grafo.seed(datos)
+    vela = {"open_time": int(datos["open_time"].iloc[-1]), "close": float(datos["close"].iloc[-1]), "volume": float(datos["volume"].iloc[-1])}
+
+    def entregar():
+        vela["open_time"] += 60_000
+        for _ in range(consumidores):
+            grafo.update(vela)
+
+    bench(f"indicators.graph_update[{consumidores}]", entregar)
+    # Los consumidores que reciben una vela ya procesada solo pagan la comprobacion de open_time
+    bench.comparar(f"indicators.graph_update[{consumidores}]", "indicators.graph_update[1]", 3)
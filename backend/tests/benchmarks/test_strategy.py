@@ -0,0 +1,108 @@
+# tests/benchmarks/test_strategy.py
+import pandas as pd
+import pytest
+from core import CandleBuffer, ContextStrategy
+from core.market_data.daily_cache import daily_ema_cache
+from core.market_data.symbol_catalog import symbol_catalog
+from src.services.market_scanner import MarketScanner, CAMPOS
+from tests.benchmarks.datos import velas, klines_diarias
+
+
+class ClienteFalso:
+    """
+    Sustituye la llamada REST de la EMA diaria por datos sinteticos.
+    """
+
+    def get_historical_klines(self, symbol, interval, start_str=None, end_str=None, limit=None, **kwargs):
+        return klines_diarias(limit or 50)
+
+
+def _estrategia(historial: pd.DataFrame):
+    estrategia = ContextStrategy.get_strategy("scalping-lp", binance_client=ClienteFalso())
+    estrategia.preparar_indicadores(historial)
+    return estrategia
+
+
+def _vela(fila) -> dict:
+    return {columna: fila[columna] for columna in ("open_time", "open", "high", "low", "close", "volume", "close_time", "symbol")}
+
+
+@pytest.mark.benchmark
+def test_check_entry_candle_buffer(bench):
+    daily_ema_cache.invalidar()
+    datos = velas(1_100)
+    estrategia = _estrategia(datos.iloc[:1_000])
+    buffer = CandleBuffer("BTCUSDT", "1m")
+    buffer.cargar(datos.iloc[:1_000])
+    buffer.append(_vela(datos.iloc[1_000]))
+    estrategia.actualizar_indicadores(_vela(datos.iloc[1_000]))
+    bench("strategy.check_entry[candle_buffer]", lambda: estrategia.check_entry(buffer))
+
+
+@pytest.mark.benchmark
+def test_check_entry_dataframe(bench):
+    daily_ema_cache.invalidar()
+    datos = velas(1_000)
+    estrategia = _estrategia(datos)
+    ventana = datos.iloc[-100:].reset_index(drop=True)
+    bench("strategy.check_entry[dataframe]", lambda: estrategia.check_entry(ventana))
+    bench.comparar("strategy.check_entry[candle_buffer]", "strategy.check_entry[dataframe]", 1 / 3)
+
+
+@pytest.mark.benchmark
+def test_append_vela_pd_concat(bench):
+    # Camino original del runtime: pd.concat de una fila y recorte a las ultimas 100 velas
+    datos = velas(1_100)
+    estado = {"df": datos.iloc[:100].reset_index(drop=True), "i": 100}
+
+    def append():
+        vela = pd.DataFrame([_vela(datos.iloc[estado["i"] % 1_100])])
+        estado["df"] = pd.concat([estado["df"], vela], ignore_index=True).iloc[-100:]
+        estado["i"] += 1
+
+    bench("strategy.append[pd_concat]", append)
+
+
+@pytest.mark.benchmark
+def test_append_vela_candle_buffer(bench):
+    datos = velas(1_100)
+    filas = [_vela(fila) for _, fila in datos.iterrows()]
+    buffer = CandleBuffer("BTCUSDT", "1m", capacity=100)
+    estado = {"i": 0, "desfase": 0}
+
+    def append():
+        vela = dict(filas[estado["i"]])
+        # open_time siempre creciente para que cada llamada agregue una vela nueva
+        vela["open_time"] += estado["desfase"]
+        buffer.append(vela)
+        estado["i"] += 1
+        if estado["i"] == len(filas):
+            estado["i"] = 0
+            estado["desfase"] += len(filas) * 60_000
+
+    bench("strategy.append[candle_buffer]", append)
+    bench.comparar("strategy.append[candle_buffer]", "strategy.append[pd_concat]", 1 / 20)
+
+
+class HubFalso:
+    def suscribir_varios(self, streams, callback):
+        pass
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("simbolos", [100, 400])
+def test_scanner_evaluar(bench, monkeypatch, simbolos):
+    # Una pasada del scanner sobre todos los simbolos (frente a un check_entry por simbolo)
+    daily_ema_cache.invalidar()
+    monkeypatch.setattr(symbol_catalog, "_client", ClienteFalso())
+    scanner = MarketScanner(barras=100, hub=HubFalso())
+    monkeypatch.setattr(scanner, "_calentar", lambda symbol: None)
+    nombres = [f"S{i}USDT" for i in range(simbolos)]
+    scanner.iniciar(nombres)
+    for i, symbol in enumerate(nombres):
+        datos = velas(100, symbol, semilla=i)
+        scanner.escribir(symbol, datos[list(CAMPOS)].to_numpy(dtype=float).T)
+    ultima = int(datos["open_time"].iloc[-1])
+    bench(f"scanner.evaluar[{simbolos}]", lambda: scanner.evaluar(ultima))
+    # Una pasada vectorizada debe costar menos de la mitad que un check_entry por simbolo
+    bench.comparar(f"scanner.evaluar[{simbolos}]", "strategy.check_entry[candle_buffer]", simbolos / 2)
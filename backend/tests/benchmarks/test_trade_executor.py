@@ -0,0 +1,32 @@
+# tests/benchmarks/test_trade_executor.py
+import asyncio
+import logging
+import pytest
+from core import TradeExecutor
+from core.trade_manager.paper_exchange import PaperExchange
+
+
+def _executor():
+    executor = TradeExecutor(client=None, symbol="BTCUSDT", logger=logging.getLogger("bench"), isMock=True)
+    # Exchange simulado propio, con un precio de mercado para poder ejecutar la entrada
+    executor.exchange = PaperExchange()
+    executor.exchange.procesar_vela("BTCUSDT", 0, 30_000.0, 30_000.0, 30_000.0, 30_000.0)
+    return executor
+
+
+@pytest.mark.benchmark
+def test_place_order_mock(bench):
+    executor = _executor()
+    bench("trade_executor.place_order[mock]",
+          lambda: executor.place_order("LONG", entry_price=30_000.0, sl_price=29_999.9, tp_price=30_000.2, quantity=0.01))
+
+
+@pytest.mark.benchmark
+def test_place_order_async_mock(bench):
+    executor = _executor()
+    loop = asyncio.new_event_loop()
+    try:
+        bench("trade_executor.place_order_async[mock]", lambda: loop.run_until_complete(
+            executor.place_order_async("SHORT", entry_price=30_000.0, sl_price=30_000.1, tp_price=29_999.8, quantity=0.01)))
+    finally:
+        loop.close()
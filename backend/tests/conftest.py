@@ -0,0 +1,16 @@
+# tests/conftest.py
+"""
+Tests del backend:
+
+    python -m pytest tests          # tests (los benchmarks se saltan sin --benchmark)
+
+Los modulos se importan como en la aplicacion: `core.*`, `indicators.*`, `config.*` desde
+src/ y `src.services.*` desde backend/.
+"""
+import os
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for ruta in (BACKEND, os.path.join(BACKEND, "src")):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
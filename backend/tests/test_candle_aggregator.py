@@ -0,0 +1,116 @@
+# tests/test_candle_aggregator.py
+from core.market_data.candle_aggregator import CandleAggregator
+from src.wsclients import stream_hub as modulo_hub
+from src.wsclients.stream_hub import BinanceStreamHub
+
+SYMBOL = "BTCUSDT"
+MINUTO_MS = 60_000
+T0 = 1_700_006_400_000  # 2023-11-15 00:00 UTC, alineado a 5m y a 1d
+
+
+def _k(minuto: int, close: float, cerrada: bool, high: float = None, low: float = None, volumen: float = 1.0) -> dict:
+    t = T0 + minuto * MINUTO_MS
+    return {
+        "s": SYMBOL, "i": "1m", "t": t, "T": t + MINUTO_MS - 1,
+        "o": str(close), "h": str(high if high is not None else close), "l": str(low if low is not None else close),
+        "c": str(close), "v": str(volumen), "x": cerrada,
+    }
+
+
+def _ohlcv(mensaje: dict) -> tuple:
+    k = mensaje["k"]
+    return float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]), k["x"]
+
+
+def test_minuto_parcial_y_cerrado():
+    agregador = CandleAggregator(["5m"])
+    agregador.procesar(_k(0, 100.0, True, high=101.0, low=99.0), ("5m",))
+
+    # Cada actualizacion del minuto en curso sustituye a la anterior (Binance envia acumulados)
+    agregador.procesar(_k(1, 103.0, False, high=104.0, volumen=2.0), ("5m",))
+    (interval, mensaje), = agregador.procesar(_k(1, 102.0, False, high=104.0, low=98.0, volumen=3.0), ("5m",))
+    assert interval == "5m"
+    assert mensaje["k"]["t"] == T0
+    assert _ohlcv(mensaje) == (100.0, 104.0, 98.0, 102.0, 4.0, False)
+
+    # El minuto cerrado se acumula una sola vez
+    (_, mensaje), = agregador.procesar(_k(1, 102.5, True, high=104.0, low=98.0, volumen=3.0), ("5m",))
+    assert _ohlcv(mensaje) == (100.0, 104.0, 98.0, 102.5, 4.0, False)
+
+    for minuto in (2, 3):
+        agregador.procesar(_k(minuto, 101.0, True), ("5m",))
+    (_, mensaje), = agregador.procesar(_k(4, 100.5, True), ("5m",))
+    assert _ohlcv(mensaje) == (100.0, 104.0, 98.0, 100.5, 7.0, True)
+    assert mensaje["k"]["T"] == T0 + 5 * MINUTO_MS - 1
+
+    # Repeticiones de la vela ya cerrada no se vuelven a emitir
+    assert agregador.procesar(_k(4, 100.5, True), ("5m",)) == []
+
+
+def test_cierre_perdido_se_cierra_con_el_siguiente_intervalo():
+    agregador = CandleAggregator(["5m"])
+    for minuto in range(4):
+        agregador.procesar(_k(minuto, 100.0 + minuto, True), ("5m",))
+    # El cierre del minuto 4 nunca llega
+    agregador.procesar(_k(4, 110.0, False), ("5m",))
+
+    salida = agregador.procesar(_k(5, 105.0, False), ("5m",))
+
+    assert [(m["k"]["t"], m["k"]["x"]) for _, m in salida] == [(T0, True), (T0 + 5 * MINUTO_MS, False)]
+    # La vela cerrada no incluye el minuto parcial perdido
+    assert _ohlcv(salida[0][1]) == (100.0, 103.0, 100.0, 103.0, 4.0, True)
+
+
+def test_sembrar_completa_la_vela_en_curso():
+    agregador = CandleAggregator(["5m"])
+    # La suscripcion empieza en el minuto 2
+    agregador.procesar(_k(2, 102.0, True, volumen=2.0), ("5m",))
+
+    klines = [[T0 + m * MINUTO_MS, "95.0", "99.0", "94.0", "98.0", "5.0", T0 + (m + 1) * MINUTO_MS - 1] for m in (0, 1)]
+    agregador.sembrar(SYMBOL, "5m", klines)
+
+    en_curso = agregador.en_curso(SYMBOL, "5m")
+    assert _ohlcv(en_curso) == (95.0, 102.0, 94.0, 102.0, 12.0, False)
+
+    # Sembrar de nuevo (p.ej. otra estrategia) no duplica minutos
+    agregador.sembrar(SYMBOL, "5m", klines)
+    assert _ohlcv(agregador.en_curso(SYMBOL, "5m")) == (95.0, 102.0, 94.0, 102.0, 12.0, False)
+
+
+def test_sembrar_sin_stream_y_vela_completa_no_se_reemite():
+    agregador = CandleAggregator(["5m"])
+    klines = [[T0 + m * MINUTO_MS, "100", "101", "99", "100", "1", T0 + (m + 1) * MINUTO_MS - 1] for m in range(5)]
+    agregador.sembrar(SYMBOL, "5m", klines)
+
+    assert agregador.en_curso(SYMBOL, "5m")["k"]["x"] is True
+    assert agregador.procesar(_k(4, 100.0, True), ("5m",)) == []
+
+
+class _ClienteWS:
+    def __init__(self, on_message=None, is_combined=True):
+        self.suscritos = set()
+
+    def subscribe(self, streams):
+        self.suscritos.update(streams)
+
+    def unsubscribe(self, streams):
+        self.suscritos.difference_update(streams)
+
+    def stop(self):
+        pass
+
+
+def test_hub_libera_la_vela_diaria_con_el_stream_de_1m(monkeypatch):
+    monkeypatch.setattr(modulo_hub, "UMFuturesWebsocketClient", _ClienteWS)
+    hub = BinanceStreamHub(agregador=CandleAggregator(["5m", "1d"]))
+    callback = lambda stream, data: None
+    stream_5m = BinanceStreamHub.kline_stream(SYMBOL, "5m")
+
+    hub.suscribir(stream_5m, callback)
+    hub._on_message(None, {"stream": BinanceStreamHub.kline_stream(SYMBOL, "1m"), "data": {"e": "kline", "k": _k(0, 100.0, True)}})
+    assert hub.agregador.estadisticas()["velas_en_curso"] == 2  # 5m y la diaria implicita
+
+    hub.desuscribir(stream_5m, callback)
+
+    assert hub.agregador.estadisticas()["velas_en_curso"] == 0
+    assert hub.estadisticas()["streams"] == 0
@@ -0,0 +1,93 @@
+# tests/test_candle_conflator.py
+import asyncio
+import json
+import threading
+from src.services.candle_conflator import CandleConflator
+from src.services.ws_manager import WebSocketManager
+
+GROUP = "BTCUSDT@1m"
+
+
+class WebSocketGrabador:
+    client = None
+
+    def __init__(self):
+        self.enviados = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, texto):
+        self.enviados.append(json.loads(texto))
+
+    async def close(self, code=1000):
+        pass
+
+
+def _vela(open_time: int, close: float, cerrada: bool) -> tuple:
+    mensaje = {"tipo": "candle", "symbol": "BTCUSDT", "interval": "1m", "open_time": open_time, "close": close, "cerrada": cerrada}
+    return mensaje, GROUP, ("BTCUSDT", "1m", open_time), cerrada
+
+
+def _publicar_desde_otro_hilo(conflator: CandleConflator, *args):
+    # Como el loop de una estrategia: la vela cerrada llega por call_soon_threadsafe
+    hilo = threading.Thread(target=lambda: asyncio.run(conflator.publicar(*args)))
+    hilo.start()
+    hilo.join()
+
+
+def test_vela_cerrada_no_la_pisa_una_actualizacion_anterior():
+    async def escenario():
+        manager = WebSocketManager()
+        conflator = CandleConflator(manager, hz=20)
+        websocket = WebSocketGrabador()
+        await manager.connect(websocket, group=GROUP, hz=20)
+
+        await conflator.publicar(*_vela(0, 100.0, False))
+        _publicar_desde_otro_hilo(conflator, *_vela(0, 101.0, True))
+        # Actualizacion tardia de la vela ya cerrada (p.ej. otro shard o un reintento)
+        await conflator.publicar(*_vela(0, 100.5, False))
+        await conflator.publicar(*_vela(60_000, 102.0, False))
+        await asyncio.sleep(0.2)
+
+        for cliente in manager.active_connections[GROUP]:
+            cliente.tarea.cancel()
+        return websocket.enviados, conflator.estadisticas()
+
+    enviados, estadisticas = asyncio.run(escenario())
+
+    de_la_primera = [m for m in enviados if m["open_time"] == 0]
+    assert de_la_primera == [{**_vela(0, 101.0, True)[0]}]
+    assert [m["open_time"] for m in enviados] == [0, 60_000]
+    assert estadisticas["recibidas"] == 4
+    assert estadisticas["enviadas"] == 2
+
+
+def test_actualizacion_ya_en_lote_se_descarta_al_enviar():
+    async def escenario():
+        manager = WebSocketManager()
+        conflator = CandleConflator(manager, hz=20)
+        websocket = WebSocketGrabador()
+        await manager.connect(websocket, group=GROUP, hz=20)
+
+        otra = {"tipo": "candle", "symbol": "ETHUSDT", "interval": "1m", "open_time": 0, "close": 5.0, "cerrada": False}
+        broadcast = manager.broadcast
+
+        async def broadcast_y_cerrar(mensaje, **kwargs):
+            # La vela de BTCUSDT se cierra mientras _vaciar envia el lote que aun la contiene
+            if mensaje is otra:
+                _publicar_desde_otro_hilo(conflator, *_vela(0, 101.0, True))
+            await broadcast(mensaje, **kwargs)
+
+        manager.broadcast = broadcast_y_cerrar
+        await conflator.publicar(otra, GROUP, ("ETHUSDT", "1m", 0), False)
+        await conflator.publicar(*_vela(0, 100.0, False))
+        await asyncio.sleep(0.2)
+
+        for cliente in manager.active_connections[GROUP]:
+            cliente.tarea.cancel()
+        return websocket.enviados
+
+    enviados = asyncio.run(escenario())
+
+    assert [(m["symbol"], m["cerrada"]) for m in enviados] == [("ETHUSDT", False), ("BTCUSDT", True)]
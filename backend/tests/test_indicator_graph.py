@@ -0,0 +1,112 @@
+# tests/test_indicator_graph.py
+from indicators.ema import StreamingEMA
+from indicators.graph import Indicator, IndicatorGraph, IndicatorGraphs
+from indicators.rsi import StreamingRSI
+from tests.benchmarks.datos import MINUTO_MS, velas
+
+EMA9 = Indicator("ema", "close", 9)
+EMA26 = Indicator("ema", "close", 26)
+RSI5 = Indicator("rsi", "close", 5)
+EMA_DEL_RSI = Indicator("ema", RSI5, 3)
+
+
+def _vela(fila: dict) -> dict:
+    return {"open_time": int(fila["open_time"]), "close": float(fila["close"]), "volume": float(fila["volume"])}
+
+
+def test_consumidores_comparten_un_nodo_por_indicador():
+    grafo = IndicatorGraph()
+    a = grafo.require([EMA9, EMA26])
+    b = grafo.require([EMA9, EMA_DEL_RSI])
+
+    assert a[EMA9] is b[EMA9]
+    # EMA9, EMA26, RSI5 (dependencia) y la EMA del RSI
+    assert len(grafo) == 4
+    assert grafo.stats() == {str(EMA9): 2, str(EMA26): 1, str(RSI5): 1, str(EMA_DEL_RSI): 1}
+
+
+def test_release_elimina_el_nodo_con_su_ultimo_consumidor():
+    grafo = IndicatorGraph()
+    compartida = grafo.require([EMA9, EMA_DEL_RSI])[EMA9]
+    grafo.require([EMA9, EMA26])
+
+    grafo.release([EMA9, EMA_DEL_RSI])
+    assert grafo.stats() == {str(EMA9): 1, str(EMA26): 1}
+    # Quien sigue consumiendo conserva el mismo objeto
+    assert grafo.require([EMA9])[EMA9] is compartida
+
+    grafo.release([EMA9])
+    grafo.release([EMA9, EMA26])
+    assert len(grafo) == 0
+    # Liberar algo que ya no esta no falla ni deja contadores negativos
+    grafo.release([EMA9])
+    assert len(grafo) == 0
+
+
+def test_update_de_una_vela_ya_procesada_no_hace_nada():
+    df = velas(200)
+    grafo = IndicatorGraph()
+    for _ in range(3):
+        grafo.require([EMA9, EMA_DEL_RSI])
+    grafo.seed(df.iloc[:100])
+
+    ema, rsi = StreamingEMA(9).seed(df["close"].iloc[:100]), StreamingRSI(5).seed(df["close"].iloc[:100])
+    for fila in df.iloc[100:].to_dict("records"):
+        vela = _vela(fila)
+        # Cada consumidor entrega la misma vela, y alguno la repite
+        for _ in range(4):
+            grafo.update(vela)
+        ema.update(vela["close"])
+        rsi.update(vela["close"])
+        # Una vela anterior (p.ej. un mensaje tardio) tampoco se vuelve a aplicar
+        grafo.update({**vela, "open_time": vela["open_time"] - MINUTO_MS})
+
+    nodos = grafo.require([EMA9, RSI5])
+    assert (nodos[EMA9].value, nodos[EMA9].previous) == (ema.value, ema.previous)
+    assert (nodos[RSI5].value, nodos[RSI5].previous) == (rsi.value, rsi.previous)
+    assert grafo.last_open_time == int(df["open_time"].iloc[-1])
+
+
+def test_nodo_nuevo_se_siembra_sin_tocar_los_que_estan_en_marcha():
+    df = velas(200)
+    grafo = IndicatorGraph()
+    ema9 = grafo.require([EMA9])[EMA9]
+    grafo.seed(df.iloc[:150])
+    for fila in df.iloc[150:].to_dict("records"):
+        grafo.update(_vela(fila))
+    antes = ema9.state()
+
+    # Una segunda estrategia llega con el historial completo
+    ema26 = grafo.require([EMA9, EMA26])[EMA26]
+    grafo.seed(df)
+
+    assert ema9.state() == antes
+    assert ema26.value == StreamingEMA(26).seed(df["close"]).value
+    assert grafo.last_open_time == int(df["open_time"].iloc[-1])
+
+
+def test_reset_conserva_los_objetos_de_los_consumidores():
+    df = velas(100)
+    grafo = IndicatorGraph()
+    ema9 = grafo.require([EMA9])[EMA9]
+    grafo.seed(df)
+
+    grafo.reset()
+    assert ema9.value is None and grafo.last_open_time is None
+    grafo.seed(df.iloc[:50])
+    assert ema9.value == StreamingEMA(9).seed(df["close"].iloc[:50]).value
+
+
+def test_un_grafo_por_simbolo_y_temporalidad():
+    grafos = IndicatorGraphs()
+    grafo, a = grafos.acquire("BTCUSDT", "1m", [EMA9])
+    mismo, b = grafos.acquire("BTCUSDT", "1m", [EMA9])
+    otro, c = grafos.acquire("BTCUSDT", "5m", [EMA9])
+
+    assert grafo is mismo and a[EMA9] is b[EMA9]
+    assert otro is not grafo and c[EMA9] is not a[EMA9]
+
+    grafos.release("BTCUSDT", "1m", [EMA9])
+    assert grafos.stats()["BTCUSDT@1m"] == {str(EMA9): 1}
+    grafos.release("BTCUSDT", "1m", [EMA9])
+    assert list(grafos.stats()) == ["BTCUSDT@5m"]
@@ -0,0 +1,138 @@
+# tests/test_paper_exchange.py
+import pytest
+from core.trade_manager.paper_exchange import PaperExchange
+
+SYMBOL = "BTCUSDT"
+MINUTO_MS = 60_000
+T0 = 1_700_006_400_000
+
+
+def _exchange(precio: float = 100.0) -> PaperExchange:
+    """
+    Exchange sin comisiones con una vela cerrada en `precio` (las ordenes nuevas se crean a su cierre).
+    """
+    exchange = PaperExchange(taker_fee=0.0, maker_fee=0.0)
+    _vela(exchange, 0, precio, precio, precio, precio)
+    return exchange
+
+
+def _vela(exchange, minuto, open_, high, low, close, cerrada=True):
+    open_time = T0 + minuto * MINUTO_MS
+    return exchange.procesar_vela(SYMBOL, open_time, open_, high, low, close,
+                                  close_time=open_time + MINUTO_MS - 1, cerrada=cerrada)
+
+
+def _orden(exchange, side, tipo, cantidad, nivel=None, reduce_only=False):
+    precio = {"price": nivel} if tipo == "LIMIT" else ({"stopPrice": nivel} if tipo == "STOP_MARKET" else {})
+    return exchange.futures_create_order(symbol=SYMBOL, side=side, type=tipo, quantity=cantidad,
+                                         reduceOnly=reduce_only, **precio)
+
+
+def _long_protegido(exchange, sl=99.0, tp=101.0):
+    entrada = _orden(exchange, "BUY", "MARKET", 1)
+    stop = _orden(exchange, "SELL", "STOP_MARKET", 1, sl, reduce_only=True)
+    take = _orden(exchange, "SELL", "LIMIT", 1, tp, reduce_only=True)
+    return entrada, stop, take
+
+
+def _posicion(exchange) -> dict:
+    return exchange.futures_position_information(SYMBOL)[0]
+
+
+def test_sl_antes_que_tp_en_la_misma_vela():
+    exchange = _exchange()
+    entrada, stop, take = _long_protegido(exchange)
+    assert entrada["status"] == "FILLED" and float(entrada["avgPrice"]) == 100.0
+
+    eventos = _vela(exchange, 1, 100.0, 102.0, 98.0, 100.5)
+
+    assert [(e["orderId"], e["status"]) for e in eventos] == [(stop["orderId"], "FILLED"), (take["orderId"], "EXPIRED")]
+    assert float(eventos[0]["avgPrice"]) == 99.0
+    assert float(eventos[0]["realizedPnl"]) == -1.0
+    assert float(_posicion(exchange)["positionAmt"]) == 0.0
+    assert exchange.futures_get_open_orders(SYMBOL) == []
+
+
+def test_gap_se_ejecuta_a_la_apertura():
+    exchange = _exchange()
+    _, stop, _ = _long_protegido(exchange)
+
+    eventos = _vela(exchange, 1, 97.0, 97.5, 96.0, 96.5)
+    assert eventos[0]["orderId"] == stop["orderId"]
+    assert float(eventos[0]["avgPrice"]) == 97.0
+
+    exchange = _exchange()
+    _, _, take = _long_protegido(exchange)
+    eventos = _vela(exchange, 1, 103.0, 104.0, 102.5, 103.5)
+    assert eventos[0]["orderId"] == take["orderId"]
+    assert float(eventos[0]["avgPrice"]) == 103.0
+
+
+def test_orden_creada_a_mitad_de_vela_solo_cuenta_el_cierre():
+    exchange = _exchange()
+    # Vela en curso: el maximo y el minimo ya vistos son anteriores a las ordenes
+    _vela(exchange, 1, 100.0, 100.2, 99.8, 100.0, cerrada=False)
+    _, stop, _ = _long_protegido(exchange)
+
+    assert _vela(exchange, 1, 100.0, 102.0, 98.0, 100.5, cerrada=False) == []
+    assert len(exchange.futures_get_open_orders(SYMBOL)) == 2
+
+    eventos = _vela(exchange, 1, 100.0, 102.0, 98.0, 98.5, cerrada=True)
+    assert eventos[0]["orderId"] == stop["orderId"]
+    assert float(eventos[0]["avgPrice"]) == 99.0
+
+    # La vela siguiente ya se compara con su rango completo
+    exchange = _exchange()
+    _vela(exchange, 1, 100.0, 100.0, 100.0, 100.0, cerrada=False)
+    _, _, take = _long_protegido(exchange)
+    _vela(exchange, 1, 100.0, 100.0, 100.0, 100.0, cerrada=True)
+    eventos = _vela(exchange, 2, 100.0, 101.5, 99.5, 100.0)
+    assert [e["orderId"] for e in eventos if e["status"] == "FILLED"] == [take["orderId"]]
+
+
+def test_reduce_only_se_recorta_y_expira():
+    exchange = _exchange()
+    # Sin posicion que reducir se rechaza al crearla
+    assert _orden(exchange, "SELL", "LIMIT", 1, 101.0, reduce_only=True)["status"] == "EXPIRED"
+
+    _orden(exchange, "BUY", "MARKET", 1)
+    grande = _orden(exchange, "SELL", "LIMIT", 3, 101.0, reduce_only=True)
+    stop = _orden(exchange, "SELL", "STOP_MARKET", 1, 95.0, reduce_only=True)
+
+    eventos = _vela(exchange, 1, 100.0, 101.0, 99.5, 100.5)
+
+    assert [(e["orderId"], e["status"]) for e in eventos] == [(grande["orderId"], "FILLED"), (stop["orderId"], "EXPIRED")]
+    assert float(eventos[0]["executedQty"]) == 1.0
+    assert float(_posicion(exchange)["positionAmt"]) == 0.0
+
+
+def test_vuelta_de_posicion_y_precio_medio():
+    exchange = _exchange(100.0)
+    _orden(exchange, "BUY", "MARKET", 1)
+    _vela(exchange, 1, 102.0, 102.0, 102.0, 102.0)
+    _orden(exchange, "BUY", "MARKET", 1)
+    assert float(_posicion(exchange)["entryPrice"]) == 101.0
+
+    _vela(exchange, 2, 104.0, 104.0, 104.0, 104.0)
+    venta = _orden(exchange, "SELL", "MARKET", 3)
+
+    assert float(venta["realizedPnl"]) == 6.0
+    posicion = _posicion(exchange)
+    assert float(posicion["positionAmt"]) == -1.0
+    assert float(posicion["entryPrice"]) == 104.0
+    assert exchange.resumen()["pnl_realizado"] == 6.0
+
+
+def test_cancelar():
+    exchange = _exchange()
+    _orden(exchange, "BUY", "MARKET", 1)
+    stop = _orden(exchange, "SELL", "STOP_MARKET", 1, 99.0, reduce_only=True)
+
+    cancelada = exchange.futures_cancel_order(symbol=SYMBOL, orderId=stop["orderId"])
+    assert cancelada["status"] == "CANCELED"
+    assert exchange.futures_get_open_orders(SYMBOL) == []
+    assert _vela(exchange, 1, 100.0, 100.0, 90.0, 95.0) == []
+    assert float(_posicion(exchange)["positionAmt"]) == 1.0
+
+    with pytest.raises(ValueError):
+        exchange.futures_cancel_order(symbol=SYMBOL, orderId=stop["orderId"])
@@ -0,0 +1,95 @@
+# tests/test_paridad_backtesting.py
+"""
+El backtest vectorizado (backtesting.engine) debe dar exactamente las mismas senales que
+el camino en vivo: preparar_indicadores + actualizar_indicadores + check_entry vela a vela.
+"""
+import numpy as np
+import pandas as pd
+from backtesting.engine import ParametrosEstrategia, _filtro_diario, calcular_senales, cierres_diarios
+from core import CandleBuffer, ContextStrategy
+from core.market_data.daily_cache import MS_POR_DIA, DailyEmaCache
+from tests.benchmarks.datos import INICIO_MS, velas
+
+BARRAS = 5_000
+WARMUP = 300
+SENALES = {"LONG": 1, "SHORT": -1, None: 0}
+
+
+def _vela(fila) -> dict:
+    return {columna: fila[columna] for columna in ("open_time", "open", "high", "low", "close", "volume", "close_time", "symbol")}
+
+
+def _senales_en_vivo(df: pd.DataFrame) -> np.ndarray:
+    estrategia = ContextStrategy.get_strategy("scalping-lp", binance_client=None)
+    # Sin filtro diario: serie vacia = tendencia "monotona", se permiten ambos lados
+    estrategia.obtener_ema_diaria = lambda symbol, close_actual, timestamp_ms=None: (close_actual, [])
+
+    buffer = CandleBuffer("BTCUSDT", "1m", capacity=WARMUP)
+    historial = df.iloc[:WARMUP]
+    estrategia.preparar_indicadores(historial)
+    buffer.cargar(historial)
+
+    senales = []
+    for fila in df.iloc[WARMUP:].to_dict("records"):
+        vela = _vela(fila)
+        buffer.append(vela)
+        estrategia.actualizar_indicadores(vela)
+        modo, _, _, _ = estrategia.check_entry(buffer)
+        senales.append(SENALES[modo])
+    return np.array(senales, dtype=np.int8)
+
+
+def test_senales_en_vivo_igual_que_backtest():
+    df = velas(BARRAS)
+    esperadas = calcular_senales(df, ParametrosEstrategia(filtro_diario=False))[WARMUP:]
+    en_vivo = _senales_en_vivo(df)
+
+    assert np.count_nonzero(esperadas) > 0
+    np.testing.assert_array_equal(en_vivo, esperadas)
+
+
+class ClienteDiario:
+    """
+    Velas diarias hasta `ahora` (incluida la del dia en curso), como Client.get_historical_klines.
+    """
+
+    def __init__(self, diarios: pd.Series):
+        self.diarios = diarios
+        self.ahora = None
+        self.llamadas = 0
+
+    def get_historical_klines(self, symbol, interval, start_str=None, end_str=None, limit=None, **kwargs):
+        self.llamadas += 1
+        dias = [(int(dia), c) for dia, c in self.diarios.items() if dia <= self.ahora][-(limit or 500):]
+        return [[dia, str(c), str(c), str(c), str(c), "1000", dia + MS_POR_DIA - 1] for dia, c in dias]
+
+
+def test_filtro_diario_igual_que_daily_ema_cache():
+    df = velas(BARRAS)
+    # Dias anteriores a las velas intradia y los dias cubiertos por ellas
+    rng = np.random.default_rng(3)
+    dias_previos = INICIO_MS - np.arange(60, 0, -1, dtype=np.int64) * MS_POR_DIA
+    previos = pd.Series(30_000 + rng.standard_normal(60).cumsum() * 200, index=dias_previos)
+    diarios = pd.concat([previos, cierres_diarios(df)])
+
+    params = ParametrosEstrategia()
+    close = df["close"].to_numpy(dtype=np.float64)
+    close_time = df["close_time"].to_numpy(dtype=np.float64)
+    permitido_long, permitido_short = _filtro_diario(close, close_time, diarios, params)
+    # Los datos cruzan la EMA diaria: el filtro bloquea y permite en ambos sentidos
+    assert 0 < permitido_long.sum() < len(close) and 0 < permitido_short.sum() < len(close)
+
+    cliente = ClienteDiario(diarios)
+    cache = DailyEmaCache(params.ema_diaria_periodo, params.ema_diaria_limite)
+    long_cache, short_cache = [], []
+    for c, t in zip(close.tolist(), df["close_time"].tolist()):
+        cliente.ahora = t + 1
+        ema = cache.obtener("BTCUSDT", cliente, t + 1)
+        valor, serie = ema.valor(c), ema.serie(c, 3)
+        long_cache.append(c > valor or all(a <= b for a, b in zip(serie, serie[1:])))
+        short_cache.append(c < valor or all(a >= b for a, b in zip(serie, serie[1:])))
+
+    # Una consulta REST por dia
+    assert cliente.llamadas == len(np.unique((df["close_time"].to_numpy() + 1) // MS_POR_DIA))
+    np.testing.assert_array_equal(permitido_long, np.array(long_cache))
+    np.testing.assert_array_equal(permitido_short, np.array(short_cache))
@@ -0,0 +1,107 @@
+# tests/test_paridad_scanner.py
+"""
+El scanner (MarketScanner.evaluar, vectorizado sobre todos los simbolos) debe encontrar
+las mismas entradas que ScalpingStrategyLP.check_entry evaluada simbolo a simbolo.
+"""
+import numpy as np
+from core import CandleBuffer, ContextStrategy
+from src.services.market_scanner import CAMPOS, MarketScanner
+from tests.benchmarks.datos import MINUTO_MS, velas
+
+SIMBOLOS = 40
+BARRAS = 500
+WARMUP = 300
+VENTANA = 100
+# Minutos (indice de vela) sin vela en el stream del scanner, por simbolo; la mayoria
+# pocas velas antes de una entrada, para que el hueco quede dentro de lo que se evalua
+HUECOS = {0: 350, 6: 400, 18: 470, 25: 320, 31: 350}
+
+
+class HubFalso:
+    def suscribir_varios(self, streams, callback):
+        pass
+
+
+def _datos() -> dict:
+    datos = {}
+    for i in range(SIMBOLOS):
+        symbol = f"S{i}USDT"
+        df = velas(BARRAS, symbol, semilla=i)
+        # Picos de volumen para que se cumpla volumen_ok con cierta frecuencia
+        picos = np.random.default_rng(100 + i).random(BARRAS) < 0.08
+        df.loc[picos, "volume"] *= 6
+        datos[symbol] = df
+    return datos
+
+
+def _con_hueco(df, indice: int) -> list:
+    # Lo que ve el scanner en un hueco: precio anterior y volumen cero
+    filas = df.to_dict("records")
+    anterior = filas[indice - 1]["close"]
+    filas[indice] = {**filas[indice], "open": anterior, "high": anterior, "low": anterior, "close": anterior, "volume": 0.0}
+    return filas
+
+
+def _entradas_check_entry(datos: dict) -> set:
+    entradas = set()
+    for i, (symbol, df) in enumerate(datos.items()):
+        estrategia = ContextStrategy.get_strategy("scalping-lp", binance_client=None)
+        # Sin filtro diario: serie vacia = tendencia "monotona", se permiten ambos lados
+        estrategia.obtener_ema_diaria = lambda symbol, close_actual, timestamp_ms=None: (close_actual, [])
+        buffer = CandleBuffer(symbol, "1m", capacity=VENTANA)
+        historial = df.iloc[:WARMUP]
+        estrategia.preparar_indicadores(historial)
+        buffer.cargar(historial)
+
+        filas = _con_hueco(df, HUECOS[i]) if i in HUECOS else df.to_dict("records")
+        for vela in filas[WARMUP:]:
+            buffer.append(vela)
+            estrategia.actualizar_indicadores(vela)
+            modo, _, _, _ = estrategia.check_entry(buffer)
+            if modo:
+                entradas.add((symbol, int(vela["open_time"]), modo))
+    return entradas
+
+
+def _entradas_scanner(datos: dict, monkeypatch) -> tuple:
+    scanner = MarketScanner(barras=VENTANA, top=SIMBOLOS, hub=HubFalso())
+    monkeypatch.setattr(scanner, "_calentar", lambda symbol: None)
+    monkeypatch.setattr(scanner, "_tendencia_diaria", lambda symbol, modo, precio, timestamp_ms: True)
+    scanner.iniciar(list(datos))
+
+    columnas = {symbol: df[list(CAMPOS)].to_numpy(dtype=np.float64).T for symbol, df in datos.items()}
+    for symbol, valores in columnas.items():
+        scanner.escribir(symbol, valores[:, :WARMUP])
+
+    entradas, evaluados = set(), {}
+    for j in range(WARMUP, BARRAS):
+        for i, (symbol, valores) in enumerate(columnas.items()):
+            if HUECOS.get(i) != j:
+                scanner.escribir(symbol, valores[:, j:j + 1])
+        open_time = int(columnas["S0USDT"][0, j])
+        resultado = scanner.evaluar(open_time)
+        evaluados[open_time] = resultado["simbolos"]
+        entradas.update((c["symbol"], open_time, c["modo"]) for c in resultado["coincidencias"])
+    return entradas, evaluados
+
+
+def test_scanner_igual_que_check_entry(monkeypatch):
+    datos = _datos()
+    esperadas = _entradas_check_entry(datos)
+    encontradas, evaluados = _entradas_scanner(datos, monkeypatch)
+
+    # El scanner no evalua un simbolo en el minuto del hueco ni cuando el hueco es la primera
+    # vela de la ventana (no hay precio anterior con el que completarlo)
+    inicio = int(datos["S0USDT"]["open_time"].iloc[0])
+    sin_evaluar = {
+        (f"S{i}USDT", inicio + minuto * MINUTO_MS)
+        for i, hueco in HUECOS.items()
+        for minuto in (hueco, hueco + VENTANA - 1)
+    }
+    esperadas = {e for e in esperadas if e[:2] not in sin_evaluar}
+
+    assert len(esperadas) > 10
+    assert encontradas == esperadas
+    for open_time, simbolos in evaluados.items():
+        assert simbolos == SIMBOLOS - sum(1 for _, t in sin_evaluar if t == open_time)
+
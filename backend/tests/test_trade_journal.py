@@ -0,0 +1,83 @@
+# tests/test_trade_journal.py
+from core.trade_manager.trade_journal import TradeJournal
+
+
+def _op(i: int, simbolo: str = "BTCUSDT", estrategia: str = "scalping-lp") -> dict:
+    return {"tipo": "new-trade", "simbolo": simbolo, "estrategia": estrategia, "orden": "ENTRY", "orden_id": i}
+
+
+def _seqs(entradas: list) -> list:
+    return [entrada["seq"] for entrada in entradas]
+
+
+def test_descarta_las_mas_antiguas_y_sus_indices():
+    journal = TradeJournal(capacity=3)
+    registradas = journal.registrar([_op(1), _op(2, "ETHUSDT")])
+    registradas += journal.registrar([_op(3), _op(4), _op(5)])
+
+    assert _seqs(registradas) == [1, 2, 3, 4, 5]
+    assert len(journal) == 3
+    assert (journal.primer_seq, journal.ultimo_seq) == (3, 5)
+    assert journal.por_orden(2) is None
+    assert journal.por_orden(4)["seq"] == 4
+    assert journal.consultar(symbol="ETHUSDT") == []
+
+
+def test_desde_sin_huecos_ni_duplicados_tras_descartar():
+    journal = TradeJournal(capacity=3)
+    journal.registrar([_op(i) for i in range(1, 6)])
+
+    assert _seqs(journal.desde(0)) == [3, 4, 5]
+    # `since` anterior a lo que se conserva: todo lo que queda, una sola vez y en orden
+    assert _seqs(journal.desde(1)) == [3, 4, 5]
+    assert _seqs(journal.desde(3)) == [4, 5]
+    assert journal.desde(5) == []
+    assert journal.desde(9) == []
+
+    # Un cliente que recibio hasta el 4 reanuda despues de que se descartara el 5:
+    # primer_seq > since + 1 le indica que hubo entradas que ya no estan
+    journal.registrar([_op(i) for i in range(6, 9)])
+    assert _seqs(journal.desde(4)) == [6, 7, 8]
+    assert journal.primer_seq == 6
+
+
+def test_consultar_por_simbolo_estrategia_desde_y_limite():
+    journal = TradeJournal(capacity=10)
+    journal.registrar([
+        _op(1, "BTCUSDT", "a"), _op(2, "ETHUSDT", "a"), _op(3, "BTCUSDT", "b"),
+        _op(4, "BTCUSDT", "a"), _op(5, "ETHUSDT", "b"),
+    ])
+
+    assert _seqs(journal.consultar(symbol="BTCUSDT")) == [1, 3, 4]
+    assert _seqs(journal.consultar(strategy="b")) == [3, 5]
+    assert _seqs(journal.consultar(symbol="BTCUSDT", strategy="a")) == [1, 4]
+    assert _seqs(journal.consultar(symbol="BTCUSDT", desde=1)) == [3, 4]
+    assert _seqs(journal.consultar(limite=2)) == [4, 5]
+    assert journal.consultar(limite=0) == []
+
+
+def test_restaurar_continua_la_secuencia():
+    original = TradeJournal(capacity=10)
+    original.registrar([_op(i) for i in range(1, 6)])
+    snapshot = original.snapshot()
+
+    journal = TradeJournal(capacity=10)
+    journal.restaurar(list(reversed(snapshot)))
+    assert _seqs(journal.snapshot()) == [1, 2, 3, 4, 5]
+
+    nuevas = journal.registrar([_op(6)])
+    assert _seqs(nuevas) == [6]
+    # El cliente que vio hasta el 5 antes del reinicio solo recibe lo nuevo
+    assert _seqs(journal.desde(5)) == [6]
+    assert journal.por_orden(3)["seq"] == 3
+
+
+def test_restaurar_respeta_la_capacidad():
+    original = TradeJournal(capacity=10)
+    original.registrar([_op(i) for i in range(1, 6)])
+
+    journal = TradeJournal(capacity=3)
+    journal.restaurar(original.snapshot())
+    assert _seqs(journal.snapshot()) == [3, 4, 5]
+    assert _seqs(journal.registrar([_op(6)])) == [6]
+    assert _seqs(journal.desde(2)) == [4, 5, 6]
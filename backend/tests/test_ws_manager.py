@@ -0,0 +1,168 @@
+# tests/test_ws_manager.py
+import asyncio
+import json
+import pytest
+from src.services import ws_manager as modulo_ws
+from src.services.ws_manager import WebSocketManager
+
+GROUP = "candles"
+
+
+class WebSocketFalso:
+    """
+    WebSocket que guarda lo enviado. Si es lento, cada envio espera a `liberar`.
+    """
+
+    client = None
+
+    def __init__(self, lento: bool = False):
+        self.enviados = []
+        self.cerrado_con = None
+        self.liberar = asyncio.Event()
+        if not lento:
+            self.liberar.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, texto):
+        await self.liberar.wait()
+        self.enviados.append(texto)
+
+    async def send_bytes(self, datos):
+        await self.liberar.wait()
+        self.enviados.append(datos)
+
+    async def close(self, code=1000):
+        self.cerrado_con = code
+
+    def mensajes(self) -> list:
+        return [json.loads(texto) for texto in self.enviados]
+
+
+async def _ceder(veces: int = 5):
+    # Deja correr las tareas de envio de cada cliente
+    for _ in range(veces):
+        await asyncio.sleep(0)
+
+
+async def _conectar(manager: WebSocketManager, politica: str, **kwargs) -> tuple:
+    rapido, lento = WebSocketFalso(), WebSocketFalso(lento=True)
+    await manager.connect(rapido, group=GROUP, politica=politica, **kwargs)
+    await manager.connect(lento, group=GROUP, politica=politica, **kwargs)
+    await _ceder()
+    return rapido, lento
+
+
+async def _cerrar(manager: WebSocketManager):
+    for clientes in manager.active_connections.values():
+        for cliente in clientes:
+            cliente.tarea.cancel()
+    await _ceder()
+
+
+def test_drop_oldest_descarta_lo_mas_antiguo_del_cliente_lento():
+    async def escenario():
+        manager = WebSocketManager(max_cola=3, politica="drop_oldest")
+        rapido, lento = await _conectar(manager, "drop_oldest")
+        for i in range(10):
+            await manager.broadcast({"i": i}, group=GROUP)
+            await _ceder()
+
+        descartados = manager.descartados_por_grupo()
+        lento.liberar.set()
+        await _ceder()
+        await manager.disconnect(lento, GROUP)
+        await _cerrar(manager)
+        return rapido.mensajes(), lento.mensajes(), descartados, manager.descartados_por_grupo()
+
+    rapido, lento, descartados, tras_desconectar = asyncio.run(escenario())
+
+    assert [m["i"] for m in rapido] == list(range(10))
+    # El primero ya estaba en envio; de los 9 siguientes solo caben los 3 mas recientes
+    assert [m["i"] for m in lento] == [0, 7, 8, 9]
+    assert descartados == {GROUP: 6}
+    # El contador no baja cuando el cliente lento se va
+    assert tras_desconectar == {GROUP: 6}
+
+
+def test_conflate_reemplaza_el_pendiente_de_la_misma_clave():
+    async def escenario():
+        manager = WebSocketManager(max_cola=3, politica="conflate")
+        rapido, lento = await _conectar(manager, "conflate")
+        await manager.broadcast({"vela": 0, "close": 1}, group=GROUP, clave=0)
+        await _ceder()
+        for vela, close in ((1, 10), (2, 20), (1, 11), (1, 12), (2, 21)):
+            await manager.broadcast({"vela": vela, "close": close}, group=GROUP, clave=vela)
+            await _ceder()
+
+        cliente_lento = next(c for c in manager.active_connections[GROUP] if c.websocket is lento)
+        conflados, descartados = cliente_lento.conflados, cliente_lento.descartados
+        lento.liberar.set()
+        await _ceder()
+        await _cerrar(manager)
+        return rapido.mensajes(), lento.mensajes(), conflados, descartados
+
+    rapido, lento, conflados, descartados = asyncio.run(escenario())
+
+    assert [(m["vela"], m["close"]) for m in rapido] == [(0, 1), (1, 10), (2, 20), (1, 11), (1, 12), (2, 21)]
+    # Cada vela conserva su sitio en la cola con su ultimo valor
+    assert [(m["vela"], m["close"]) for m in lento] == [(0, 1), (1, 12), (2, 21)]
+    assert (conflados, descartados) == (3, 0)
+
+
+def test_disconnect_cierra_el_socket_del_cliente_lento():
+    async def escenario():
+        manager = WebSocketManager(max_cola=2, politica="disconnect")
+        rapido, lento = await _conectar(manager, "disconnect")
+        for i in range(5):
+            await manager.broadcast({"i": i}, group=GROUP)
+            await _ceder()
+
+        clientes = [c.websocket for c in manager.active_connections[GROUP]]
+        await _cerrar(manager)
+        return rapido, lento, clientes, manager.desconectados_por_lentitud
+
+    rapido, lento, clientes, desconectados = asyncio.run(escenario())
+
+    assert [m["i"] for m in rapido.mensajes()] == list(range(5))
+    assert clientes == [rapido]
+    assert lento.cerrado_con == 1008
+    assert desconectados == 1
+
+
+def test_broadcast_codifica_una_vez_por_formato(monkeypatch):
+    llamadas = []
+    codificar = modulo_ws.codificar
+
+    def contar(message, formato="json"):
+        llamadas.append(formato)
+        return codificar(message, formato)
+
+    monkeypatch.setattr(modulo_ws, "codificar", contar)
+    mensaje = {"tipo": "candle", "symbol": "BTCUSDT", "open_time": 0, "open": 1.0, "high": 2.0, "low": 0.5,
+               "close": 1.5, "volume": 3.0, "interval": "1m", "close_time": 59_999}
+
+    async def escenario():
+        manager = WebSocketManager()
+        sockets = {}
+        for nombre, formato in (("json1", "json"), ("json2", "json"), ("json3", "json"), ("array1", "array"), ("array2", "array")):
+            sockets[nombre] = WebSocketFalso()
+            await manager.connect(sockets[nombre], group=GROUP, formato=formato)
+        await manager.broadcast(mensaje, group=GROUP)
+        await _ceder()
+        await _cerrar(manager)
+        return sockets
+
+    sockets = asyncio.run(escenario())
+
+    assert sorted(llamadas) == ["array", "json"]
+    for nombre in ("json1", "json2", "json3"):
+        assert sockets[nombre].mensajes() == [mensaje]
+    for nombre in ("array1", "array2"):
+        assert sockets[nombre].mensajes() == [["candle", "BTCUSDT", 0, 1.0, 2.0, 0.5, 1.5, 3.0, "1m", 59_999]]
+
+
+def test_politica_desconocida():
+    with pytest.raises(ValueError):
+        asyncio.run(WebSocketManager(politica="esperar").connect(WebSocketFalso(), group=GROUP))
@@ -1,6 +1,6 @@
 // src/components/ActiveSymbolTable/ActiveSymbolRow.jsx
 import React, { useEffect } from 'react';
-import { useCandleStream } from '../../hooks/useCandleStream';
+import { useCandleStream, useMarketCandleStream } from '../../hooks/useCandleStream';
 
 /**
  * Componente que se encarga de suscribirse al stream de una clave específica y
@@ -8,17 +8,24 @@ import { useCandleStream } from '../../hooks/useCandleStream';
  *
  * @param {string} keyId - Clave única SYMBOL::STRATEGY::TF
  * @param {function} onCandle - Callback para manejar los datos de la vela
+ * @param {string} symbol - Simbolo de la fila
+ * @param {string} marketInterval - Temporalidad elegida en el selector si difiere de la de la estrategia
+ * @param {function} onMarketCandle - Callback para las velas de mercado de `marketInterval`
  * @param {React.ReactNode} children - Fila a renderizar
  */
-const ActiveSymbolRow = ({ keyId, onCandle, children }) => {
-  useCandleStream(keyId, (data) => {
+const ActiveSymbolRow = ({ keyId, onCandle, symbol, marketInterval, onMarketCandle, children }) => {
+  const handler = (callback) => (data) => {
     try {
       if (typeof data !== 'object' || data === null) throw new Error('Dato no válido');
-      onCandle(data);
+      callback?.(data);
     } catch (error) {
       console.error('🔴 Error en handler de ActiveSymbolRow:', error);
     }
-  });
+  };
+
+  useCandleStream(keyId, handler(onCandle));
+  // Otra temporalidad: velas de mercado del simbolo (grupo SYMBOL@interval, sin streams nuevos en Binance)
+  useMarketCandleStream(symbol, marketInterval, handler(onMarketCandle));
 
   return children;
 };
@@ -5,12 +5,15 @@ import { stopStrategy } from '../../services/api';
 import useStrategyStore from '../../store/strategyStore';
 import ReusableTable from '../ui/ReusableTable';
 import ActiveSymbolRow from './ActiveSymbolRow';
+import timeframes from '../../assets/config/timeframes.json';
 
 const ActiveSymbolTable = () => {
   const { t } = useTranslation();
   const [symbolsData, setSymbolsData] = useState({});
   const [timeLeft, setTimeLeft] = useState({});
   const [flashSymbols, setFlashSymbols] = useState({});
+  // Temporalidad mostrada por fila cuando no es la de la estrategia (selector de temporalidad)
+  const [viewIntervals, setViewIntervals] = useState({});
 
   const activeStrategies = useStrategyStore(state => state.activeStrategies);
   const deactivateStrategyStore = useStrategyStore(state => state.deactivateStrategy);
@@ -56,6 +59,11 @@ const ActiveSymbolTable = () => {
         delete updated[key];
         return updated;
       });
+      setViewIntervals(v => {
+        const updated = { ...v };
+        delete updated[key];
+        return updated;
+      });
     } catch (err) {
       console.error('Error al desactivar estrategia:', err);
     }
@@ -79,13 +87,25 @@ const ActiveSymbolTable = () => {
   ];
 
   
+  const handleIntervalChange = (key, timeframe, interval) => {
+    setViewIntervals(v => {
+      const updated = { ...v };
+      if (interval === timeframe) delete updated[key];
+      else updated[key] = interval;
+      return updated;
+    });
+    // La fila muestra "cargando" hasta la primera vela de la nueva temporalidad
+    setSymbolsData(d => {
+      const updated = { ...d };
+      delete updated[key];
+      return updated;
+    });
+  };
+
   const renderRow = ([key, { symbol, strategyName, timeframe }]) => {
-        
-    const onCandle = (data) => {
-      // console.log("🏷️ [ActiveSymbolRow] onCandle data:", data);
-      
-      if (data.tipo !== 'candle') return;
-  
+    const marketInterval = viewIntervals[key];
+
+    const showCandle = (data) => {
       setSymbolsData(prev => ({
         ...prev,
         [key]: {
@@ -104,14 +124,34 @@ const ActiveSymbolTable = () => {
         ...prev,
         [key]: Math.max(0, Math.floor((data.close_time - Date.now()) / 1000))
       }));
-  
+    };
+
+    const onCandle = (data) => {
+      // console.log("🏷️ [ActiveSymbolRow] onCandle data:", data);
+      
+      if (data.tipo !== 'candle') return;
+
+      // Con otra temporalidad seleccionada, las velas de la estrategia solo marcan su estado
+      if (!marketInterval) showCandle(data);
       updateStrategyStatusStore(key, 'loaded');
     };
+
+    const onMarketCandle = (data) => {
+      if (data.tipo !== 'candle') return;
+      showCandle(data);
+    };
   
     const data = symbolsData[key];
   
     return (
-      <ActiveSymbolRow key={key} keyId={key} onCandle={onCandle}>
+      <ActiveSymbolRow
+        key={key}
+        keyId={key}
+        onCandle={onCandle}
+        symbol={symbol}
+        marketInterval={marketInterval}
+        onMarketCandle={onMarketCandle}
+      >
         {!data ? (
           <tr>
             <td colSpan={headers.length} className="px-4 py-4 text-center text-blue-600">
@@ -129,7 +169,19 @@ const ActiveSymbolTable = () => {
             <td className="px-4 py-2 font-medium">{symbol}</td>
             <td className="px-4 py-2 font-medium">{strategyName || '-'}</td>
             <td className="px-4 py-2">{data?.close || '-'}</td>
-            <td className="px-4 py-2">{timeframe || '-'}</td>
+            <td className="px-4 py-2">
+              <select
+                value={marketInterval || timeframe}
+                onChange={(e) => handleIntervalChange(key, timeframe, e.target.value)}
+                className="border border-gray-300 rounded px-1 py-0.5 text-xs"
+              >
+                {timeframes.map((tf) => (
+                  <option key={tf.value} value={tf.value}>
+                    {tf.value === timeframe ? `${tf.value} *` : tf.value}
+                  </option>
+                ))}
+              </select>
+            </td>
             <td className={`px-4 py-2 ${flashSymbols[key] ? 'animate-pulse bg-yellow-200' : ''}`}>
               {timeLeft[key] !== undefined ? formatTimeLeft(timeLeft[key]) : '-'}
             </td>
@@ -1,41 +1,69 @@
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { connectWS, suscribeToWS, unsubscribeFromWS } from "../services/ws";
 import useStrategyStore from "../store/strategyStore";
 
+const STATUS_URL = `${import.meta.env.VITE_WS_URL}/status-stream`;
+const MAX_ENTRIES = 50;
+const RECONNECT_MS = 3000;
+
+const toEntry = (operacion) => ({
+  seq: operacion.seq,
+  date: new Date(operacion.timestamp ?? Date.now()).toLocaleString("en-GB"),
+  pair: operacion.simbolo,
+  type: operacion.orden,
+  side: operacion.side,
+  price: operacion.precio,
+  amount: operacion.quantity
+});
+
 const EntrySignalTable = () => {
   const [entries, setEntries] = useState([]);
   const socketEnabled = useStrategyStore((state) => state.socketEnabled);
+  // Ultimo `seq` recibido: al reconectar se pide solo lo posterior (?since=)
+  const lastSeqRef = useRef(0);
 
   useEffect(() => {
     if (!socketEnabled) {
       return;
     }
 
-    const url = `${import.meta.env.VITE_WS_URL}/status-stream`;
-
-    // Establish WebSocket connection
-    // and subscribe to the status stream
-    connectWS(url);
+    let url = null;
+    let reconnectTimer = null;
+    let active = true;
 
     const handleMessage = (data) => {
-      if (data.tipo === "new-trade") {
-
-        const newEntry = {
-          date: new Date().toLocaleString("en-GB"),
-          pair: data.simbolo,
-          type: data.orden,
-          side: data.side,
-          price: data.precio,
-          amount: data.quantity
-        };
-
-        setEntries((prevEntries) => [newEntry, ...prevEntries.slice(0, 49)]); // Limit to 5 entries
+      if (data.tipo === "snapshot") {
+        // Primer mensaje de cada conexion: el journal completo o, con `since`, lo que faltaba (del mas antiguo al mas nuevo)
+        const nuevas = data.operaciones.map(toEntry).reverse();
+        if (data.desde === 0) {
+          setEntries(nuevas.slice(0, MAX_ENTRIES));
+        } else {
+          setEntries((prevEntries) => [...nuevas, ...prevEntries].slice(0, MAX_ENTRIES));
+        }
+        lastSeqRef.current = data.seq;
+      } else if (data.tipo === "new-trade") {
+        // Deltas posteriores al snapshot; se ignoran los ya vistos
+        if (data.seq != null && data.seq <= lastSeqRef.current) return;
+        lastSeqRef.current = data.seq ?? lastSeqRef.current;
+        setEntries((prevEntries) => [toEntry(data), ...prevEntries].slice(0, MAX_ENTRIES));
+      } else if (data.tipo === "closed" && active) {
+        reconnectTimer = setTimeout(connect, RECONNECT_MS);
       }
-    } 
+    };
+
+    // Establish WebSocket connection
+    // and subscribe to the status stream (resuming from the last seq if there is one)
+    const connect = () => {
+      url = lastSeqRef.current ? `${STATUS_URL}?since=${lastSeqRef.current}` : STATUS_URL;
+      connectWS(url);
+      suscribeToWS(url, handleMessage);
+    };
 
-    suscribeToWS(url, handleMessage);
+    connect();
 
     return () => {
+      active = false;
+      clearTimeout(reconnectTimer);
       unsubscribeFromWS(url, handleMessage);
     };
   }, [socketEnabled]);
@@ -71,7 +99,7 @@ const EntrySignalTable = () => {
           </thead>
           <tbody className="divide-y divide-gray-200">
             {entries.map((entry, index) => (
-              <tr key={index} className="hover:bg-gray-50">
+              <tr key={entry.seq ?? index} className="hover:bg-gray-50">
                 <td className="px-4 py-2 border-r border-gray-100">{entry.date}</td>
                 <td className="px-4 py-2 border-r border-gray-100">{entry.pair}</td>
                 <td className="px-4 py-2 border-r border-gray-100">{entry.type}</td>
@@ -1,30 +1,24 @@
 // src/hooks/useCandleStream.js
 import { useEffect, useRef } from "react";
-import { connectWS, suscribeToWS, unsubscribeFromWS, closeWS } from "../services/ws";
+import { connectWS, suscribeToWS, unsubscribeFromWS } from "../services/ws";
+import { buildMarketCandleGroup } from "../utils/keyBuldier";
 
 /**
- * Suscribe a un stream de velas ("candles") para la clave dada y
- * ejecuta onData cada vez que llega un mensaje.
+ * Suscribe a un grupo de candle-stream y ejecuta onData cada vez que llega un mensaje.
+ * Al cambiar el grupo se libera el anterior (el socket se cierra con su ultimo listener).
  *
- * @param {string} key        - Formato "SYMBOL::STRATEGY::TF"
+ * @param {string} group      - Grupo de una estrategia (SYMBOL + STRATEGY + TF) o de mercado ("SYMBOL@interval")
  * @param {(data: any) => void} onData
  */
-export const useCandleStream = (key, onData) => {
+export const useCandleStream = (group, onData) => {
   const onDataRef = useRef(onData);
   onDataRef.current = onData;
 
-  const url = key ? `${import.meta.env.VITE_WS_URL}/candle-stream/${encodeURIComponent(key)}` : null;
-  
-  const handlerRef = useRef(null);
-  const urlRef = useRef(null);
-  const connectedRef = useRef(false);
+  const url = group ? `${import.meta.env.VITE_WS_URL}/candle-stream/${encodeURIComponent(group)}` : null;
 
   useEffect(() => {
     if (!url) return;
 
-    urlRef.current = url;
-    connectedRef.current = true;
-
     const handler = (data) => {
       try {
         onDataRef.current(data);
@@ -35,17 +29,22 @@ export const useCandleStream = (key, onData) => {
 
     connectWS(url);
     suscribeToWS(url, handler);
-    handlerRef.current = handler;
-
-    return () => {
-      // Previene cierres múltiples innecesarios si ya se limpió por un render anterior
-      if (connectedRef.current) return;
-      connectedRef.current = false;
 
-      if (urlRef.current) {
-        unsubscribeFromWS(urlRef.current, handlerRef.current);
-        closeWS(urlRef.current);
-      }
-    };
+    // La limpieza usa la URL y el handler de este efecto, no los del render siguiente
+    return () => unsubscribeFromWS(url, handler);
   }, [url]); // Solo depende de la URL real (codificada)
 };
+
+/**
+ * Velas de mercado de un simbolo en la temporalidad elegida (selector de temporalidad).
+ *
+ * Usa el grupo "SYMBOL@interval": el backend construye las temporalidades mayores con el
+ * stream de 1m del simbolo, asi que cambiar de intervalo no abre streams nuevos en Binance.
+ *
+ * @param {string} symbol
+ * @param {string} interval   - "1m", "5m", "15m", "1h", "4h", "1d", ...
+ * @param {(data: any) => void} onData
+ */
+export const useMarketCandleStream = (symbol, interval, onData) => {
+  useCandleStream(symbol && interval ? buildMarketCandleGroup(symbol, interval) : null, onData);
+};
@@ -12,4 +12,15 @@
 export const buildStrategyKey = (symbol, strategy, timeframe) => {
     return `${symbol}::${strategy}::${timeframe}`;
   };
-  
\ No newline at end of file
+  
+/**
+ * Grupo de candle-stream con las velas de mercado de un simbolo (sin estrategia).
+ * Formato: SYMBOL@interval, p.ej. "BTCUSDT@15m".
+ *
+ * @param {string} symbol
+ * @param {string} interval
+ * @returns {string}
+ */
+export const buildMarketCandleGroup = (symbol, interval) => {
+    return `${symbol.toUpperCase()}@${interval}`;
+  };